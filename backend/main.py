@@ -4,30 +4,39 @@ load_dotenv()
 # MAIN FASTAPI ROUTE DONE BY ME
 
 import os
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse
+import json
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 import asyncio
+from contextlib import asynccontextmanager
 from pydantic import BaseModel,HttpUrl
 from typing import Optional, List, Dict, Any
 
-from database.DatabaseManager import DatabaseManager
+from database.DatabaseManager import get_db_manager, STARTUP_SEARCH_REFRESH_SECONDS, STARTUP_SEARCH_MODES
+from database.client_registry import client_registry
 from evalve.app import EvalveAgent
-from conversation_mem.convo_mem import ConversationMemory
+from evalve.insight_jobs import InsightJobQueue
+from conversation_mem.session_store import ConversationSessionStore
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 
 try:
-    dm = DatabaseManager(SUPABASE_URL,SUPABASE_KEY)
-    ea = EvalveAgent()
-    cm = ConversationMemory()
+    # One DatabaseManager (and one pooled Supabase client) shared by every service
+    dm = get_db_manager()
+    # Per-session conversation memories, shared with the agent
+    cm = ConversationSessionStore(db_manager=dm)
+    ea = EvalveAgent(db_manager=dm, conversation_sessions=cm)
+    # Insights are generated in the background, on signup and whenever a profile changes
+    insight_jobs = InsightJobQueue(agent=ea, db_manager=dm)
+    dm.add_profile_listener(insight_jobs.enqueue)
 except Exception as e:
     print(f"Error initializing services: {e}")
-    dm = ea = cm = None
+    dm = ea = cm = insight_jobs = None
 
 class ChatModel(BaseModel):
     query : str
@@ -200,10 +209,43 @@ def map_frontend_to_db(frontend_data: dict) -> dict:
     return mapped_startup, mapped_founders
 
 
+async def refresh_search_index_periodically(interval: float):
+    """Keep the local startup search index in step with edits made outside this process"""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(dm.refresh_search_index)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    search_refresher = None
+    if dm:
+        # Warm start the memory graph from its snapshot, building it from Supabase only the first time
+        await asyncio.to_thread(dm.initialize_memory_graph)
+        # Searches are served from memory once the index is loaded
+        await asyncio.to_thread(dm.build_search_index)
+        if STARTUP_SEARCH_REFRESH_SECONDS > 0:
+            search_refresher = asyncio.create_task(refresh_search_index_periodically(STARTUP_SEARCH_REFRESH_SECONDS))
+    if insight_jobs:
+        insight_jobs.start()
+    yield
+    if search_refresher:
+        search_refresher.cancel()
+    if insight_jobs:
+        await insight_jobs.stop()
+    # Write out queued conversations before the connections go away
+    if dm:
+        await asyncio.to_thread(dm.close_conversation_writer)
+        await asyncio.to_thread(dm.close_vector_index)
+    # Release pooled database connections
+    await client_registry.aclose()
+
+
 app = FastAPI(
     title="Evalve API",
     description="API for Startup Platform with AI Insights and Chatbot",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for development
@@ -227,9 +269,19 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+@app.middleware("http")
+async def profile_request_scope(request: Request, call_next):
+    # A startup profile is read from Supabase at most once while handling one request
+    if not dm:
+        return await call_next(request)
+    with dm.profile_request_scope():
+        return await call_next(request)
+
+
 # Check if the built frontend exists
 if os.path.exists("web/dist"):
     app.mount("/static", StaticFiles(directory="web/dist"), name="static")
@@ -249,7 +301,9 @@ async def health_check():
             "database": dm is not None and dm.is_connected() if dm else False,
             "ai_agent": ea is not None,
             "conversation_memory": cm is not None
-        }
+        },
+        "insight_jobs": insight_jobs.get_stats() if insight_jobs else None,
+        "startup_vectors": dm.vector_index.get_stats() if dm and dm.vector_index else None
     }
 
 # Root endpoint
@@ -258,11 +312,11 @@ def root():
     return {"message": "Welcome To Evalve"}
 
 @app.post("/api/signup/investor")
-def create_inverstor(data: InvestorProfile):
+async def create_inverstor(data: InvestorProfile):
     if not dm:
         raise HTTPException(status_code=503, detail="Database service unavailable")
     try: 
-        new_investor_entry = dm.save_investor_profile(data.model_dump())
+        new_investor_entry = await dm.asave_investor_profile(data.model_dump())
         return {"status": "success", "id": new_investor_entry}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -283,7 +337,7 @@ async def create_entrepreneur(request: Request):
 
 
         # Save Startup
-        new_entry = dm.save_startup_profile(startup_data)
+        new_entry = await dm.asave_startup_profile(startup_data)
         startup_id = new_entry
 
         print("Database save result:", new_entry)  # Debug log
@@ -292,9 +346,12 @@ async def create_entrepreneur(request: Request):
         if new_entry is None:
             raise HTTPException(status_code=500, detail="Failed to save startup profile to database")
 
-        # Save founders if provided
+        # Save founders if provided, in a single multi-row insert
+        founders_rejected = []
         if founders_data:
-                dm.save_founders(startup_id,founders_data)
+                founders_result = await dm.asave_founders_batch(startup_id,founders_data)
+                if founders_result:
+                    founders_rejected = founders_result["rejected"]
 
                 # # Convert equityShare to float if it's a string
                 # if 'equityShare' in founder_data and founder_data['equityShare']:
@@ -307,23 +364,39 @@ async def create_entrepreneur(request: Request):
                 # if 'linkedIn' in founder_data:
                 #     founder_data['linkedin_profile'] = founder_data.pop('linkedIn')
 
-        return {"status": "success", "id": new_entry}
+        # Into the memory graph with the founders just saved, for graph context and similar startups
+        await asyncio.to_thread(dm.sync_memory_graph, [startup_id])
+
+        # Generate the insight now so the first investor to open the profile does not wait for it,
+        # only once the founders are stored: the insight is generated from the full profile
+        if insight_jobs:
+            insight_jobs.enqueue(startup_id, reason="signup")
+
+        return {"status": "success", "id": new_entry, "founders_rejected": founders_rejected}
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/startups", response_model=List[Dict[str, Any]])
-def get_all_startup(
+async def get_all_startup(
+    response: Response,
     limit: int = 50,
     industry_sector: Optional[str] = None,
     stage: Optional[str] = None,
-    funding_stage: Optional[str] = None
+    funding_stage: Optional[str] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False
     ):
 
-    """ Get all Startup Profile With Filters"""
+    """ Get all Startup Profile With Filters, one page per call (X-Next-Cursor) or every match as NDJSON with stream=true"""
     if not dm:
         raise HTTPException(status_code=503, detail="Database service unavailable")
+    if cursor:
+        try:
+            dm.decode_startup_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
         filters = {}
         if industry_sector:
@@ -332,26 +405,90 @@ def get_all_startup(
             filters['stage'] = stage
         if funding_stage:
             filters['funding_stage'] = funding_stage
+
+        if stream:
+            # One startup per line, pages of `limit` are fetched only as the client reads
+            async def ndjson_lines():
+                last = None
+                try:
+                    async for startup in dm.aiter_startups(filters=filters, page_size=limit, cursor=cursor):
+                        last = startup
+                        yield json.dumps(startup, default=str) + "\n"
+                except Exception as e:
+                    # Headers are already sent, so a final error line marks the listing as incomplete
+                    resume = dm.encode_startup_cursor(last) if last else cursor
+                    yield json.dumps({"error": f"Error fetching startups: {str(e)}", "cursor": resume}) + "\n"
+
+            return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
             
-        response = dm.get_all_startups(filters=filters, limit=limit)
-        return response
+        startups, next_cursor = await dm.aget_startups_page(filters=filters, limit=limit, cursor=cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return startups
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching startups: {str(e)}")
 
 
+# Declared before /api/startups/{startup_id} so "search" is not taken for an id
+@app.get("/api/startups/search", response_model=List[Dict[str, Any]])
+async def search_startups(
+    q: str,
+    limit: int = 20,
+    mode: str = "hybrid",
+    industry_sector: Optional[str] = None,
+    stage: Optional[str] = None,
+    funding_stage: Optional[str] = None,
+    location_city: Optional[str] = None,
+    min_funding: Optional[float] = None,
+    max_funding: Optional[float] = None
+    ):
+    """Search startups by name, industry, or description, ranked by relevance
+
+    mode=hybrid fuses keyword and semantic (problem, solution, target market) rankings, keyword or semantic use one.
+    Filters match the /api/startups listing filters and are applied before ranking."""
+    if not dm:
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    if mode not in STARTUP_SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(STARTUP_SEARCH_MODES)}")
+    
+    try:
+        filters = {key: value for key, value in (
+            ('industry_sector', industry_sector), ('stage', stage), ('funding_stage', funding_stage),
+            ('location_city', location_city), ('min_funding', min_funding), ('max_funding', max_funding)) if value is not None}
+        results = await dm.asearch_startups(q, limit=limit, filters=filters, mode=mode)
+        return results
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching startups: {str(e)}")
+
+
 @app.get("/api/startups/{startup_id}")
-def get_specific_startup(startup_id:str):
+async def get_specific_startup(startup_id:str):
     """ Get Specific Startup Profile And Insights"""
     if not dm or not ea:
         raise HTTPException(status_code=503, detail="Required services unavailable")
     try:
-        specific_profile = dm.get_startup_by_name_or_id(startup_id)
+        specific_profile = await dm.aget_startup_by_name_or_id(startup_id)
 
         if not specific_profile:
             raise HTTPException(status_code=404, detail="Startup not found")
 
         try:
-            specific_profile_insights = ea.get_startup_insight(specific_profile)
+            if insight_jobs and insight_jobs.running:
+                # Served from the precomputed insight, a missing one is queued rather than generated here
+                specific_profile_insights = await ea.aget_precomputed_insight(specific_profile)
+                if specific_profile_insights is not None:
+                    specific_profile_insights = {"response": specific_profile_insights}
+                else:
+                    cache_key = ea.insight_cache_key(specific_profile)
+                    if insight_jobs.failed_recently(specific_profile['startup_id'], cache_key):
+                        # Every attempt failed a moment ago, page views do not buy more LLM calls
+                        specific_profile_insights = {"status": "failed", "error": "Insights could not be generated for this startup, they will be retried later"}
+                    else:
+                        insight_jobs.enqueue(specific_profile['startup_id'], reason="read_miss", cache_key=cache_key)
+                        specific_profile_insights = {"status": "pending", "error": "Insights are being generated, please check back shortly"}
+            else:
+                # The fetched profile is passed on so the insight does not query it again
+                specific_profile_insights = await ea.aget_startup_insight(specific_profile)
         except Exception as e:
             print(f"Error getting insights: {e}")
             specific_profile_insights = {"error": "Could not generate insights"}
@@ -367,20 +504,20 @@ def get_specific_startup(startup_id:str):
 
 
 @app.post("/api/startups/{startup_id}/chat", response_model=ChatResponse)
-def specific_profile_chat(startup_id:str, req: ChatModel):
+async def specific_profile_chat(startup_id:str, req: ChatModel):
     """ Chat about that Specific Startup Profile"""
 
     if not dm or not ea or not cm:
         raise HTTPException(status_code=503, detail="Required services unavailable")
     
     try:
-        startup_profile = dm.get_startup_by_name_or_id(startup_id)
+        startup_profile = await dm.aget_startup_by_name_or_id(startup_id)
         if not startup_profile:
             raise HTTPException(status_code=404, detail="Startup not found")
 
-        session_id = req.session_id or cm._generate_session_id()
+        session_id = req.session_id or cm.new_session_id()
 
-        response = ea.get_startup_chatbot(req.query,startup_id,session_id)
+        response = await ea.aget_startup_chatbot(req.query, startup_profile, session_id)
 
         return ChatResponse(
             response=response,
@@ -394,17 +531,63 @@ def specific_profile_chat(startup_id:str, req: ChatModel):
         raise HTTPException(status_code=500, detail=f"Error in chat: {str(e)}")
     
 
-@app.get("/api/startups/search", response_model=List[Dict[str, Any]])
-def search_startups(q: str, limit: int = 20):
-    """Search startups by name, industry, or description"""
-    if not dm:
-        raise HTTPException(status_code=503, detail="Database service unavailable")
-    
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/startups/{startup_id}/chat/stream")
+async def specific_profile_chat_stream(startup_id:str, req: ChatModel):
+    """ Stream the chat answer about a Specific Startup as Server-Sent Events"""
+
+    if not dm or not ea or not cm:
+        raise HTTPException(status_code=503, detail="Required services unavailable")
+
+    startup_profile = await dm.aget_startup_by_name_or_id(startup_id)
+    if not startup_profile:
+        raise HTTPException(status_code=404, detail="Startup not found")
+
+    session_id = req.session_id or cm.new_session_id()
+
+    async def event_stream():
+        async for token in ea.astream_startup_chatbot(req.query, startup_profile, session_id):
+            yield _sse_event("token", {"content": token})
+        yield _sse_event("done", {"session_id": session_id, "startup_id": startup_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/api/startups/{startup_id}/chat/ws")
+async def specific_profile_chat_ws(websocket: WebSocket, startup_id: str):
+    """ Chat about a Specific Startup over a WebSocket, one JSON message per token"""
+    await websocket.accept()
+
+    if not dm or not ea or not cm:
+        await websocket.send_json({"type": "error", "detail": "Required services unavailable"})
+        await websocket.close(code=1011)
+        return
+
     try:
-        results = dm.search_startups(q, limit=limit)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error searching startups: {str(e)}")
+        while True:
+            message = await websocket.receive_json()
+            query = (message.get("query") or "").strip()
+            if not query:
+                await websocket.send_json({"type": "error", "detail": "Empty query"})
+                continue
+
+            session_id = message.get("session_id") or cm.new_session_id()
+
+            async for token in ea.astream_startup_chatbot(query, startup_id, session_id):
+                await websocket.send_json({"type": "token", "content": token})
+
+            await websocket.send_json({"type": "done", "session_id": session_id, "startup_id": startup_id})
+
+    except WebSocketDisconnect:
+        pass
 
 
 # Serve the React app for non-API routes (SPA routing)
@@ -2,9 +2,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-from database.DatabaseManager import DatabaseManager
+from database.DatabaseManager import DatabaseManager, get_db_manager
+from conversation_mem.history_index import ExchangeIndex, tokenize
+from conversation_mem.summarizer import ExtractiveSummarizer
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Any, Optional, Callable
 import uuid
 import json
 from dataclasses import dataclass
@@ -27,10 +31,16 @@ class ConversationRecord:
 class ConversationMemory:
     """Enhanced conversation memory management for AI agents"""
     
-    def __init__(self,session_id: str = None):
-        self.history = []
-        self.context_window = 15  # Increased for better context
-        self.db_manager = DatabaseManager(SUPABASE_URL,SUPABASE_KEY)
+    def __init__(self, session_id: str = None, db_manager: DatabaseManager = None,
+                 summarizer: Callable[[str, Dict[str, Any]], str] = None, context_window: int = 15):
+        self.context_window = context_window  # Increased for better context
+        self.history = deque(maxlen=self.context_window)
+        self.history_index = ExchangeIndex()  # Exchanges in the window, tokenized once
+        # Exchanges leaving the window are folded into a running summary instead of being lost
+        self.summarizer = summarizer or ExtractiveSummarizer()
+        self.summary = ""
+        self.summarized_exchanges = 0
+        self.db_manager = db_manager or get_db_manager()
         self.session_id = session_id or self._generate_session_id()
         self.current_startup_id = None
         self.conversation_metadata = {
@@ -39,7 +49,8 @@ class ConversationMemory:
             "startup_focused": False
         }
     
-    def _generate_session_id(self) -> str:
+    @staticmethod
+    def _generate_session_id() -> str:
         """Generate unique session ID"""
         return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
@@ -49,6 +60,68 @@ class ConversationMemory:
         self.conversation_metadata["startup_focused"] = True
         print(f"📍 Conversation context set to startup: {startup_id}")
     
+    def _index_exchange(self, exchange: Dict[str, Any]):
+        self.history_index.add(exchange["id"], tokenize(f"{exchange['query']} {exchange['response']}"), exchange)
+
+    def _push_exchange(self, exchange: Dict[str, Any]):
+        """Append to the sliding window, compacting the exchange it pushes out"""
+        if len(self.history) == self.history.maxlen:
+            self._compact_exchange(self.history[0])
+        self.history.append(exchange)
+        self._index_exchange(exchange)
+
+    def _compact_exchange(self, exchange: Dict[str, Any]):
+        self.history_index.remove(exchange["id"])
+        try:
+            self.summary = self.summarizer(self.summary, exchange)
+            self.summarized_exchanges += 1
+        except Exception as e:
+            print(f"⚠️ Failed to summarize evicted exchange: {str(e)}")
+
+    def recent_exchanges(self, count: int) -> List[Dict]:
+        """Last count exchanges, oldest first"""
+        if count <= 0:
+            return []
+        return list(islice(reversed(self.history), count))[::-1]
+
+    def _append_exchange(self,
+                         query: str,
+                         response: str,
+                         context: str = None,
+                         agent_type: str = "chatbot",
+                         query_intent: str = "",
+                         user_id: str = None) -> Optional[ConversationRecord]:
+        """Add an exchange to the in-memory window, returns the record to persist"""
+        exchange = {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now().isoformat(),
+            "query": query.strip(),
+            "response": response.strip(),
+            "context": context or "",
+            "agent_type": agent_type,
+            "query_intent": query_intent,
+            "startup_id": self.current_startup_id,
+            "user_id": user_id,
+            "session_id": self.session_id
+        }
+        
+        self._push_exchange(exchange)
+        self.conversation_metadata["total_exchanges"] += 1
+        
+        if not self.db_manager or not self.db_manager.is_connected():
+            return None
+
+        return ConversationRecord(
+            session_id=self.session_id,
+            user_query=query,
+            agent_response=response,
+            startup_id=self.current_startup_id,
+            user_id=user_id,
+            context_used=context or "",
+            query_intent=query_intent,
+            agent_type=agent_type
+        )
+
     def add_exchange(self, 
                     query: str, 
                     response: str, 
@@ -63,44 +136,36 @@ class ConversationMemory:
             return False
         
         try:
-            exchange = {
-                "id": str(uuid.uuid4()),
-                "timestamp": datetime.now().isoformat(),
-                "query": query.strip(),
-                "response": response.strip(),
-                "context": context or "",
-                "agent_type": agent_type,
-                "query_intent": query_intent,
-                "startup_id": self.current_startup_id,
-                "user_id": user_id,
-                "session_id": self.session_id
-            }
+            conversation_record = self._append_exchange(query, response, context, agent_type, query_intent, user_id)
             
-            self.history.append(exchange)
-            self.conversation_metadata["total_exchanges"] += 1
+            # Persisted in the background, the reply does not wait on the insert; the writer logs any spill
+            if conversation_record:
+                self.db_manager.enqueue_conversation(conversation_record)
+            
+            return True
             
-            # Maintain sliding window
-            if len(self.history) > self.context_window:
-                self.history = self.history[-self.context_window:]
+        except Exception as e:
+            print(f"❌ Error adding exchange: {str(e)}")
+            return False
+
+    async def aadd_exchange(self, 
+                    query: str, 
+                    response: str, 
+                    context: str = None,
+                    agent_type: str = "chatbot",
+                    query_intent: str = "",
+                    user_id: str = None) -> bool:
+        """Async version of add_exchange"""
+        
+        if not query.strip() or not response.strip():
+            print("⚠️ Empty query or response, skipping...")
+            return False
+        
+        try:
+            conversation_record = self._append_exchange(query, response, context, agent_type, query_intent, user_id)
             
-            # Save to database if available
-            if self.db_manager and self.db_manager.is_connected():
-                conversation_record = ConversationRecord(
-                    session_id=self.session_id,
-                    user_query=query,
-                    agent_response=response,
-                    startup_id=self.current_startup_id,
-                    user_id=user_id,
-                    context_used=context or "",
-                    query_intent=query_intent,
-                    agent_type=agent_type
-                )
-                
-                success = self.db_manager.save_conversation_with_context(conversation_record)
-                if success:
-                    print(f"💾 Conversation saved to database")
-                else:
-                    print("⚠️ Failed to save conversation to database")
+            if conversation_record:
+                await self.db_manager.aenqueue_conversation(conversation_record)
             
             return True
             
@@ -113,13 +178,16 @@ class ConversationMemory:
         if not self.history:
             return "No previous conversation history."
         
-        recent_history = self.history[-max_exchanges:]
+        recent_history = self.recent_exchanges(max_exchanges)
         context_parts = []
         
         # Add metadata if requested
         if include_metadata and self.current_startup_id:
             context_parts.append(f"[CONTEXT: Currently discussing startup {self.current_startup_id}]")
         
+        if self.summary:
+            context_parts.append(f"[Earlier in this conversation:]\n{self.summary}")
+        
         for exchange in recent_history:
             # Truncate long responses for context efficiency
             response_preview = exchange['response'][:300] + "..." if len(exchange['response']) > 300 else exchange['response']
@@ -164,53 +232,34 @@ class ConversationMemory:
                            current_query: str, 
                            max_results: int = 3,
                            min_relevance: float = 0.1) -> List[Dict]:
-        """Enhanced relevance matching with better scoring"""
+        """Most relevant exchanges for a query, BM25 over the inverted index"""
         if not self.history:
             return []
         
-        query_words = set(current_query.lower().split())
-        query_words = {word for word in query_words if len(word) > 2}  # Filter short words
-        
+        query_words = tokenize(current_query)
         if not query_words:
             return []
         
-        relevant_exchanges = []
+        # Recent conversations get slight boost
+        recent_ids = {exchange["id"] for exchange in self.recent_exchanges(5)}
         
-        for exchange in self.history:
-            # Combine query and response for matching
-            exchange_text = f"{exchange['query']} {exchange['response']}"
-            exchange_words = set(exchange_text.lower().split())
-            exchange_words = {word for word in exchange_words if len(word) > 2}
-            
-            if not exchange_words:
-                continue
-            
-            # Calculate relevance scores
-            common_words = query_words.intersection(exchange_words)
-            
-            if common_words:
-                # Multiple scoring factors
-                word_overlap = len(common_words) / len(query_words)
-                text_similarity = len(common_words) / len(exchange_words.union(query_words))
-                
-                # Boost score if same startup context
-                startup_boost = 1.5 if (exchange.get('startup_id') == self.current_startup_id and self.current_startup_id) else 1.0
-                
-                # Recent conversations get slight boost
-                time_boost = 1.2 if self.history.index(exchange) >= len(self.history) - 5 else 1.0
-                
-                relevance_score = (word_overlap * 0.6 + text_similarity * 0.4) * startup_boost * time_boost
-                
-                if relevance_score >= min_relevance:
-                    relevant_exchanges.append({
-                        **exchange,
-                        'relevance_score': relevance_score,
-                        'common_words': list(common_words)
-                    })
-        
-        # Sort by relevance and return top results
-        relevant_exchanges.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return relevant_exchanges[:max_results]
+        def boost(exchange_id, exchange):
+            # Boost score if same startup context
+            startup_boost = 1.5 if (exchange.get('startup_id') == self.current_startup_id and self.current_startup_id) else 1.0
+            time_boost = 1.2 if exchange_id in recent_ids else 1.0
+            return startup_boost * time_boost
+        
+        top_exchanges = self.history_index.top_k(query_words, max_results, min_relevance, boost)
+        
+        # Only the returned exchanges are copied
+        return [
+            {
+                **self.history_index.documents[exchange_id],
+                'relevance_score': relevance_score,
+                'common_words': common_words
+            }
+            for relevance_score, exchange_id, common_words in top_exchanges
+        ]
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get conversation statistics and summary"""
@@ -243,6 +292,7 @@ class ConversationMemory:
             "agent_types": agent_types,
             "started_at": self.conversation_metadata.get("started_at"),
             "current_startup": self.current_startup_id,
+            "summarized_exchanges": self.summarized_exchanges,
             "duration_minutes": self._calculate_duration()
         }
     
@@ -259,6 +309,37 @@ class ConversationMemory:
         except:
             return 0.0
     
+    def _merge_db_history(self, db_history: List[Dict]) -> bool:
+        """Merge database records (newest first) into the in-memory history"""
+        if not db_history:
+            return False
+
+        # Convert database records to memory format
+        for record in reversed(db_history):  # Reverse to maintain chronological order
+            exchange = {
+                "id": record.get('id', str(uuid.uuid4())),
+                "timestamp": record.get('timestamp'),
+                "query": record.get('query', ''),
+                "response": record.get('response', ''),
+                "context": record.get('context', ''),
+                "agent_type": record.get('agent_type', 'chatbot'),
+                "query_intent": record.get('query_intent', ''),
+                "startup_id": record.get('startup_id'),
+                "user_id": record.get('user_id'),
+                "session_id": record.get('session_id')
+            }
+            
+            if exchange not in self.history:  # Avoid duplicates
+                self._push_exchange(exchange)
+        
+        # Update current startup context if found
+        startup_ids = [h.get('startup_id') for h in self.history if h.get('startup_id')]
+        if startup_ids:
+            self.current_startup_id = startup_ids[-1]  # Use most recent
+        
+        print(f"📚 Loaded {len(db_history)} conversation records from database")
+        return True
+
     def load_history_from_db(self, limit: int = None) -> bool:
         """Load conversation history from database"""
         if not self.db_manager or not self.db_manager.is_connected():
@@ -270,35 +351,24 @@ class ConversationMemory:
                 self.session_id, 
                 limit or self.context_window
             )
+            return self._merge_db_history(db_history)
             
-            if db_history:
-                # Convert database records to memory format
-                for record in reversed(db_history):  # Reverse to maintain chronological order
-                    exchange = {
-                        "id": record.get('id', str(uuid.uuid4())),
-                        "timestamp": record.get('timestamp'),
-                        "query": record.get('query', ''),
-                        "response": record.get('response', ''),
-                        "context": record.get('context', ''),
-                        "agent_type": record.get('agent_type', 'chatbot'),
-                        "query_intent": record.get('query_intent', ''),
-                        "startup_id": record.get('startup_id'),
-                        "user_id": record.get('user_id'),
-                        "session_id": record.get('session_id')
-                    }
-                    
-                    if exchange not in self.history:  # Avoid duplicates
-                        self.history.append(exchange)
-                
-                # Update current startup context if found
-                startup_ids = [h.get('startup_id') for h in self.history if h.get('startup_id')]
-                if startup_ids:
-                    self.current_startup_id = startup_ids[-1]  # Use most recent
-                
-                print(f"📚 Loaded {len(db_history)} conversation records from database")
-                return True
-            
+        except Exception as e:
+            print(f"❌ Error loading conversation history: {str(e)}")
+            return False
+
+    async def aload_history_from_db(self, limit: int = None) -> bool:
+        """Async version of load_history_from_db"""
+        if not self.db_manager or not self.db_manager.is_connected():
+            print("⚠️ Database not available for loading history")
             return False
+        
+        try:
+            db_history = await self.db_manager.aget_conversation_history(
+                self.session_id, 
+                limit or self.context_window
+            )
+            return self._merge_db_history(db_history)
             
         except Exception as e:
             print(f"❌ Error loading conversation history: {str(e)}")
@@ -306,10 +376,15 @@ class ConversationMemory:
     
     def clear_history(self, keep_last: int = 0):
         """Clear conversation history, optionally keeping recent exchanges"""
-        if keep_last > 0:
-            self.history = self.history[-keep_last:]
-        else:
-            self.history = []
+        kept = self.recent_exchanges(keep_last)
+        self.history = deque(kept, maxlen=self.context_window)
+        if not kept:
+            self.summary = ""
+            self.summarized_exchanges = 0
+        
+        self.history_index.clear()
+        for exchange in self.history:
+            self._index_exchange(exchange)
         
         self.conversation_metadata["total_exchanges"] = len(self.history)
         print(f"🧹 Conversation history cleared, kept {len(self.history)} recent exchanges")
@@ -318,7 +393,8 @@ class ConversationMemory:
         """Export conversation history"""
         export_data = {
             "session_info": self.get_conversation_summary(),
-            "conversation_history": self.history
+            "conversation_summary": self.summary,
+            "conversation_history": list(self.history)
         }
         
         if format.lower() == "json":
@@ -344,7 +420,7 @@ def create_conversation_memory(db_manager: DatabaseManager = None,
                              session_id: str = None,
                              load_existing: bool = True) -> ConversationMemory:
     """Factory function to create conversation memory with proper setup"""
-    memory = ConversationMemory(db_manager, session_id)
+    memory = ConversationMemory(session_id=session_id, db_manager=db_manager)
     
     if load_existing and db_manager:
         memory.load_history_from_db()
@@ -0,0 +1,129 @@
+import re
+import math
+import heapq
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple, Callable, Optional, Set
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MIN_TOKEN_LENGTH = 3  # Words of one or two letters carry little signal
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, short words dropped"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+class ExchangeIndex:
+    """Incremental inverted index over conversation exchanges, scored with BM25"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.documents = {}  # doc_id -> payload
+        self.doc_lengths = {}  # doc_id -> token count
+        self.doc_terms = {}  # doc_id -> distinct terms, used for removal
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self.documents
+
+    def add(self, doc_id, tokens: List[str], payload: Any = None):
+        """Index a document from its tokens, replacing any previous version"""
+        if doc_id in self.documents:
+            self.remove(doc_id)
+
+        frequencies = defaultdict(int)
+        for token in tokens:
+            frequencies[token] += 1
+        for term, frequency in frequencies.items():
+            self.postings[term][doc_id] = frequency
+
+        self.documents[doc_id] = payload
+        self.doc_lengths[doc_id] = len(tokens)
+        self.doc_terms[doc_id] = tuple(frequencies)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id):
+        if doc_id not in self.documents:
+            return
+        for term in self.doc_terms.pop(doc_id):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        del self.documents[doc_id]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def clear(self):
+        self.postings.clear()
+        self.documents.clear()
+        self.doc_lengths.clear()
+        self.doc_terms.clear()
+        self.total_length = 0
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        df = self.document_frequency(term)
+        return math.log(1 + (len(self.documents) - df + 0.5) / (df + 0.5))
+
+    def totals(self, query_tokens: List[str], weights: Optional[Dict[str, float]] = None,
+               candidates: Optional[Set[Any]] = None) -> Dict[Any, float]:
+        """BM25 score of every document sharing a term with the query, terms optionally weighted
+
+        candidates limits scoring to those documents, walking whichever of it and a posting is shorter"""
+        if not self.documents or candidates is not None and not candidates:
+            return {}
+
+        average_length = self.total_length / len(self.documents) or 1.0
+        doc_lengths = self.doc_lengths
+        # BM25 term score rearranged as idf * (k1 + 1) * tf / (tf + a + c * length)
+        a = self.k1 * (1 - self.b)
+        c = self.k1 * self.b / average_length
+        totals = {}
+        for term in dict.fromkeys(query_tokens):  # Unique, in query order
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            scale = self.idf(term) * (self.k1 + 1) * (weights.get(term, 1.0) if weights else 1.0)
+            if candidates is not None:
+                if len(candidates) < len(posting):
+                    posting = {doc_id: posting[doc_id] for doc_id in candidates if doc_id in posting}
+                else:
+                    posting = {doc_id: frequency for doc_id, frequency in posting.items() if doc_id in candidates}
+            get = totals.get
+            for doc_id, frequency in posting.items():
+                totals[doc_id] = get(doc_id, 0.0) + scale * frequency / (frequency + a + c * doc_lengths[doc_id])
+        return totals
+
+    def matched_terms(self, doc_id, query_tokens: List[str]) -> List[str]:
+        return [term for term in dict.fromkeys(query_tokens) if doc_id in self.postings.get(term, ())]
+
+    def score(self, query_tokens: List[str],
+              weights: Optional[Dict[str, float]] = None) -> Dict[Any, Tuple[float, List[str]]]:
+        """BM25 score and matched terms of every document sharing a term with the query"""
+        return {doc_id: (doc_score, self.matched_terms(doc_id, query_tokens))
+                for doc_id, doc_score in self.totals(query_tokens, weights).items()}
+
+    def top_k(self, query_tokens: List[str], k: int, min_score: float = 0.0,
+              boost: Optional[Callable[[Any, Any], float]] = None,
+              weights: Optional[Dict[str, float]] = None,
+              candidates: Optional[Set[Any]] = None) -> List[Tuple[float, Any, List[str]]]:
+        """Best k documents as (score, doc_id, matched terms), highest first"""
+        if k <= 0:
+            return []
+
+        totals = self.totals(query_tokens, weights, candidates)
+        if boost is not None:
+            totals = {doc_id: doc_score * boost(doc_id, self.documents[doc_id]) for doc_id, doc_score in totals.items()}
+        candidates = [(doc_score, doc_id) for doc_id, doc_score in totals.items() if doc_score >= min_score]
+
+        # Heap selection, matched terms are only worked out for the winners
+        winners = heapq.nlargest(k, candidates, key=lambda candidate: candidate[0])
+        return [(doc_score, doc_id, self.matched_terms(doc_id, query_tokens)) for doc_score, doc_id in winners]
@@ -0,0 +1,115 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from conversation_mem.convo_mem import ConversationMemory
+
+# Bounds for the per-session conversation memories kept by one process
+CONVERSATION_SESSION_MAX = int(os.environ.get("CONVERSATION_SESSION_MAX", 10000))
+CONVERSATION_SESSION_TTL = float(os.environ.get("CONVERSATION_SESSION_TTL", 1800))
+
+
+class ConversationSessionStore:
+    """Maps session_id to its own ConversationMemory with LRU capacity and idle TTL eviction"""
+
+    def __init__(self, db_manager=None, max_sessions: int = CONVERSATION_SESSION_MAX,
+                 idle_ttl: float = CONVERSATION_SESSION_TTL):
+        self.db_manager = db_manager
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()  # session_id -> (memory, last access), least recent first
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    @staticmethod
+    def new_session_id() -> str:
+        return ConversationMemory._generate_session_id()
+
+    def get(self, session_id: str) -> ConversationMemory:
+        """Session memory for session_id, hydrated from the database on a miss"""
+        memory = self._lookup(session_id)
+        if memory is not None:
+            return memory
+
+        memory = ConversationMemory(session_id=session_id, db_manager=self.db_manager)
+        if self._can_hydrate():
+            memory.load_history_from_db()
+        return self._insert(session_id, memory)
+
+    async def aget(self, session_id: str) -> ConversationMemory:
+        """Async version of get"""
+        memory = self._lookup(session_id)
+        if memory is not None:
+            return memory
+
+        memory = ConversationMemory(session_id=session_id, db_manager=self.db_manager)
+        if self._can_hydrate():
+            await memory.aload_history_from_db()
+        return self._insert(session_id, memory)
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl,
+            **self.stats
+        }
+
+    def _can_hydrate(self) -> bool:
+        return self.db_manager is not None and self.db_manager.is_connected()
+
+    def _lookup(self, session_id: str) -> Optional[ConversationMemory]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def _insert(self, session_id: str, memory: ConversationMemory) -> ConversationMemory:
+        now = time.monotonic()
+        with self._lock:
+            # Another request may have hydrated the same session meanwhile, keep the first one
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                memory = entry[0]
+            self._sessions[session_id] = (memory, now)
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evictions"] += 1
+        return memory
+
+    def _expire(self, now: float):
+        # Entries are in access order, so idle sessions are always at the front
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            self.stats["expirations"] += 1
@@ -0,0 +1,71 @@
+import re
+from typing import List, Dict, Any
+
+from conversation_mem.history_index import tokenize
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+FACT_PATTERN = re.compile(r"\d|[$₹%]")
+
+# Terms that usually mark an investment relevant fact
+SALIENT_TERMS = {
+    "revenue", "funding", "valuation", "founder", "founders", "market", "customers", "growth",
+    "risk", "risks", "team", "profit", "burn", "runway", "investors", "investment", "equity",
+    "competition", "competitors", "margin", "users", "traction", "raise", "raised", "stage",
+}
+
+
+class ExtractiveSummarizer:
+    """Folds evicted exchanges into a fixed size summary of their most salient sentences, no LLM needed"""
+
+    def __init__(self, max_sentences: int = 8, max_sentence_chars: int = 240, duplicate_overlap: float = 0.7):
+        self.max_sentences = max_sentences
+        self.max_sentence_chars = max_sentence_chars
+        self.duplicate_overlap = duplicate_overlap
+
+    def __call__(self, summary: str, exchange: Dict[str, Any]) -> str:
+        return self.fold(summary, exchange)
+
+    def fold(self, summary: str, exchange: Dict[str, Any]) -> str:
+        """New summary covering the old one plus the evicted exchange"""
+        kept = self._parse(summary)
+        candidates = self._sentences(exchange.get('response', ''))
+        if exchange.get('query'):
+            candidates.insert(0, f"Asked: {exchange['query'].strip()}")
+
+        for sentence in candidates:
+            sentence = sentence[:self.max_sentence_chars]
+            tokens = set(tokenize(sentence))
+            if not tokens or any(self._overlap(tokens, set(tokenize(other))) >= self.duplicate_overlap for other in kept):
+                continue
+            kept.append(sentence)
+
+        if len(kept) > self.max_sentences:
+            # Keep the highest scoring sentences, newer ones win ties, in chronological order
+            ranked = sorted(range(len(kept)), key=lambda i: (self._score(kept[i]), i), reverse=True)
+            keep = sorted(ranked[:self.max_sentences])
+            kept = [kept[i] for i in keep]
+
+        return "\n".join(f"- {sentence}" for sentence in kept)
+
+    def _parse(self, summary: str) -> List[str]:
+        return [line[2:] for line in summary.splitlines() if line.startswith("- ")] if summary else []
+
+    def _sentences(self, text: str) -> List[str]:
+        return [sentence.strip(" -*#\t") for sentence in SENTENCE_PATTERN.split(text) if len(sentence.strip()) > 20]
+
+    def _score(self, sentence: str) -> float:
+        tokens = tokenize(sentence)
+        if not tokens:
+            return 0.0
+        score = 2.0 if FACT_PATTERN.search(sentence) else 0.0  # Figures and amounts
+        score += sum(1.0 for token in set(tokens) if token in SALIENT_TERMS)
+        score += 0.5 * sum(1 for word in sentence.split()[1:] if word[:1].isupper())  # Named entities
+        if sentence.startswith("Asked: "):
+            score += 1.0
+        return score / (1 + len(tokens) / 40)  # Prefer dense sentences
+
+    @staticmethod
+    def _overlap(tokens: set, other: set) -> float:
+        if not tokens or not other:
+            return 0.0
+        return len(tokens & other) / len(tokens | other)
@@ -7,17 +7,83 @@ import os
 from memory.memory import MemoryGraph
 
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import json
-from supabase import create_client
+from database.client_registry import client_registry as default_client_registry
+from database.write_behind import WriteBehindQueue, RowsRejected
+from database.profile_cache import ProfileCache
+from database.search_index import StartupSearchIndex, SEARCH_FIELD_WEIGHTS, SEARCH_RESULT_COLUMNS, SEARCH_FILTER_FIELDS, SEARCH_FUNDING_COLUMN, reciprocal_rank_fusion
+from memory.embeddings import get_embedder, startup_text, EMBEDDED_FIELDS
+from memory.vector_index import VectorIndex, PgVectorIndex
 from dataclasses import dataclass
 import uuid
+import re
+import base64
+import asyncio
+import threading
+import queue
+import time
+from collections import OrderedDict
 
 SUPABASE_DB_PASSWORD = os.environ.get("SUPABASE_DB_PASSWORD")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 SUPABASE_URL = os.environ.get("SUPABASE_URL") 
 
 memory_graph = MemoryGraph()
+
+# Where the memory graph snapshot lives (empty disables warm starts)
+MEMORY_GRAPH_SNAPSHOT_DIR = os.environ.get("MEMORY_GRAPH_SNAPSHOT_DIR", os.path.join("data", "memory_graph"))
+# Fold the delta log into a new snapshot once it has grown past this many records
+MEMORY_GRAPH_DELTA_COMPACT_RECORDS = int(os.environ.get("MEMORY_GRAPH_DELTA_COMPACT_RECORDS", 10000))
+# Snapshots older than this are rebuilt from Supabase, younger ones catch up on rows changed since (0 never rebuilds)
+MEMORY_GRAPH_MAX_AGE_SECONDS = float(os.environ.get("MEMORY_GRAPH_MAX_AGE_SECONDS", 24 * 3600))
+
+# generate_startup_id output: up to 10 upper-cased name characters, "_", 8 upper hex digits
+STARTUP_ID_PATTERN = re.compile(r"^[^\s]{0,10}_[0-9A-F]{8}$")
+STARTUP_NAME_CACHE_SIZE = 1024
+
+# Startup profiles are shared between requests for this many seconds (0 keeps them per request only)
+STARTUP_PROFILE_CACHE_TTL = float(os.environ.get("STARTUP_PROFILE_CACHE_TTL", 30))
+STARTUP_PROFILE_CACHE_SIZE = int(os.environ.get("STARTUP_PROFILE_CACHE_SIZE", 2048))
+
+# Write-behind batching of conversation inserts
+CONVERSATION_BATCH_SIZE = int(os.environ.get("CONVERSATION_BATCH_SIZE", 50))
+CONVERSATION_FLUSH_INTERVAL_MS = float(os.environ.get("CONVERSATION_FLUSH_INTERVAL_MS", 200))
+CONVERSATION_MAX_PENDING = int(os.environ.get("CONVERSATION_MAX_PENDING", 5000))
+CONVERSATION_SPILL_PATH = os.environ.get("CONVERSATION_SPILL_PATH", os.path.join("data", "conversation_spill.jsonl"))
+CONVERSATION_DEAD_LETTER_PATH = os.environ.get("CONVERSATION_DEAD_LETTER_PATH", os.path.join("data", "conversation_rejected.jsonl"))
+# SQLSTATE classes meaning the database refused the row itself (data, integrity, schema), retrying cannot help
+ROW_REJECTION_SQLSTATE_CLASSES = ("22", "23", "42")
+
+# jsonb column added by database/migrations/001_startup_insights_full_insight.sql, left out of writes until it exists
+INSIGHT_PAYLOAD_COLUMN = 'full_insight'
+# PostgREST and Postgres codes for a column the table does not have
+MISSING_COLUMN_CODES = ("PGRST204", "42703")
+
+# Seconds between pulls of changed profiles into the local search index
+STARTUP_SEARCH_REFRESH_SECONDS = float(os.environ.get("STARTUP_SEARCH_REFRESH_SECONDS", 60))
+STARTUP_SEARCH_PAGE_SIZE = 1000
+# Each refresh re-reads this far behind the watermark: commits land out of updated_at order and clocks differ
+STARTUP_SEARCH_REFRESH_OVERLAP_SECONDS = float(os.environ.get("STARTUP_SEARCH_REFRESH_OVERLAP_SECONDS", 300))
+
+# Semantic search vectors: "local" keeps them in a memory-mapped file, "pgvector" in Postgres
+STARTUP_VECTOR_BACKEND = os.environ.get("STARTUP_VECTOR_BACKEND", "local")
+STARTUP_VECTOR_DIR = os.environ.get("STARTUP_VECTOR_DIR", os.path.join("data", "startup_vectors"))
+STARTUP_VECTOR_DB_URL = os.environ.get("STARTUP_VECTOR_DB_URL")
+STARTUP_EMBED_BATCH_SIZE = 256
+# Local vectors embedded between refreshes are written to disk at most this often
+STARTUP_VECTOR_SAVE_SECONDS = float(os.environ.get("STARTUP_VECTOR_SAVE_SECONDS", 30))
+
+# Hybrid search fuses keyword and semantic rankings this many times deeper than the page asked for
+STARTUP_SEARCH_MODES = ("hybrid", "keyword", "semantic")
+STARTUP_HYBRID_DEPTH = int(os.environ.get("STARTUP_HYBRID_DEPTH", 3))
+
+# Largest page a startup listing request may ask for
+STARTUP_PAGE_MAX = 500
+
+# Columns returned by startup listings
+STARTUP_SUMMARY_COLUMNS = 'startup_id, company_name, industry_sector, stage, funding_stage, location_city, location_state, monthly_revenue, funding_amount_required, team_size, created_at'
+
 # Data Classes
 
 @dataclass
@@ -57,23 +123,38 @@ class ConversationRecord:
 class DatabaseManager:
     """Enhanced database manager for startup platform with AI agent integration"""
     
-    def __init__(self, SUPABASE_URL: str, SUPABASE_KEY: str,):
+    def __init__(self, SUPABASE_URL: str, SUPABASE_KEY: str, client_registry=None):
         self._state = "connected" 
         self.supabase_url = SUPABASE_URL
         self.supabase_key = SUPABASE_KEY
         self.memory_graph = memory_graph
+        self.client_registry = client_registry or default_client_registry
         self.supabase = None
+        self.async_supabase = None
         self.connected = False
+        self._conversation_writer = None  # Started on the first queued conversation
+        self._writer_lock = threading.Lock()
+        self._startup_id_by_name = OrderedDict()  # Resolved company name -> startup_id
+        self._insight_payload_column = True  # Cleared the first time an insert finds full_insight missing
+        self._name_cache_lock = threading.Lock()
+        self.profile_cache = ProfileCache(ttl=STARTUP_PROFILE_CACHE_TTL, max_entries=STARTUP_PROFILE_CACHE_SIZE)
+        self.search_index = StartupSearchIndex()  # Filled by build_search_index
+        self._embedder = None  # Loaded on first use, managers that never embed never load a model
+        self.vector_index = None  # Opened by build_search_index, so only the serving process writes vectors
+        self._embed_queue = queue.Queue()  # Signups waiting for their vector
+        self._embed_thread = None
+        self._embed_thread_lock = threading.Lock()
+        self._vectors_dirty = False
+        self._vectors_saved_at = 0.0
+        self._profile_listeners = []  # Called with (startup_id, reason) when a refresh finds a changed profile
         self._init_connection()
     
     def _init_connection(self):
         """Initialize Supabase connection with error handling"""
         try:
-            self.supabase = create_client(self.supabase_url, self.supabase_key)
-            # Test connection
-            test_result = self.supabase.table('startup_profiles').select('startup_id').limit(1).execute()
+            # Clients are pooled per process, only the first manager pays for the handshake
+            self.supabase = self.client_registry.get_client(self.supabase_url, self.supabase_key)
             self.connected = True
-            print("✅ Database connection successful")
         except Exception as e:
             print(f"❌ Database connection failed: {str(e)}")
             self.connected = False
@@ -82,6 +163,12 @@ class DatabaseManager:
     def is_connected(self) -> bool:
         """Check if database is connected"""
         return self.connected and self.supabase is not None
+
+    async def _get_async_client(self):
+        """Get the shared async Supabase client from the registry"""
+        if self.async_supabase is None:
+            self.async_supabase = await self.client_registry.aget_client(self.supabase_url, self.supabase_key)
+        return self.async_supabase
     
         
     def get_conversation_history(self, session_id: str, limit: int = 10):
@@ -95,6 +182,18 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error getting conversation history: {e}")
             return []
+
+    async def aget_conversation_history(self, session_id: str, limit: int = 10):
+        """Async version of get_conversation_history"""
+        try:
+            client = await self._get_async_client()
+            response = await client.table('conversation_history').select('*').eq('session_id', session_id).order('created_at', desc=True).limit(limit).execute()
+            
+            return response.data if response.data else []
+                
+        except Exception as e:
+            print(f"Error getting conversation history: {e}")
+            return []
     # =================== INVESTOR PROFILE MANAGEMENT ===================
 
     def generate_investor_id(self, investor_name: str) -> str:
@@ -104,39 +203,43 @@ class DatabaseManager:
         return f"INV_{base_id}_{unique_suffix}"
 
     
-    def save_investor_profile(self, investor_data: Dict[str, Any]) -> Optional[str]:
-        """Save complete Investor profile to database with validation"""
-        if not self.is_connected():
-            print("❌ Database not connected")
-            return None
-        
+    def _build_investor_row(self, investor_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate investor data and build the investor_profiles row, None if invalid"""
         # Validate required fields
         required_fields = ['name', 'phone', 'email','location']
         for field in required_fields:
             if not investor_data.get(field):
                 print(f"❌ Missing required field: {field}")
                 return None
+
+        # Generate investor_id if not provided
+        if not investor_data.get('investor_id'):
+            investor_data['investor_id'] = self.generate_investor_id(investor_data['name'])
+        
+        # Prepare Investor profile data with proper JSON serialization
+        return {
+            'investor_id': investor_data['investor_id'],
+            'name': investor_data.get('name'),
+            'email': investor_data.get('email'),
+            'phone': investor_data.get('phone'),
+            'location': investor_data.get('location'),
+            'type': investor_data.get('type'),
+            'min_investment': investor_data.get('min_investment'),
+            'max_investment': investor_data.get('max_investment'),
+            'preferred_industries': investor_data.get('preferred_industries'),
+            'geographic_focus': investor_data.get('geographic_focus'),
+        }
+
+    def save_investor_profile(self, investor_data: Dict[str, Any]) -> Optional[str]:
+        """Save complete Investor profile to database with validation"""
+        if not self.is_connected():
+            print("❌ Database not connected")
+            return None
             
         try:
-            # Generate investor_id if not provided
-            if not investor_data.get('investor_id'):
-                investor_data['investor_id'] = self.generate_investor_id(investor_data['name'])
-            
-            # Prepare Investor profile data with proper JSON serialization
-            profile_data = {
-                'investor_id': investor_data['investor_id'],
-                'name': investor_data.get('name'),
-                'email': investor_data.get('email'),
-                'phone': investor_data.get('phone'),
-                'location': investor_data.get('location'),
-                'type': investor_data.get('type'),
-                'min_investment': investor_data.get('min_investment'),
-                'max_investment': investor_data.get('max_investment'),
-                'preferred_industries': investor_data.get('preferred_industries'),
-                'geographic_focus': investor_data.get('geographic_focus'),
-    
-
-            }
+            profile_data = self._build_investor_row(investor_data)
+            if profile_data is None:
+                return None
             
             # Insert Investor profile
             result = self.supabase.table('investor_profiles').insert(profile_data).execute()
@@ -147,7 +250,33 @@ class DatabaseManager:
                 
             investor_id = result.data[0]['investor_id']
             print(f"✅ Investor profile saved with ID: {investor_id}")
-    
+            
+            return investor_id
+            
+        except Exception as e:
+            print(f"❌ Error saving Investor profile: {str(e)}")
+            return None
+
+    async def asave_investor_profile(self, investor_data: Dict[str, Any]) -> Optional[str]:
+        """Async version of save_investor_profile"""
+        if not self.is_connected():
+            print("❌ Database not connected")
+            return None
+            
+        try:
+            profile_data = self._build_investor_row(investor_data)
+            if profile_data is None:
+                return None
+            
+            client = await self._get_async_client()
+            result = await client.table('investor_profiles').insert(profile_data).execute()
+            
+            if not result.data:
+                print("❌ Failed to insert Investor profile")
+                return None
+                
+            investor_id = result.data[0]['investor_id']
+            print(f"✅ Investor profile saved with ID: {investor_id}")
             
             return investor_id
             
@@ -165,79 +294,85 @@ class DatabaseManager:
         unique_suffix = str(uuid.uuid4())[:8].upper()
         return f"{base_id}_{unique_suffix}"
     
-    def save_startup_profile(self, startup_data: Dict[str, Any]) -> Optional[str]:
-        """Save complete startup profile to database with validation"""
-        if not self.is_connected():
-            print("❌ Database not connected")
-            return None
-        
+    def _build_startup_row(self, startup_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate startup data and build the startup_profiles row, None if invalid"""
         # Validate required fields
         required_fields = ['company_name', 'industry_sector', 'contact_email']
         for field in required_fields:
             if not startup_data.get(field):
                 print(f"❌ Missing required field: {field}")
                 return None
+
+        # Generate startup_id if not provided
+        if not startup_data.get('startup_id'):
+            startup_data['startup_id'] = self.generate_startup_id(startup_data['company_name'])
+        
+        # Prepare startup profile data with proper JSON serialization
+        return {
+            'startup_id': startup_data['startup_id'],
+            'company_name': startup_data.get('company_name'),
+            'brand_name': startup_data.get('brand_name', startup_data.get('company_name')),
+            'registration_status': startup_data.get('registration_status', 'Unregistered'),
+            'industry_sector': startup_data.get('industry_sector'),
+            'stage': startup_data.get('stage', 'Idea'),
+            'location_city': startup_data.get('location_city', ''),
+            'location_state': startup_data.get('location_state', ''),
+            'website': startup_data.get('website'),
+            'contact_email': startup_data.get('contact_email'),
+            'contact_phone': startup_data.get('contact_phone'),
+            
+            # Business Model & Product
+            'problem_statement': startup_data.get('problem_statement', ''),
+            'solution_description': startup_data.get('solution_description', ''),
+            'target_market': startup_data.get('target_market', ''),
+            'revenue_model': startup_data.get('revenue_model', ''),
+            'pricing_strategy': startup_data.get('pricing_strategy', ''),
+            'competitive_advantage': startup_data.get('competitive_advantage', ''),
+            
+            # Market & Traction (with safe conversions)
+            'market_size_tam': self._safe_float_conversion(startup_data.get('market_size_tam')),
+            'market_size_sam': self._safe_float_conversion(startup_data.get('market_size_sam')),
+            'current_customers': self._safe_int_conversion(startup_data.get('current_customers', 0)),
+            'monthly_revenue': self._safe_float_conversion(startup_data.get('monthly_revenue', 0)),
+            'growth_rate': self._safe_float_conversion(startup_data.get('growth_rate')),
+            'key_achievements': self._safe_json_conversion(startup_data.get('key_achievements', [])),
+            
+            # Financial Information
+            'monthly_burn_rate': self._safe_float_conversion(startup_data.get('monthly_burn_rate')),
+            'current_cash_position': self._safe_float_conversion(startup_data.get('current_cash_position')),
+            'revenue_projections': self._safe_json_conversion(startup_data.get('revenue_projections', {})),
+            'break_even_timeline': startup_data.get('break_even_timeline'),
+            
+            # Funding Requirements
+            'funding_amount_required': self._safe_float_conversion(startup_data.get('funding_amount_required', 0)),
+            'funding_stage': startup_data.get('funding_stage', 'Pre-seed'),
+            'previous_funding': self._safe_float_conversion(startup_data.get('previous_funding', 0)),
+            'use_of_funds': self._safe_json_conversion(startup_data.get('use_of_funds', {})),
+            'equity_dilution': self._safe_float_conversion(startup_data.get('equity_dilution')),
+            'valuation_expectations': self._safe_float_conversion(startup_data.get('valuation_expectations')),
+            
+            # Team & Operations
+            'team_size': self._safe_int_conversion(startup_data.get('team_size', 1)),
+            'technology_stack': self._safe_json_conversion(startup_data.get('technology_stack', [])),
+            'operational_metrics': self._safe_json_conversion(startup_data.get('operational_metrics', {})),
+            
+            # Metadata
+            'is_active': True,
+            'is_verified': False,
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+
+    def save_startup_profile(self, startup_data: Dict[str, Any]) -> Optional[str]:
+        """Save complete startup profile to database with validation"""
+        if not self.is_connected():
+            print("❌ Database not connected")
+            return None
             
         try:
-            # Generate startup_id if not provided
-            if not startup_data.get('startup_id'):
-                startup_data['startup_id'] = self.generate_startup_id(startup_data['company_name'])
-            
-            # Prepare startup profile data with proper JSON serialization
-            profile_data = {
-                'startup_id': startup_data['startup_id'],
-                'company_name': startup_data.get('company_name'),
-                'brand_name': startup_data.get('brand_name', startup_data.get('company_name')),
-                'registration_status': startup_data.get('registration_status', 'Unregistered'),
-                'industry_sector': startup_data.get('industry_sector'),
-                'stage': startup_data.get('stage', 'Idea'),
-                'location_city': startup_data.get('location_city', ''),
-                'location_state': startup_data.get('location_state', ''),
-                'website': startup_data.get('website'),
-                'contact_email': startup_data.get('contact_email'),
-                'contact_phone': startup_data.get('contact_phone'),
-                
-                # Business Model & Product
-                'problem_statement': startup_data.get('problem_statement', ''),
-                'solution_description': startup_data.get('solution_description', ''),
-                'target_market': startup_data.get('target_market', ''),
-                'revenue_model': startup_data.get('revenue_model', ''),
-                'pricing_strategy': startup_data.get('pricing_strategy', ''),
-                'competitive_advantage': startup_data.get('competitive_advantage', ''),
-                
-                # Market & Traction (with safe conversions)
-                'market_size_tam': self._safe_float_conversion(startup_data.get('market_size_tam')),
-                'market_size_sam': self._safe_float_conversion(startup_data.get('market_size_sam')),
-                'current_customers': self._safe_int_conversion(startup_data.get('current_customers', 0)),
-                'monthly_revenue': self._safe_float_conversion(startup_data.get('monthly_revenue', 0)),
-                'growth_rate': self._safe_float_conversion(startup_data.get('growth_rate')),
-                'key_achievements': self._safe_json_conversion(startup_data.get('key_achievements', [])),
-                
-                # Financial Information
-                'monthly_burn_rate': self._safe_float_conversion(startup_data.get('monthly_burn_rate')),
-                'current_cash_position': self._safe_float_conversion(startup_data.get('current_cash_position')),
-                'revenue_projections': self._safe_json_conversion(startup_data.get('revenue_projections', {})),
-                'break_even_timeline': startup_data.get('break_even_timeline'),
-                
-                # Funding Requirements
-                'funding_amount_required': self._safe_float_conversion(startup_data.get('funding_amount_required', 0)),
-                'funding_stage': startup_data.get('funding_stage', 'Pre-seed'),
-                'previous_funding': self._safe_float_conversion(startup_data.get('previous_funding', 0)),
-                'use_of_funds': self._safe_json_conversion(startup_data.get('use_of_funds', {})),
-                'equity_dilution': self._safe_float_conversion(startup_data.get('equity_dilution')),
-                'valuation_expectations': self._safe_float_conversion(startup_data.get('valuation_expectations')),
-                
-                # Team & Operations
-                'team_size': self._safe_int_conversion(startup_data.get('team_size', 1)),
-                'technology_stack': self._safe_json_conversion(startup_data.get('technology_stack', [])),
-                'operational_metrics': self._safe_json_conversion(startup_data.get('operational_metrics', {})),
-                
-                # Metadata
-                'is_active': True,
-                'is_verified': False,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
+            profile_data = self._build_startup_row(startup_data)
+            if profile_data is None:
+                return None
             
             # Insert startup profile
             result = self.supabase.table('startup_profiles').insert(profile_data).execute()
@@ -245,6 +380,7 @@ class DatabaseManager:
             if not result.data:
                 print("❌ Failed to insert startup profile")
                 return None
+            self._index_startup(result.data[0])
                 
             startup_id = result.data[0]['startup_id']
             print(f"✅ Startup profile saved with ID: {startup_id}")
@@ -262,6 +398,40 @@ class DatabaseManager:
         except Exception as e:
             print(f"❌ Error saving startup profile: {str(e)}")
             return None
+
+    async def asave_startup_profile(self, startup_data: Dict[str, Any]) -> Optional[str]:
+        """Async version of save_startup_profile"""
+        if not self.is_connected():
+            print("❌ Database not connected")
+            return None
+            
+        try:
+            profile_data = self._build_startup_row(startup_data)
+            if profile_data is None:
+                return None
+            
+            client = await self._get_async_client()
+            result = await client.table('startup_profiles').insert(profile_data).execute()
+            
+            if not result.data:
+                print("❌ Failed to insert startup profile")
+                return None
+            self._index_startup(result.data[0])
+                
+            startup_id = result.data[0]['startup_id']
+            print(f"✅ Startup profile saved with ID: {startup_id}")
+            
+            if startup_data.get('founders'):
+                await self.asave_founders(startup_id, startup_data['founders'])
+            
+            if startup_data.get('team_members'):
+                await self.asave_team_members(startup_id, startup_data['team_members'])
+            
+            return startup_id
+            
+        except Exception as e:
+            print(f"❌ Error saving startup profile: {str(e)}")
+            return None
     
     # =================== UTILITY METHODS ===================
     
@@ -302,6 +472,7 @@ class DatabaseManager:
             startup_data = self.get_startup_profile(startup_id)
             if not startup_data:
                 return None
+            startup_data = dict(startup_data)  # The cached profile stays unparsed
             
             # Parse JSON fields for AI processing
             startup_data['key_achievements'] = json.loads(startup_data.get('key_achievements', '[]'))
@@ -316,58 +487,208 @@ class DatabaseManager:
             print(f"Error getting startup for insights: {str(e)}")
             return None
     
+    def _build_insight_row(self, startup_id: str, insights_data: Dict[str, Any], generated_at: str = None) -> Dict[str, Any]:
+        """Build a startup_insights row from generated insights"""
+        row = {
+            'startup_id': startup_id,
+            'executive_summary': insights_data.get('executive_summary'),
+            'key_strengths': json.dumps(insights_data.get('key_strengths', [])),
+            'major_risks': json.dumps(insights_data.get('major_risks', [])),
+            'market_analysis': insights_data.get('market_analysis'),
+            'financial_outlook': insights_data.get('financial_outlook'),
+            'investment_recommendation': insights_data.get('investment_recommendation'),
+            'recommendation_score': insights_data.get('recommendation_score'),
+            'generated_by': insights_data.get('generated_by', 'AI_Agent_v1'),
+            'generated_at': generated_at or datetime.now().isoformat(),
+            'is_current': True
+        }
+        if self._insight_payload_column:
+            # jsonb: the full parsed insight, so cache reads after a restart match in-memory ones
+            row[INSIGHT_PAYLOAD_COLUMN] = insights_data.get(INSIGHT_PAYLOAD_COLUMN)
+        return row
+
+    def _drop_insight_payload(self, error: Exception, rows: List[Dict[str, Any]]) -> bool:
+        """On a missing full_insight column stop writing it and strip it from rows, False for any other error"""
+        code = getattr(error, 'code', None)
+        message = str(getattr(error, 'message', None) or error)
+        if code not in MISSING_COLUMN_CODES or INSIGHT_PAYLOAD_COLUMN not in message:
+            return False
+        if self._insight_payload_column:
+            self._insight_payload_column = False
+            print(f"⚠️ startup_insights has no {INSIGHT_PAYLOAD_COLUMN} column, saving the mapped columns only "
+                  f"(run database/migrations/001_startup_insights_full_insight.sql)")
+        for row in rows:
+            row.pop(INSIGHT_PAYLOAD_COLUMN, None)
+        return True
+
+    def _insert_insights(self, client, rows: List[Dict[str, Any]]):
+        try:
+            return client.table('startup_insights').insert(rows).execute()
+        except Exception as e:
+            if not self._drop_insight_payload(e, rows):
+                raise
+            return client.table('startup_insights').insert(rows).execute()
+
+    async def _ainsert_insights(self, client, rows: List[Dict[str, Any]]):
+        try:
+            return await client.table('startup_insights').insert(rows).execute()
+        except Exception as e:
+            if not self._drop_insight_payload(e, rows):
+                raise
+            return await client.table('startup_insights').insert(rows).execute()
+
+    def _parse_insight_row(self, insights: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse JSON fields of a startup_insights row"""
+        insights['key_strengths'] = json.loads(insights.get('key_strengths', '[]'))
+        insights['major_risks'] = json.loads(insights.get('major_risks', '[]'))
+        return insights
+
     def save_startup_insights(self, startup_id: str, insights_data: Dict[str, Any]) -> Optional[str]:
         """Save AI-generated insights for a startup"""
         if not self.is_connected():
             return None
             
         try:
-            # Mark previous insights as not current
-            self.supabase.table('startup_insights')\
-                .update({'is_current': False})\
-                .eq('startup_id', startup_id)\
-                .execute()
-            
             # Insert new insights
-            insight_data = {
-                'startup_id': startup_id,
-                'executive_summary': insights_data.get('executive_summary'),
-                'key_strengths': json.dumps(insights_data.get('key_strengths', [])),
-                'major_risks': json.dumps(insights_data.get('major_risks', [])),
-                'market_analysis': insights_data.get('market_analysis'),
-                'financial_outlook': insights_data.get('financial_outlook'),
-                'investment_recommendation': insights_data.get('investment_recommendation'),
-                'recommendation_score': insights_data.get('recommendation_score'),
-                'generated_by': insights_data.get('generated_by', 'AI_Agent_v1'),
-                'generated_at': datetime.now().isoformat(),
-                'is_current': True
-            }
+            insight_data = self._build_insight_row(startup_id, insights_data)
+            
+            result = self._insert_insights(self.supabase, [insight_data])
+            # Previous insights stop being current only once the new one is stored
+            self._retire_insights_query(self.supabase, [startup_id], insight_data['generated_at']).execute()
+            return result.data[0]['id'] if result.data else None
+            
+        except Exception as e:
+            print(f"Error saving startup insights: {str(e)}")
+            return None
+
+    async def asave_startup_insights(self, startup_id: str, insights_data: Dict[str, Any]) -> Optional[str]:
+        """Async version of save_startup_insights"""
+        if not self.is_connected():
+            return None
+            
+        try:
+            client = await self._get_async_client()
+            insight_data = self._build_insight_row(startup_id, insights_data)
             
-            result = self.supabase.table('startup_insights').insert(insight_data).execute()
+            result = await self._ainsert_insights(client, [insight_data])
+            await self._retire_insights_query(client, [startup_id], insight_data['generated_at']).execute()
             return result.data[0]['id'] if result.data else None
             
         except Exception as e:
             print(f"Error saving startup insights: {str(e)}")
             return None
     
+    def _retire_insights_query(self, client, startup_ids: List[str], generated_at: str):
+        """Mark insights older than generated_at as not current, newer ones from a concurrent writer stay"""
+        return client.table('startup_insights')\
+            .update({'is_current': False})\
+            .in_('startup_id', startup_ids)\
+            .eq('is_current', True)\
+            .lt('generated_at', generated_at)
+
+    def _insight_batch_rows(self, insights: List[Tuple[str, Dict[str, Any]]]):
+        # One timestamp for the batch, it is what separates the new rows from the ones they replace
+        generated_at = datetime.now().isoformat()
+        rows = [self._build_insight_row(startup_id, insights_data, generated_at) for startup_id, insights_data in insights]
+        return rows, generated_at
+
+    @staticmethod
+    def _inserted_startup_ids(rows: List[Dict[str, Any]], result: Dict[str, Any]) -> List[str]:
+        rejected = {reject["index"] for reject in result["rejected"]}
+        return [row['startup_id'] for index, row in enumerate(rows) if index not in rejected]
+
+    def save_startup_insights_batch(self, insights: List[Tuple[str, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Save (startup_id, insights_data) pairs: one multi-row insert, then one update retiring what they replace"""
+        if not self.is_connected():
+            return None
+        if not insights:
+            return {"inserted": 0, "rejected": []}
+        
+        try:
+            rows, generated_at = self._insight_batch_rows(insights)
+            try:
+                self._insert_insights(self.supabase, rows)
+                result = {"inserted": len(rows), "rejected": []}
+            except Exception as e:
+                print(f"⚠️ Batch insert into startup_insights failed, retrying row by row: {str(e)}")
+                result = self._insert_batch(self.supabase, 'startup_insights', rows, list(range(len(rows))), [], batch_first=False)
+            # Only startups whose new row went in lose their current insight
+            inserted_ids = self._inserted_startup_ids(rows, result)
+            if inserted_ids:
+                self._retire_insights_query(self.supabase, inserted_ids, generated_at).execute()
+            return result
+            
+        except Exception as e:
+            print(f"Error saving startup insights batch: {str(e)}")
+            return None
+
+    async def asave_startup_insights_batch(self, insights: List[Tuple[str, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Async version of save_startup_insights_batch"""
+        if not self.is_connected():
+            return None
+        if not insights:
+            return {"inserted": 0, "rejected": []}
+        
+        try:
+            rows, generated_at = self._insight_batch_rows(insights)
+            client = await self._get_async_client()
+            try:
+                await self._ainsert_insights(client, rows)
+                result = {"inserted": len(rows), "rejected": []}
+            except Exception as e:
+                print(f"⚠️ Batch insert into startup_insights failed, retrying row by row: {str(e)}")
+                result = await self._ainsert_batch(client, 'startup_insights', rows, list(range(len(rows))), [], batch_first=False)
+            inserted_ids = self._inserted_startup_ids(rows, result)
+            if inserted_ids:
+                await self._retire_insights_query(client, inserted_ids, generated_at).execute()
+            return result
+            
+        except Exception as e:
+            print(f"Error saving startup insights batch: {str(e)}")
+            return None
+
     def get_startup_insights(self, startup_id: str) -> Optional[Dict[str, Any]]:
         """Get current AI insights for a startup"""
         if not self.is_connected():
             return None
             
         try:
+            # Newest first: a new insight is current for a moment before the one it replaces is retired
             result = self.supabase.table('startup_insights')\
                 .select('*')\
                 .eq('startup_id', startup_id)\
                 .eq('is_current', True)\
+                .order('generated_at', desc=True)\
+                .limit(1)\
+                .execute()
+            
+            if result.data:
+                return self._parse_insight_row(result.data[0])
+            
+            return None
+            
+        except Exception as e:
+            print(f"Error getting startup insights: {str(e)}")
+            return None
+
+    async def aget_startup_insights(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        """Async version of get_startup_insights"""
+        if not self.is_connected():
+            return None
+            
+        try:
+            client = await self._get_async_client()
+            # Newest first: a new insight is current for a moment before the one it replaces is retired
+            result = await client.table('startup_insights')\
+                .select('*')\
+                .eq('startup_id', startup_id)\
+                .eq('is_current', True)\
+                .order('generated_at', desc=True)\
+                .limit(1)\
                 .execute()
             
             if result.data:
-                insights = result.data[0]
-                # Parse JSON fields
-                insights['key_strengths'] = json.loads(insights.get('key_strengths', '[]'))
-                insights['major_risks'] = json.loads(insights.get('major_risks', '[]'))
-                return insights
+                return self._parse_insight_row(result.data[0])
             
             return None
             
@@ -378,6 +699,19 @@ class DatabaseManager:
     
     # =================== CHATBOT SPECIFIC METHODS ===================
     
+    def _build_conversation_row(self, conversation_data: ConversationRecord) -> Dict[str, Any]:
+        """Build a conversations row from a conversation record"""
+        return {
+            'session_id': conversation_data.session_id,
+            'startup_id': conversation_data.startup_id,
+            'query': conversation_data.user_query,
+            'response': conversation_data.agent_response,
+            'context': conversation_data.context_used,
+            'agent_type': conversation_data.agent_type,
+            'user_id': conversation_data.user_id,
+            'timestamp': datetime.now().isoformat()
+        }
+
     def save_conversation_with_context(self, conversation_data: ConversationRecord) -> Optional[str]:
         """Save conversation with enhanced context for chatbot"""
 
@@ -385,16 +719,7 @@ class DatabaseManager:
             return None
             
         try:
-            conv_data = {
-                'session_id': conversation_data.session_id,
-                'startup_id': conversation_data.startup_id,
-                'query': conversation_data.user_query,
-                'response': conversation_data.agent_response,
-                'context': conversation_data.context_used,
-                'agent_type': conversation_data.agent_type,
-                'user_id': conversation_data.user_id,
-                'timestamp': datetime.now().isoformat()
-            }
+            conv_data = self._build_conversation_row(conversation_data)
             
             result = self.supabase.table('conversations').insert(conv_data).execute()
             return result.data[0]['id'] if result.data else None
@@ -402,6 +727,92 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error saving conversation: {str(e)}")
             return None
+
+    async def asave_conversation_with_context(self, conversation_data: ConversationRecord) -> Optional[str]:
+        """Async version of save_conversation_with_context"""
+        if not self.is_connected():
+            return None
+            
+        try:
+            conv_data = self._build_conversation_row(conversation_data)
+            
+            client = await self._get_async_client()
+            result = await client.table('conversations').insert(conv_data).execute()
+            return result.data[0]['id'] if result.data else None
+            
+        except Exception as e:
+            print(f"Error saving conversation: {str(e)}")
+            return None
+    
+    def _insert_conversation_rows(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert many conversation rows with a single request"""
+        if not self.is_connected():
+            return False
+        
+        try:
+            self.supabase.table('conversations').insert(rows).execute()
+            return True
+            
+        except Exception as e:
+            if self._is_row_rejection(e):
+                raise RowsRejected(str(e)) from e
+            print(f"Error saving conversation batch: {str(e)}")
+            return False
+
+    @staticmethod
+    def _is_row_rejection(error: Exception) -> bool:
+        """True when PostgREST relayed a Postgres error about the rows, False for outages and timeouts"""
+        code = getattr(error, 'code', None)
+        return isinstance(code, str) and code[:2] in ROW_REJECTION_SQLSTATE_CLASSES
+
+    def _get_conversation_writer(self) -> WriteBehindQueue:
+        if self._conversation_writer is None:
+            with self._writer_lock:
+                if self._conversation_writer is None:
+                    self._conversation_writer = WriteBehindQueue(
+                        self._insert_conversation_rows,
+                        spill_path=CONVERSATION_SPILL_PATH,
+                        dead_letter_path=CONVERSATION_DEAD_LETTER_PATH,
+                        name="conversation-writer",
+                        batch_size=CONVERSATION_BATCH_SIZE,
+                        flush_interval_ms=CONVERSATION_FLUSH_INTERVAL_MS,
+                        max_pending=CONVERSATION_MAX_PENDING
+                    )
+        return self._conversation_writer
+
+    def enqueue_conversation(self, conversation_data: ConversationRecord) -> bool:
+        """Queue a conversation for a batched background insert instead of writing it inline"""
+        try:
+            # Built now so the timestamp is the time of the exchange, not of the flush
+            return self._get_conversation_writer().put(self._build_conversation_row(conversation_data))
+        except Exception as e:
+            print(f"Error queueing conversation: {str(e)}")
+            return False
+
+    async def aenqueue_conversation(self, conversation_data: ConversationRecord) -> bool:
+        """Async version of enqueue_conversation"""
+        try:
+            return await self._get_conversation_writer().aput(self._build_conversation_row(conversation_data))
+        except Exception as e:
+            print(f"Error queueing conversation: {str(e)}")
+            return False
+
+    def flush_conversations(self, timeout: float = None) -> bool:
+        """Block until queued conversations are written (or spilled)"""
+        if self._conversation_writer is None:
+            return True
+        return self._conversation_writer.flush(timeout)
+
+    def close_conversation_writer(self, timeout: float = 10.0) -> bool:
+        """Drain and stop the background conversation writer, called on shutdown"""
+        if self._conversation_writer is None:
+            return True
+        return self._conversation_writer.close(timeout)
+
+    def get_conversation_writer_stats(self) -> Dict[str, Any]:
+        if self._conversation_writer is None:
+            return {}
+        return self._conversation_writer.get_stats()
     
     def get_startup_conversation_context(self, startup_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent conversations for a specific startup as context"""
@@ -450,12 +861,25 @@ class DatabaseManager:
     
     # =================== SEARCH & RETRIEVAL =====================
 
+    def profile_request_scope(self):
+        """Context manager making every profile lookup inside it fetch each startup at most once"""
+        return self.profile_cache.request_scope()
+
+    def invalidate_startup_profile(self, startup_id: str = None):
+        """Drop cached copies of a profile after it has been edited"""
+        self.profile_cache.invalidate(startup_id)
+
     def get_startup_profile(self, startup_id: str):
         """Get startup data by startup_id (original method)"""
         try:
+            cached = self.profile_cache.get(startup_id)
+            if cached is not None:
+                return cached
+            
             response = self.supabase.table('startup_profiles').select('*').eq('startup_id', startup_id).execute()
             
             if response.data and len(response.data) > 0:
+                self.profile_cache.put(response.data[0])
                 return response.data[0]
             else:
                 return None
@@ -463,112 +887,698 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error getting startup by ID: {e}")
             return None
+
+    async def aget_startup_profile(self, startup_id: str):
+        """Async version of get_startup_profile"""
+        try:
+            cached = self.profile_cache.get(startup_id)
+            if cached is not None:
+                return cached
+            
+            client = await self._get_async_client()
+            response = await client.table('startup_profiles').select('*').eq('startup_id', startup_id).execute()
+            
+            if response.data and len(response.data) > 0:
+                self.profile_cache.put(response.data[0])
+                return response.data[0]
+            else:
+                return None
+                
+        except Exception as e:
+            print(f"Error getting startup by ID: {e}")
+            return None
+
+    def _build_founder_row(self, startup_id: str, founder: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build a founders row, None for entries that should be skipped"""
+        if not isinstance(founder, dict):
+            print(f"❌ Invalid founder data (not a dict): {founder}")
+            return None  # Skip invalid items
+
+        if not founder.get('name'):
+            return None  # Skip founders without names
+            
+        return {
+            'startup_id': startup_id,
+            'name': founder.get('name'),
+            'role': founder.get('role', 'Founder'),
+            'education_degree': founder.get('education_degree'),
+            'education_institution': founder.get('education_institution'),
+            'professional_experience': founder.get('professional_experience'),
+            'years_of_experience': self._safe_int_conversion(founder.get('years_of_experience')),
+            'equity_stake': self._safe_float_conversion(founder.get('equity_stake')),
+            'linkedin_profile': founder.get('linkedin_profile'),
+            'is_primary_founder': founder.get('is_primary_founder', False),
+            'created_at': datetime.now().isoformat()
+        }
+
+    def _build_team_member_row(self, startup_id: str, member: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build a team_members row, None for entries that should be skipped"""
+        if not member.get('name'):
+            return None  # Skip members without names
+            
+        return {
+            'startup_id': startup_id,
+            'name': member.get('name'),
+            'role': member.get('role', 'Team Member'),
+            'department': member.get('department'),
+            'experience': member.get('experience'),
+            'skills': self._safe_json_conversion(member.get('skills', [])),
+            'is_key_member': member.get('is_key_member', False),
+            'created_at': datetime.now().isoformat()
+        }
         
-    def save_founders(self, startup_id: str, founders: List[Dict[str, Any]]):
-        """Save founder information with validation"""
+    def _build_batch_rows(self, startup_id: str, items: List[Dict[str, Any]], build_row):
+        """Validate and normalize a whole list, returns (rows, row indexes, rejects)"""
+        rows, indexes, rejected = [], [], []
+        seen_names = set()
+        
+        for index, item in enumerate(items or []):
+            if not isinstance(item, dict):
+                rejected.append({"index": index, "name": None, "reason": "not an object"})
+                continue
+            
+            name = str(item.get('name') or '').strip()
+            if not name:
+                rejected.append({"index": index, "name": None, "reason": "missing name"})
+                continue
+            if name.lower() in seen_names:
+                rejected.append({"index": index, "name": name, "reason": "duplicate name"})
+                continue
+            
+            try:
+                row = build_row(startup_id, {**item, 'name': name})
+            except Exception as e:
+                rejected.append({"index": index, "name": name, "reason": str(e)})
+                continue
+            
+            seen_names.add(name.lower())
+            rows.append(row)
+            indexes.append(index)
+        
+        return rows, indexes, rejected
+
+    def _insert_batch(self, client, table: str, rows: List[Dict[str, Any]], indexes: List[int],
+                      rejected: List[Dict[str, Any]], batch_first: bool = True) -> Dict[str, Any]:
+        """One multi-row insert; if the database refuses it, retry row by row to isolate the rejects"""
+        if not rows:
+            return {"inserted": 0, "rejected": rejected}
+        
+        if batch_first:
+            try:
+                client.table(table).insert(rows).execute()
+                return {"inserted": len(rows), "rejected": rejected}
+            except Exception as e:
+                print(f"⚠️ Batch insert into {table} failed, retrying row by row: {str(e)}")
+        
+        inserted = 0
+        for index, row in zip(indexes, rows):
+            try:
+                client.table(table).insert(row).execute()
+                inserted += 1
+            except Exception as e:
+                rejected.append({"index": index, "name": row.get('name'), "reason": str(e)})
+        return {"inserted": inserted, "rejected": sorted(rejected, key=lambda reject: reject["index"])}
+
+    async def _ainsert_batch(self, client, table: str, rows: List[Dict[str, Any]], indexes: List[int],
+                             rejected: List[Dict[str, Any]], batch_first: bool = True) -> Dict[str, Any]:
+        """Async version of _insert_batch"""
+        if not rows:
+            return {"inserted": 0, "rejected": rejected}
+        
+        if batch_first:
+            try:
+                await client.table(table).insert(rows).execute()
+                return {"inserted": len(rows), "rejected": rejected}
+            except Exception as e:
+                print(f"⚠️ Batch insert into {table} failed, retrying row by row: {str(e)}")
+        
+        inserted = 0
+        for index, row in zip(indexes, rows):
+            try:
+                await client.table(table).insert(row).execute()
+                inserted += 1
+            except Exception as e:
+                rejected.append({"index": index, "name": row.get('name'), "reason": str(e)})
+        return {"inserted": inserted, "rejected": sorted(rejected, key=lambda reject: reject["index"])}
+
+    def _report_batch(self, kind: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"✅ Saved {result['inserted']} {kind}")
+        for reject in result["rejected"]:
+            print(f"⚠️ Rejected {kind} #{reject['index']} ({reject['name']}): {reject['reason']}")
+        return result
+
+    def save_founders_batch(self, startup_id: str, founders: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Save all founders with one multi-row insert, returns {"inserted", "rejected"}"""
         if not self.is_connected():
             return None
             
         try:
-            for founder in founders:
-                if not isinstance(founder, dict):
-                    print(f"❌ Invalid founder data (not a dict): {founder}")
-                    continue  # Skip invalid items
-
-                if not founder.get('name'):
-                    continue  # Skip founders without names
-                    
-                founder_data = {
-                    'startup_id': startup_id,
-                    'name': founder.get('name'),
-                    'role': founder.get('role', 'Founder'),
-                    'education_degree': founder.get('education_degree'),
-                    'education_institution': founder.get('education_institution'),
-                    'professional_experience': founder.get('professional_experience'),
-                    'years_of_experience': self._safe_int_conversion(founder.get('years_of_experience')),
-                    'equity_stake': self._safe_float_conversion(founder.get('equity_stake')),
-                    'linkedin_profile': founder.get('linkedin_profile'),
-                    'is_primary_founder': founder.get('is_primary_founder', False),
-                    'created_at': datetime.now().isoformat()
-                }
-                self.supabase.table('founders').insert(founder_data).execute()
+            rows, indexes, rejected = self._build_batch_rows(startup_id, founders, self._build_founder_row)
+            return self._report_batch("founders", self._insert_batch(self.supabase, 'founders', rows, indexes, rejected))
                 
         except Exception as e:
             print(f"❌ Error saving founders: {str(e)}")
-    
-    def save_team_members(self, startup_id: str, team_members: List[Dict[str, Any]]):
-        """Save team member information with validation"""
+            return None
+
+    async def asave_founders_batch(self, startup_id: str, founders: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Async version of save_founders_batch"""
+        if not self.is_connected():
+            return None
+            
+        try:
+            rows, indexes, rejected = self._build_batch_rows(startup_id, founders, self._build_founder_row)
+            client = await self._get_async_client()
+            return self._report_batch("founders", await self._ainsert_batch(client, 'founders', rows, indexes, rejected))
+                
+        except Exception as e:
+            print(f"❌ Error saving founders: {str(e)}")
+            return None
+
+    def save_team_members_batch(self, startup_id: str, team_members: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Save all team members with one multi-row insert, returns {"inserted", "rejected"}"""
+        if not self.is_connected():
+            return None
+            
+        try:
+            rows, indexes, rejected = self._build_batch_rows(startup_id, team_members, self._build_team_member_row)
+            return self._report_batch("team members", self._insert_batch(self.supabase, 'team_members', rows, indexes, rejected))
+                
+        except Exception as e:
+            print(f"❌ Error saving team members: {str(e)}")
+            return None
+
+    async def asave_team_members_batch(self, startup_id: str, team_members: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Async version of save_team_members_batch"""
         if not self.is_connected():
             return None
             
         try:
-            for member in team_members:
-                if not member.get('name'):
-                    continue  # Skip members without names
-                    
-                member_data = {
-                    'startup_id': startup_id,
-                    'name': member.get('name'),
-                    'role': member.get('role', 'Team Member'),
-                    'department': member.get('department'),
-                    'experience': member.get('experience'),
-                    'skills': self._safe_json_conversion(member.get('skills', [])),
-                    'is_key_member': member.get('is_key_member', False),
-                    'created_at': datetime.now().isoformat()
-                }
-                self.supabase.table('team_members').insert(member_data).execute()
+            rows, indexes, rejected = self._build_batch_rows(startup_id, team_members, self._build_team_member_row)
+            client = await self._get_async_client()
+            return self._report_batch("team members", await self._ainsert_batch(client, 'team_members', rows, indexes, rejected))
                 
         except Exception as e:
             print(f"❌ Error saving team members: {str(e)}")
+            return None
+        
+    def save_founders(self, startup_id: str, founders: List[Dict[str, Any]]):
+        """Save founder information with validation"""
+        return self.save_founders_batch(startup_id, founders)
+
+    async def asave_founders(self, startup_id: str, founders: List[Dict[str, Any]]):
+        """Async version of save_founders"""
+        return await self.asave_founders_batch(startup_id, founders)
+    
+    def save_team_members(self, startup_id: str, team_members: List[Dict[str, Any]]):
+        """Save team member information with validation"""
+        return self.save_team_members_batch(startup_id, team_members)
+
+    async def asave_team_members(self, startup_id: str, team_members: List[Dict[str, Any]]):
+        """Async version of save_team_members"""
+        return await self.asave_team_members_batch(startup_id, team_members)
     
     # =================== EXISTING METHODS ===================
     
-    def get_all_startups(self, filters: Dict[str, Any] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    def _startup_list_query(self, client, filters: Dict[str, Any] = None, columns: str = None):
+        """Build the filtered startup_profiles listing query for a sync or async client"""
+        query = client.table('startup_profiles')\
+            .select(columns or STARTUP_SUMMARY_COLUMNS)\
+            .eq('is_active', True)
+        return self._apply_startup_filters(query, filters)
+
+    @staticmethod
+    def _apply_startup_filters(query, filters: Dict[str, Any] = None):
+        """Narrow a startup_profiles query by the listing filters"""
+        if filters:
+            if 'industry_sector' in filters and filters['industry_sector']:
+                query = query.eq('industry_sector', filters['industry_sector'])
+            if 'stage' in filters and filters['stage']:
+                query = query.eq('stage', filters['stage'])
+            if 'funding_stage' in filters and filters['funding_stage']:
+                query = query.eq('funding_stage', filters['funding_stage'])
+            if 'location_city' in filters and filters['location_city']:
+                query = query.eq('location_city', filters['location_city'])
+            if filters.get('min_funding') is not None:
+                query = query.gte('funding_amount_required', filters['min_funding'])
+            if filters.get('max_funding') is not None:
+                query = query.lte('funding_amount_required', filters['max_funding'])
+        
+        return query
+
+    @staticmethod
+    def encode_startup_cursor(startup: Dict[str, Any]) -> str:
+        """Opaque cursor pointing just past this startup in listing order"""
+        position = json.dumps([startup['created_at'], startup['startup_id']], separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_startup_cursor(cursor: str) -> Tuple[str, str]:
+        """(created_at, startup_id) of a cursor, ValueError if it is malformed"""
+        try:
+            created_at, startup_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not isinstance(created_at, str) or not isinstance(startup_id, str):
+            raise ValueError("Invalid cursor")
+        return created_at, startup_id
+
+    def _keyset_page_query(self, query, cursor: Optional[str], page_size: int):
+        """Order newest first with startup_id breaking ties, continuing strictly after the cursor"""
+        if cursor:
+            created_at, startup_id = self.decode_startup_cursor(cursor)
+            created_at, startup_id = self._postgrest_quote(created_at), self._postgrest_quote(startup_id)
+            query = query.or_(f"created_at.lt.{created_at},and(created_at.eq.{created_at},startup_id.lt.{startup_id})")
+        return query.order('created_at', desc=True)\
+            .order('startup_id', desc=True)\
+            .limit(page_size)
+
+    def _startup_page(self, rows: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # One extra row was requested to know whether another page follows
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, self.encode_startup_cursor(rows[-1])
+        return rows, None
+
+    def get_startups_page(self, filters: Dict[str, Any] = None, limit: int = 50, cursor: str = None,
+                          columns: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of startups and the cursor of the next page (None on the last one)"""
+        if not self.is_connected():
+            return [], None
+        limit = max(1, min(limit, STARTUP_PAGE_MAX))
+        query = self._keyset_page_query(self._startup_list_query(self.supabase, filters, columns), cursor, limit + 1)
+        return self._startup_page(query.execute().data or [], limit)
+
+    async def aget_startups_page(self, filters: Dict[str, Any] = None, limit: int = 50, cursor: str = None,
+                                 columns: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Async version of get_startups_page"""
+        if not self.is_connected():
+            return [], None
+        limit = max(1, min(limit, STARTUP_PAGE_MAX))
+        client = await self._get_async_client()
+        query = self._keyset_page_query(self._startup_list_query(client, filters, columns), cursor, limit + 1)
+        return self._startup_page((await query.execute()).data or [], limit)
+
+    def get_all_startups(self, filters: Dict[str, Any] = None, limit: int = 50, cursor: str = None) -> List[Dict[str, Any]]:
         """Get all startup profiles with optional filters - enhanced for AI agents"""
+        try:
+            startups, _ = self.get_startups_page(filters, limit, cursor)
+            return startups
+            
+        except Exception as e:
+            print(f"❌ Error retrieving startups: {str(e)}")
+            return []
+
+    async def aget_all_startups(self, filters: Dict[str, Any] = None, limit: int = 50, cursor: str = None) -> List[Dict[str, Any]]:
+        """Async version of get_all_startups"""
+        try:
+            startups, _ = await self.aget_startups_page(filters, limit, cursor)
+            return startups
+            
+        except Exception as e:
+            print(f"❌ Error retrieving startups: {str(e)}")
+            return []
+
+    async def aiter_startups(self, filters: Dict[str, Any] = None, page_size: int = 200, cursor: str = None):
+        """Yield every matching startup, fetching one keyset page at a time; a failed page raises so callers see the truncation"""
+        while True:
+            try:
+                page, cursor = await self.aget_startups_page(filters, page_size, cursor)
+            except Exception as e:
+                print(f"❌ Error streaming startups: {str(e)}")
+                raise
+            for startup in page:
+                yield startup
+            if cursor is None:
+                return
+
+    def iter_startups_with_founders(self, filters: Dict[str, Any] = None, page_size: int = 200,
+                                    limit: int = None, startup_ids: List[str] = None, updated_after: str = None):
+        """Stream active startups page by page, every column and its founders embedded
+
+        startup_ids and updated_after narrow the stream to those startups or to rows changed since.
+        A page that cannot be read raises, a graph built from the stream must not end early unnoticed."""
+        if not self.is_connected():
+            return
+
+        fetched = 0
+        cursor = None
+        embed_founders = True
+        while limit is None or fetched < limit:
+            batch_size = page_size if limit is None else min(page_size, limit - fetched)
+
+            try:
+                if embed_founders:
+                    # One PostgREST request returns the page and its founders
+                    query = self._startup_list_query(self.supabase, filters, "*, founders(*)")
+                else:
+                    query = self._startup_list_query(self.supabase, filters, "*")
+                if startup_ids is not None:
+                    query = query.in_('startup_id', startup_ids)
+                if updated_after:
+                    query = query.gte('updated_at', updated_after)
+                result = self._keyset_page_query(query, cursor, batch_size).execute()
+            except Exception as e:
+                if embed_founders:
+                    # No founders relationship exposed, fall back to one in_() query per page
+                    print(f"⚠️ Founder embedding unavailable, batching founders instead: {str(e)}")
+                    embed_founders = False
+                    continue
+                print(f"❌ Error streaming startups: {str(e)}")
+                raise
+
+            page = result.data or []
+            if not page:
+                return
+
+            if not embed_founders:
+                self._attach_founders(page)
+
+            for startup in page:
+                startup['founders'] = startup.get('founders') or []
+                yield startup
+
+            fetched += len(page)
+            cursor = self.encode_startup_cursor(page[-1])
+            if len(page) < batch_size:
+                return
+
+    def _attach_founders(self, startups: List[Dict[str, Any]]):
+        """Load founders for a page of startups with a single in_() query"""
+        startup_ids = [startup['startup_id'] for startup in startups]
+        founders_by_startup = {startup_id: [] for startup_id in startup_ids}
+        try:
+            result = self.supabase.table('founders')\
+                .select('*')\
+                .in_('startup_id', startup_ids)\
+                .execute()
+            for founder in result.data or []:
+                founders_by_startup.setdefault(founder.get('startup_id'), []).append(founder)
+        except Exception as e:
+            print(f"❌ Error loading founders: {str(e)}")
+            raise
+
+        for startup in startups:
+            startup['founders'] = founders_by_startup.get(startup['startup_id'], [])
+
+    def _startup_search_query(self, client, search_term: str, limit: int, filters: Dict[str, Any] = None):
+        """Build the ilike search query for a sync or async client"""
+        search_pattern = f"%{search_term}%"
+        query = client.table('startup_profiles')\
+            .select('startup_id, company_name, industry_sector, problem_statement, solution_description, stage, funding_stage')\
+            .or_(f"company_name.ilike.{search_pattern},industry_sector.ilike.{search_pattern},problem_statement.ilike.{search_pattern}")\
+            .eq('is_active', True)
+        return self._apply_startup_filters(query, filters)\
+            .order('created_at', desc=True)\
+            .limit(limit)
+    
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def _open_vector_index(self):
+        if STARTUP_VECTOR_BACKEND == "pgvector":
+            try:
+                return PgVectorIndex(self.embedder.dim, STARTUP_VECTOR_DB_URL, embedder_name=self.embedder.name)
+            except Exception as e:
+                print(f"⚠️ pgvector backend unavailable, keeping vectors locally: {str(e)}")
+        return VectorIndex(self.embedder.dim, STARTUP_VECTOR_DIR or None, embedder_name=self.embedder.name)
+
+    def _search_index_query(self, updated_after: str = None):
+        columns = ', '.join(dict.fromkeys(SEARCH_RESULT_COLUMNS + tuple(SEARCH_FIELD_WEIGHTS) + EMBEDDED_FIELDS + SEARCH_FILTER_FIELDS
+                                          + (SEARCH_FUNDING_COLUMN, 'is_active', 'created_at', 'updated_at')))
+        query = self.supabase.table('startup_profiles').select(columns)
+        if updated_after:
+            # Deltas include deactivated rows so they leave the index
+            return query.gte('updated_at', updated_after).order('updated_at')
+        return query.eq('is_active', True).order('created_at')
+
+    def _fetch_search_rows(self, updated_after: str = None) -> List[Dict[str, Any]]:
+        rows = []
+        while True:
+            page = self._search_index_query(updated_after)\
+                .range(len(rows), len(rows) + STARTUP_SEARCH_PAGE_SIZE - 1)\
+                .execute().data or []
+            rows.extend(page)
+            if len(page) < STARTUP_SEARCH_PAGE_SIZE:
+                return rows
+
+    def build_search_index(self) -> bool:
+        """Load every active startup into the local search index"""
+        if not self.is_connected():
+            return False
+        try:
+            if self.vector_index is None:
+                self.vector_index = self._open_vector_index()
+                memory_graph.vector_index = self.vector_index
+            started = datetime.now()
+            rows = self._fetch_search_rows()
+            self.search_index.build(rows)
+            elapsed = (datetime.now() - started).total_seconds()
+            print(f"🔎 Search index built: {len(self.search_index)} startups in {elapsed:.2f}s")
+            self.embed_startups(rows, prune=True)
+            self._maintain_vector_index(force_save=True)
+            return True
+        except Exception as e:
+            print(f"❌ Error building search index: {str(e)}")
+            return False
+
+    def refresh_search_index(self) -> int:
+        """Pull profiles changed since the last refresh into the search index, returns how many"""
+        if not self.search_index.built:
+            return len(self.search_index) if self.build_search_index() else 0
+        try:
+            rows = self._fetch_search_rows(updated_after=self._refresh_window_start(self.search_index.watermark))
+            # Rows already applied, by an earlier refresh or a local signup, come back unchanged and are skipped
+            changed = [row for row in rows if self.search_index.upsert(row, advance_watermark=True)]
+            for row in changed:
+                self.invalidate_startup_profile(row['startup_id'])
+                if row.get('is_active') is not False:
+                    self._notify_profile_listeners(row['startup_id'], "profile_edit")
+            if changed:
+                self.embed_startups(changed)
+                self.sync_memory_graph([row['startup_id'] for row in changed if row.get('is_active') is not False])
+            self._maintain_vector_index()
+            return len(changed)
+        except Exception as e:
+            print(f"❌ Error refreshing search index: {str(e)}")
+            return 0
+
+    @staticmethod
+    def _refresh_window_start(watermark: Optional[str]) -> Optional[str]:
+        """A watermark moved back by the refresh overlap"""
+        if not watermark:
+            return None
+        try:
+            return (datetime.fromisoformat(watermark) - timedelta(seconds=STARTUP_SEARCH_REFRESH_OVERLAP_SECONDS)).isoformat()
+        except ValueError:
+            return watermark
+
+    def add_profile_listener(self, listener):
+        """Register listener(startup_id, reason), called for profiles created or edited outside this process"""
+        self._profile_listeners.append(listener)
+
+    def _notify_profile_listeners(self, startup_id: str, reason: str):
+        for listener in self._profile_listeners:
+            try:
+                listener(startup_id, reason)
+            except Exception as e:
+                print(f"❌ Profile listener failed for {startup_id}: {str(e)}")
+
+    def _index_startup(self, row: Dict[str, Any]):
+        # New signups are searchable at once, without waiting for the next refresh
+        if self.search_index.built:
+            self.search_index.upsert(row)
+            self._queue_embedding(row)
+
+    def _queue_embedding(self, row: Dict[str, Any]):
+        """Embed a signup on the embedding thread, the request waits for neither the model nor the save"""
+        self._embed_queue.put(row)
+        if self._embed_thread is None:
+            with self._embed_thread_lock:
+                if self._embed_thread is None:
+                    self._embed_thread = threading.Thread(target=self._embed_queued, name="startup-embedder", daemon=True)
+                    self._embed_thread.start()
+
+    def _embed_queued(self):
+        while True:
+            rows = [self._embed_queue.get()]
+            while True:
+                try:
+                    rows.append(self._embed_queue.get_nowait())  # Signups that arrived meanwhile share one batch
+                except queue.Empty:
+                    break
+            self.embed_startups(rows)
+            for _ in rows:
+                self._embed_queue.task_done()
+
+    def _maintain_vector_index(self, force_save: bool = False):
+        """Retrain the IVF lists when the catalog outgrew them and save, run from the build and refreshes only"""
+        if self.vector_index is None:
+            return
+        try:
+            if self.vector_index.needs_training():
+                started = datetime.now()
+                self.vector_index.train()
+                print(f"🧭 Vector index trained in {(datetime.now() - started).total_seconds():.2f}s")
+                self._vectors_dirty = True
+        except Exception as e:
+            print(f"❌ Error training vector index: {str(e)}")
+        self.save_vectors(force=force_save)
+
+    def save_vectors(self, force: bool = False) -> bool:
+        """Write changed vectors to disk, at most every STARTUP_VECTOR_SAVE_SECONDS unless forced"""
+        if self.vector_index is None or not self._vectors_dirty:
+            return False
+        if not force and time.monotonic() - self._vectors_saved_at < STARTUP_VECTOR_SAVE_SECONDS:
+            return False
+        try:
+            self._vectors_dirty = False  # Cleared first, vectors added during the save mark it again
+            self.vector_index.save()
+            self._vectors_saved_at = time.monotonic()
+            return True
+        except Exception as e:
+            self._vectors_dirty = True
+            print(f"❌ Error saving vector index: {str(e)}")
+            return False
+
+    def close_vector_index(self):
+        """Save the vectors and release the index directory, called on shutdown
+
+        Signups still queued for embedding are picked up by the next build, their stamps are stale."""
+        if self.vector_index is None:
+            return
+        try:
+            self.vector_index.close()
+        except Exception as e:
+            print(f"❌ Error closing vector index: {str(e)}")
+
+    def embed_startups(self, rows: List[Dict[str, Any]], prune: bool = False) -> int:
+        """Embed rows whose profile changed since their vector was made, returns how many were embedded"""
+        if self.vector_index is None:
+            return 0
+        try:
+            stale, removed = [], 0
+            for row in rows:
+                startup_id = row.get('startup_id')
+                if not startup_id:
+                    continue
+                if row.get('is_active') is False:
+                    self.vector_index.remove(startup_id)
+                    removed += 1
+                    continue
+                stamp = str(row.get('updated_at') or row.get('created_at') or '')
+                if not stamp or self.vector_index.stamp_of(startup_id) != stamp:
+                    stale.append((startup_id, stamp, row))
+
+            if prune and isinstance(self.vector_index, VectorIndex):
+                # Startups deactivated while the process was down
+                current = {row.get('startup_id') for row in rows}
+                for startup_id in [startup_id for startup_id in self.vector_index.stamps if startup_id not in current]:
+                    self.vector_index.remove(startup_id)
+                    removed += 1
+
+            for start in range(0, len(stale), STARTUP_EMBED_BATCH_SIZE):
+                batch = stale[start:start + STARTUP_EMBED_BATCH_SIZE]
+                vectors = self.embedder.embed([startup_text(row) for _, _, row in batch])
+                for (startup_id, stamp, _), vector in zip(batch, vectors):
+                    self.vector_index.upsert(startup_id, vector, stamp)
+
+            if stale or removed:
+                self._vectors_dirty = True  # Saved by the next build or refresh, not per signup
+            if len(stale) > 1:
+                print(f"🧬 Embedded {len(stale)} startup profiles")
+            return len(stale)
+        except Exception as e:
+            print(f"❌ Error embedding startups: {str(e)}")
+            return 0
+
+    def _semantic_ranking(self, query: str, limit: int, candidates: Optional[set] = None) -> List[Tuple[str, float]]:
+        """(startup_id, cosine) of the indexed startups closest to query, only candidates are scored when given"""
+        if self.vector_index is None or (candidates is not None and not candidates):
+            return []
+        vector = self.embedder.embed([query])[0]
+        documents = self.search_index.index.documents
+        return [(startup_id, score) for startup_id, score in self.vector_index.search(vector, limit, allow=candidates)
+                if score > 0 and startup_id in documents]
+
+    def semantic_search_startups(self, query: str, limit: int = 20, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Active startups whose problem, solution and market read closest to query, with similarity_score"""
+        if not query or not self.search_index.built:
+            return []
+        try:
+            documents = self.search_index.index.documents
+            return [{**documents[startup_id], "similarity_score": round(score, 4)}
+                    for startup_id, score in self._semantic_ranking(query, limit, self.search_index.candidates(filters))]
+        except Exception as e:
+            print(f"❌ Error in semantic startup search: {str(e)}")
+            return []
+
+    def hybrid_search_startups(self, query: str, limit: int = 20, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Keyword (BM25) and semantic rankings merged by reciprocal rank fusion, filters applied before either is scored"""
+        if not query or not self.search_index.built:
+            return []
+        try:
+            candidates = self.search_index.candidates(filters)
+            if candidates is not None and not candidates:
+                return []
+
+            depth = max(limit * STARTUP_HYBRID_DEPTH, 50)
+            rankings = {
+                "keyword": self.search_index.rank(query, depth, candidates),
+                "semantic": [startup_id for startup_id, _ in self._semantic_ranking(query, depth, candidates)]
+            }
+            documents = self.search_index.index.documents
+            results = []
+            for startup_id, score, _ in reciprocal_rank_fusion(rankings):
+                document = documents.get(startup_id)
+                if document is not None:
+                    results.append({**document, "relevance_score": round(score, 6)})
+                    if len(results) == limit:
+                        break
+            return results
+        except Exception as e:
+            print(f"❌ Error in hybrid startup search: {str(e)}")
+            return []
+
+    def _search_local_index(self, search_term: str, limit: int, filters: Dict[str, Any] = None,
+                            mode: str = "hybrid") -> List[Dict[str, Any]]:
+        if mode == "keyword":
+            return self.search_index.search(search_term, limit, self.search_index.candidates(filters))
+        if mode == "semantic":
+            return self.semantic_search_startups(search_term, limit, filters)
+        return self.hybrid_search_startups(search_term, limit, filters)
+
+    def search_startups(self, search_term: str, limit: int = 20, filters: Dict[str, Any] = None,
+                        mode: str = "hybrid") -> List[Dict[str, Any]]:
+        """Relevance ranked search from the local index (hybrid, keyword or semantic), Supabase ilike until it is built"""
+        if self.search_index.built:
+            return self._search_local_index(search_term, limit, filters, mode)
         if not self.is_connected():
             return []
             
         try:
-            query = self.supabase.table('startup_profiles')\
-                .select('startup_id, company_name, industry_sector, stage, funding_stage, location_city, location_state, monthly_revenue, funding_amount_required, team_size, created_at')\
-                .eq('is_active', True)
-            
-            # Apply filters
-            if filters:
-                if 'industry_sector' in filters and filters['industry_sector']:
-                    query = query.eq('industry_sector', filters['industry_sector'])
-                if 'stage' in filters and filters['stage']:
-                    query = query.eq('stage', filters['stage'])
-                if 'funding_stage' in filters and filters['funding_stage']:
-                    query = query.eq('funding_stage', filters['funding_stage'])
-                if 'location_city' in filters and filters['location_city']:
-                    query = query.eq('location_city', filters['location_city'])
-                if 'min_funding' in filters and filters['min_funding']:
-                    query = query.gte('funding_amount_required', filters['min_funding'])
-                if 'max_funding' in filters and filters['max_funding']:
-                    query = query.lte('funding_amount_required', filters['max_funding'])
-            
-            result = query.order('created_at', desc=True).limit(limit).execute()
+            result = self._startup_search_query(self.supabase, search_term, limit, filters).execute()
+            
             return result.data or []
             
         except Exception as e:
-            print(f"❌ Error retrieving startups: {str(e)}")
+            print(f"❌ Error searching startups: {str(e)}")
             return []
-    
-    def search_startups(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Enhanced search with better error handling"""
+
+    async def asearch_startups(self, search_term: str, limit: int = 20, filters: Dict[str, Any] = None,
+                               mode: str = "hybrid") -> List[Dict[str, Any]]:
+        """Async version of search_startups"""
+        if self.search_index.built:
+            # Embedding the query is CPU work, kept off the event loop
+            return await asyncio.to_thread(self._search_local_index, search_term, limit, filters, mode)
         if not self.is_connected():
             return []
             
         try:
-            search_pattern = f"%{search_term}%"
-            result = self.supabase.table('startup_profiles')\
-                .select('startup_id, company_name, industry_sector, problem_statement, solution_description, stage, funding_stage')\
-                .or_(f"company_name.ilike.{search_pattern},industry_sector.ilike.{search_pattern},problem_statement.ilike.{search_pattern}")\
-                .eq('is_active', True)\
-                .order('created_at', desc=True)\
-                .limit(limit)\
-                .execute()
+            client = await self._get_async_client()
+            result = await self._startup_search_query(client, search_term, limit, filters).execute()
             
             return result.data or []
             
@@ -578,17 +1588,55 @@ class DatabaseManager:
         
     # Integration example - Add these methods to your DatabaseManager class
 
-    def initialize_memory_graph(self):
-        """Initialize and populate the memory graph"""
+    def initialize_memory_graph(self, snapshot_dir: str = MEMORY_GRAPH_SNAPSHOT_DIR):
+        """Initialize and populate the memory graph, warm starting from a snapshot when one exists"""
+        
+        if snapshot_dir and memory_graph.load_snapshot(snapshot_dir):
+            age = time.time() - (memory_graph.snapshot_created_at or 0)
+            if not MEMORY_GRAPH_MAX_AGE_SECONDS or age <= MEMORY_GRAPH_MAX_AGE_SECONDS or not self.is_connected():
+                # Startups signed up or edited while no process was running
+                self.sync_memory_graph(updated_after=self._refresh_window_start(memory_graph.source_watermark()))
+                if memory_graph.delta_log.records >= MEMORY_GRAPH_DELTA_COMPACT_RECORDS:
+                    memory_graph.save_snapshot(snapshot_dir)
+                return memory_graph
+            # Too old: relationships of edited startups and deactivated ones are only dropped by a rebuild
+            print(f"🔄 Memory graph snapshot is {age / 3600:.1f}h old, rebuilding")
+            memory_graph._clear_graph()
         
         if not self.is_connected():
             print("❌ Database not connected. Cannot initialize memory graph.")
             return None
         
         # Build the graph from existing data
-        memory_graph.build_startup_graph_from_db(self)
+        try:
+            memory_graph.build_startup_graph_from_db(self)
+        except Exception as e:
+            # Served for this run, but never snapshotted, the next start builds it again
+            print(f"❌ Memory graph build stopped early, not saving a snapshot: {str(e)}")
+            return memory_graph
+        if snapshot_dir:
+            memory_graph.save_snapshot(snapshot_dir)
         return memory_graph
 
+    def sync_memory_graph(self, startup_ids: List[str] = None, updated_after: str = None) -> int:
+        """Apply startups, by id or changed since updated_after, to the memory graph; returns how many"""
+        if startup_ids is not None and not startup_ids:
+            return 0
+        if not self.is_connected():
+            return 0
+        try:
+            synced = 0
+            for startup in self.iter_startups_with_founders(startup_ids=startup_ids, updated_after=updated_after):
+                memory_graph.add_startup(startup)
+                memory_graph.add_startup_similarities(startup['startup_id'])
+                synced += 1
+            if synced and startup_ids is None:
+                print(f"🔄 Memory graph caught up on {synced} changed startups")
+            return synced
+        except Exception as e:
+            print(f"❌ Error syncing memory graph: {str(e)}")
+            return 0
+
     def get_enhanced_chatbot_context(self, startup_id: str, query: str) -> Dict[str, Any]:
         """Get enhanced context using both database and memory graph"""
         
@@ -648,6 +1696,9 @@ class DatabaseManager:
                         properties=founder
                     )
                     memory_graph.add_relationship(startup_id, founder_id, "founded_by")
+
+            # Only startups sharing a similarity bucket are compared
+            memory_graph.add_startup_similarities(startup_id)
         
         return startup_id
 
@@ -656,7 +1707,7 @@ class DatabaseManager:
         """Example of how to use enhanced context in your chatbot"""
         
         # Get enhanced context
-        context = db_manager.get_enhanced_chatbot_context(startup_id, user_query)
+        context = get_db_manager().get_enhanced_chatbot_context(startup_id, user_query)
         
         # Build context string for your AI agent
         context_string = f"""
@@ -705,21 +1756,98 @@ class DatabaseManager:
             print(f"Error searching by company name: {e}")
             return None
 
+    async def aget_startup_by_company_name(self, company_name: str):
+        """Async version of get_startup_by_company_name"""
+        try:
+            client = await self._get_async_client()
+            response = await client.table('startup_profiles').select('*').ilike('company_name', f'%{company_name}%').execute()
+            
+            if response.data and len(response.data) > 0:
+                return response.data[0]
+            else:
+                return None
+                
+        except Exception as e:
+            print(f"Error searching by company name: {e}")
+            return None
+
+    @staticmethod
+    def looks_like_startup_id(identifier: str) -> bool:
+        """True for strings shaped like generate_startup_id output"""
+        return bool(STARTUP_ID_PATTERN.match(identifier)) and identifier == identifier.upper()
+
+    @staticmethod
+    def _postgrest_quote(value: str) -> str:
+        # Quoted so commas, dots and parentheses in names cannot break the or() filter
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    def _name_key(self, identifier: str) -> str:
+        return identifier.strip().lower()
+
+    def _cached_startup_id(self, identifier: str) -> Optional[str]:
+        key = self._name_key(identifier)
+        with self._name_cache_lock:
+            startup_id = self._startup_id_by_name.get(key)
+            if startup_id is not None:
+                self._startup_id_by_name.move_to_end(key)
+            return startup_id
+
+    def _remember_startup_name(self, identifier: str, startup_data: Optional[Dict[str, Any]]):
+        key = self._name_key(identifier)
+        with self._name_cache_lock:
+            if startup_data is None:
+                self._startup_id_by_name.pop(key, None)
+                return
+            self._startup_id_by_name[key] = startup_data['startup_id']
+            self._startup_id_by_name.move_to_end(key)
+            while len(self._startup_id_by_name) > STARTUP_NAME_CACHE_SIZE:
+                self._startup_id_by_name.popitem(last=False)
+
+    def _startup_lookup_queries(self, client, identifier: str) -> list:
+        """Queries resolving a startup_id or (partial) company name, tried in order until one returns a row"""
+        by_id = client.table('startup_profiles').select('*').eq('startup_id', identifier).limit(1)
+        if self.looks_like_startup_id(identifier):
+            return [by_id]
+        
+        # Legacy ids that do not match the shape win over partial name matches, as an exact match
+        # must, then the oldest profile whose name contains the identifier
+        by_name = client.table('startup_profiles').select('*')\
+            .ilike('company_name', f'%{identifier}%')\
+            .order('created_at')\
+            .order('startup_id')\
+            .limit(1)
+        return [by_id, by_name]
+
+    def _first_row(self, response) -> Optional[Dict[str, Any]]:
+        return response.data[0] if response.data else None
+
     def get_startup_by_name_or_id(self, identifier: str):
-            """Get startup data by either company name or startup_id"""
+            """Get startup data by either company name or startup_id, an exact id match first"""
             try:
                 print(f"Searching for startup with identifier: {identifier}")
                 
-                # First, try to get by startup_id
-                startup_data = self.get_startup_profile(identifier)
-                if startup_data:
-                    print(f"Found startup by ID: {startup_data.get('company_name')}")
-                    return startup_data
+                cached = self.profile_cache.get(identifier)
+                if cached is not None:
+                    return cached
+                
+                # Names resolved before go straight to their id
+                cached_id = self._cached_startup_id(identifier)
+                if cached_id:
+                    startup_data = self.get_startup_profile(cached_id)
+                    if startup_data:
+                        return startup_data
+                    self._remember_startup_name(identifier, None)  # Stale, resolve again
                 
-                # If not found by ID, try searching by company name
-                startup_data = self.get_startup_by_company_name(identifier)
+                startup_data = None
+                for query in self._startup_lookup_queries(self.supabase, identifier):
+                    startup_data = self._first_row(query.execute())
+                    if startup_data:
+                        break
                 if startup_data:
-                    print(f"Found startup by name: {startup_data.get('company_name')}")
+                    print(f"Found startup: {startup_data.get('company_name')}")
+                    self.profile_cache.put(startup_data)
+                    if startup_data.get('startup_id') != identifier:
+                        self._remember_startup_name(identifier, startup_data)
                     return startup_data
                 
                 print(f"No startup found with identifier: {identifier}")
@@ -728,6 +1856,36 @@ class DatabaseManager:
             except Exception as e:
                 print(f"Error in get_startup_by_name_or_id: {e}")
                 return None
+
+    async def aget_startup_by_name_or_id(self, identifier: str):
+        """Async version of get_startup_by_name_or_id"""
+        try:
+            cached = self.profile_cache.get(identifier)
+            if cached is not None:
+                return cached
+            
+            cached_id = self._cached_startup_id(identifier)
+            if cached_id:
+                startup_data = await self.aget_startup_profile(cached_id)
+                if startup_data:
+                    return startup_data
+                self._remember_startup_name(identifier, None)
+            
+            client = await self._get_async_client()
+            startup_data = None
+            for query in self._startup_lookup_queries(client, identifier):
+                startup_data = self._first_row(await query.execute())
+                if startup_data:
+                    break
+            if startup_data:
+                self.profile_cache.put(startup_data)
+                if startup_data.get('startup_id') != identifier:
+                    self._remember_startup_name(identifier, startup_data)
+            return startup_data
+            
+        except Exception as e:
+            print(f"Error in get_startup_by_name_or_id: {e}")
+            return None
         
     def search_startups_by_name(self, company_name: str, limit: int = 5):
         """Search for multiple startups by company name (returns list of matches)"""
@@ -741,10 +1899,18 @@ class DatabaseManager:
             return []
     
 
-# Creating global instance
-try:
-    db_manager = DatabaseManager(SUPABASE_URL, SUPABASE_KEY)
-except Exception as e:
-    print(f"Failed to initialize DatabaseManager: {e}")
-    db_manager = None
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_db_manager() -> DatabaseManager:
+    """The process-wide DatabaseManager, created on first use so importing this module builds nothing
+
+    The API, the agent and conversation memories all use it, one set of caches and one writer per process."""
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_manager_lock:
+            if _shared_manager is None:
+                _shared_manager = DatabaseManager(SUPABASE_URL, SUPABASE_KEY)
+    return _shared_manager
 
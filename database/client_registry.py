@@ -0,0 +1,112 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import httpx
+from supabase import create_client, acreate_client, ClientOptions, AsyncClientOptions
+
+# Connection pool limits, shared by every DatabaseManager in the process
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", 100))
+SUPABASE_POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", 20))
+SUPABASE_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", 30))
+SUPABASE_HTTP_TIMEOUT = float(os.environ.get("SUPABASE_HTTP_TIMEOUT", 30))
+
+
+class SupabaseClientRegistry:
+    """Process wide registry handing out one pooled Supabase client per project"""
+
+    def __init__(self,
+                 max_connections: int = SUPABASE_POOL_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = SUPABASE_POOL_MAX_KEEPALIVE,
+                 keepalive_expiry: float = SUPABASE_POOL_KEEPALIVE_EXPIRY,
+                 timeout: float = SUPABASE_HTTP_TIMEOUT):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self._clients: Dict[Tuple[str, str], object] = {}
+        self._async_clients: Dict[Tuple[str, str], object] = {}
+        self._http_clients = []
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+
+    def get_client(self, supabase_url: str, supabase_key: str):
+        """Return the shared sync client, creating and probing it on first use"""
+        key = (supabase_url, supabase_key)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(supabase_url, supabase_key)
+                # Test connection once per process instead of once per manager
+                client.table('startup_profiles').select('startup_id').limit(1).execute()
+                self._clients[key] = client
+                print("✅ Database connection successful")
+        return client
+
+    async def aget_client(self, supabase_url: str, supabase_key: str):
+        """Return the shared async client, creating it inside the running event loop"""
+        key = (supabase_url, supabase_key)
+        client = self._async_clients.get(key)
+        if client is not None:
+            return client
+
+        async with self._async_lock:
+            client = self._async_clients.get(key)
+            if client is None:
+                client = await self._acreate_client(supabase_url, supabase_key)
+                self._async_clients[key] = client
+        return client
+
+    def _create_client(self, supabase_url: str, supabase_key: str):
+        http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        try:
+            client = create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+        except TypeError:
+            # Older supabase releases cannot take an injected httpx client
+            http_client.close()
+            return create_client(supabase_url, supabase_key)
+        self._http_clients.append(http_client)
+        return client
+
+    async def _acreate_client(self, supabase_url: str, supabase_key: str):
+        http_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        try:
+            client = await acreate_client(supabase_url, supabase_key, options=AsyncClientOptions(httpx_client=http_client))
+        except TypeError:
+            await http_client.aclose()
+            return await acreate_client(supabase_url, supabase_key)
+        self._http_clients.append(http_client)
+        return client
+
+    async def aclose(self):
+        """Close every pooled HTTP connection, used on application shutdown"""
+        for http_client in self._http_clients:
+            if isinstance(http_client, httpx.AsyncClient):
+                await http_client.aclose()
+            else:
+                http_client.close()
+        self._http_clients = []
+        self._clients.clear()
+        self._async_clients.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "sync_clients": len(self._clients),
+            "async_clients": len(self._async_clients),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+
+# Global registry shared by every DatabaseManager
+client_registry = SupabaseClientRegistry()
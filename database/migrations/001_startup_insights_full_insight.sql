@@ -0,0 +1,3 @@
+-- Whole parsed insight, including fields without their own column such as assumptions.
+-- Insight writes leave the column out until this has run, reads then rebuild from the mapped columns.
+ALTER TABLE startup_insights ADD COLUMN IF NOT EXISTS full_insight jsonb;
@@ -0,0 +1,85 @@
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Profiles fetched while handling the current request, None outside a request scope
+_request_profiles = contextvars.ContextVar("request_profiles", default=None)
+
+
+class ProfileCache:
+    """Startup profiles by startup_id: exact for the current request, shared across requests for a short TTL"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._shared = OrderedDict()  # startup_id -> (profile, expires at), least recent first
+        self._lock = threading.Lock()
+        self.stats = {"request_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @contextmanager
+    def request_scope(self):
+        """Every lookup inside the block sees the profiles already fetched by it"""
+        token = _request_profiles.set({})
+        try:
+            yield
+        finally:
+            _request_profiles.reset(token)
+
+    def get(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        scoped = _request_profiles.get()
+        if scoped is not None and startup_id in scoped:
+            self.stats["request_hits"] += 1
+            return scoped[startup_id]
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._shared.get(startup_id)
+            if entry is not None and entry[1] > now:
+                self._shared.move_to_end(startup_id)
+                self.stats["shared_hits"] += 1
+                profile = entry[0]
+            else:
+                if entry is not None:
+                    del self._shared[startup_id]
+                self.stats["misses"] += 1
+                return None
+
+        if scoped is not None:
+            scoped[startup_id] = profile
+        return profile
+
+    def put(self, profile: Dict[str, Any]):
+        startup_id = profile.get('startup_id')
+        if not startup_id:
+            return
+
+        scoped = _request_profiles.get()
+        if scoped is not None:
+            scoped[startup_id] = profile
+
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._shared[startup_id] = (profile, time.monotonic() + self.ttl)
+            self._shared.move_to_end(startup_id)
+            while len(self._shared) > self.max_entries:
+                self._shared.popitem(last=False)
+
+    def invalidate(self, startup_id: str = None):
+        """Forget one profile, or all of them, after it changed"""
+        scoped = _request_profiles.get()
+        with self._lock:
+            if startup_id is None:
+                self._shared.clear()
+                if scoped is not None:
+                    scoped.clear()
+                return
+            self._shared.pop(startup_id, None)
+        if scoped is not None:
+            scoped.pop(startup_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._shared), "ttl_seconds": self.ttl, **self.stats}
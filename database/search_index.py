@@ -0,0 +1,256 @@
+import re
+import time
+import heapq
+import bisect
+import threading
+from collections import defaultdict, Counter
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+from conversation_mem.history_index import ExchangeIndex
+
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Indexed columns and how many times their tokens count, names weigh most
+SEARCH_FIELD_WEIGHTS = {
+    "company_name": 3,
+    "industry_sector": 2,
+    "problem_statement": 1,
+    "solution_description": 1,
+}
+# Columns returned for each hit, the same ones the Supabase search selected
+SEARCH_RESULT_COLUMNS = ('startup_id', 'company_name', 'industry_sector', 'problem_statement',
+                         'solution_description', 'stage', 'funding_stage')
+# Columns startup listings filter on by equality, answered from the index before anything is scored
+SEARCH_FILTER_FIELDS = ('industry_sector', 'stage', 'funding_stage', 'location_city')
+SEARCH_FUNDING_COLUMN = 'funding_amount_required'
+# Rank offset of reciprocal rank fusion, larger values flatten the gap between top and lower ranks
+RRF_K = 60
+
+
+def search_tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, two letter words such as "ai" are kept"""
+    return [token for token in SEARCH_TOKEN_PATTERN.findall(text.lower()) if len(token) >= 2] if text else []
+
+
+def trigrams(term: str) -> List[str]:
+    # Padded at the start so prefixes share their leading trigrams with the full term
+    padded = f"  {term} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Any]], k: int = RRF_K) -> List[Tuple[Any, float, Dict[str, int]]]:
+    """Merge ranked id lists into (id, fused score, {ranking name: 1 based rank}), best first"""
+    fused = defaultdict(float)
+    ranks = defaultdict(dict)
+    for name, ranking in rankings.items():
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+            ranks[doc_id][name] = rank
+    return [(doc_id, score, ranks[doc_id]) for doc_id, score in sorted(fused.items(), key=lambda item: -item[1])]
+
+
+class StartupSearchIndex:
+    """In-process startup search: BM25 over an inverted index, trigram expansion for prefixes and typos"""
+
+    def __init__(self, fuzzy_threshold: float = 0.45, max_expansions: int = 5,
+                 prefix_weight: float = 0.8, fuzzy_weight: float = 0.7):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_expansions = max_expansions
+        self.prefix_weight = prefix_weight
+        self.fuzzy_weight = fuzzy_weight
+
+        self.index = ExchangeIndex()  # startup_id -> field weighted tokens, payload is the result row
+        self.term_trigrams = defaultdict(set)  # trigram -> vocabulary terms containing it
+        self.facets = defaultdict(set)  # (filter field, value) -> startup_ids
+        self.facet_keys = {}  # startup_id -> facet keys it lives in
+        self.funding = {}  # startup_id -> funding_amount_required
+        self._funding_sorted = None  # (amounts, startup_ids) ascending, rebuilt after changes
+        self.watermark = None  # Newest updated_at a build or refresh fetched, deltas are fetched from just before it
+        self.stamps = {}  # startup_id -> updated_at of the applied row version, repeats are skipped
+        self.built = False
+        self._lock = threading.RLock()
+        self.stats = {"documents": 0, "searches": 0, "last_search_ms": 0.0, "upserts": 0, "removals": 0}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def build(self, rows: Iterable[Dict[str, Any]]):
+        """Replace the index contents with rows"""
+        with self._lock:
+            self.index.clear()
+            self.term_trigrams.clear()
+            self.facets.clear()
+            self.facet_keys.clear()
+            self.stamps.clear()
+            self.funding.clear()
+            self._funding_sorted = None
+            self.watermark = None
+            for row in rows:
+                self._apply(row)
+            self.built = True
+            self.stats["documents"] = len(self.index)
+
+    def upsert(self, row: Dict[str, Any], advance_watermark: bool = False) -> bool:
+        """Index a new or changed startup row, inactive rows are removed; False when this version was already applied
+
+        Only rows fetched by a refresh may advance the watermark, a local write can be newer
+        than edits made elsewhere that the next refresh still has to pick up."""
+        with self._lock:
+            applied = self._apply(row, advance_watermark)
+            self.stats["documents"] = len(self.index)
+            return applied
+
+    def remove(self, startup_id: str):
+        with self._lock:
+            self.stamps.pop(startup_id, None)
+            self._remove(startup_id)
+            self.stats["documents"] = len(self.index)
+
+    def search(self, query: str, limit: int = 20, candidates: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Active startups best matching query, most relevant first"""
+        with self._lock:
+            return [dict(self.index.documents[startup_id]) for startup_id in self.rank(query, limit, candidates)]
+
+    def rank(self, query: str, limit: int = 20, candidates: Optional[Set[str]] = None) -> List[str]:
+        """startup_ids best matching query, only those in candidates are scored when it is given"""
+        started = time.perf_counter()
+        with self._lock:
+            weights = self._expand(search_tokenize(query))
+            ranked = self.index.top_k(list(weights), limit, weights=weights, candidates=candidates)
+
+        self.stats["searches"] += 1
+        self.stats["last_search_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return [startup_id for _, startup_id, _ in ranked]
+
+    def candidates(self, filters: Dict[str, Any] = None) -> Optional[Set[str]]:
+        """startup_ids passing the listing filters (equality fields, min_funding, max_funding), None without filters"""
+        filters = filters or {}
+        fields = [field for field in SEARCH_FILTER_FIELDS if filters.get(field)]  # Empty values are ignored, as in listings
+        # A zero bound still applies: it leaves out startups without an amount
+        min_funding, max_funding = filters.get('min_funding'), filters.get('max_funding')
+        if not fields and min_funding is None and max_funding is None:
+            return None
+
+        with self._lock:
+            # Smallest facet first so each intersection only shrinks it
+            matches = sorted((self.facets.get((field, filters[field]), set()) for field in fields), key=len)
+            if matches:
+                allowed = set(matches[0])
+                for match in matches[1:]:
+                    allowed &= match
+                if min_funding is not None or max_funding is not None:
+                    allowed = {startup_id for startup_id in allowed
+                               if self._funding_in_range(self.funding.get(startup_id), min_funding, max_funding)}
+                return allowed
+            return self._funding_range(min_funding, max_funding)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"built": self.built, "watermark": self.watermark, "terms": len(self.index.postings), **self.stats}
+
+    @staticmethod
+    def _funding_in_range(amount, min_funding, max_funding) -> bool:
+        if amount is None:
+            return False  # Supabase gte/lte never match a null amount either
+        return (min_funding is None or amount >= min_funding) and (max_funding is None or amount <= max_funding)
+
+    def _funding_range(self, min_funding, max_funding) -> Set[str]:
+        if self._funding_sorted is None:
+            ordered = sorted(self.funding.items(), key=lambda item: item[1])
+            self._funding_sorted = ([amount for _, amount in ordered], [startup_id for startup_id, _ in ordered])
+        amounts, startup_ids = self._funding_sorted
+        start = 0 if min_funding is None else bisect.bisect_left(amounts, min_funding)
+        end = len(amounts) if max_funding is None else bisect.bisect_right(amounts, max_funding)
+        return set(startup_ids[start:end])
+
+    def _apply(self, row: Dict[str, Any], advance_watermark: bool = True) -> bool:
+        startup_id = row.get('startup_id')
+        if not startup_id:
+            return False
+        updated_at = row.get('updated_at') or row.get('created_at')
+        stamp = str(updated_at) if updated_at else None
+        if advance_watermark and stamp and (self.watermark is None or stamp > self.watermark):
+            self.watermark = stamp
+        if stamp is not None and self.stamps.get(startup_id) == stamp:
+            return False  # Fetched again inside the refresh overlap
+        self.stamps[startup_id] = stamp
+
+        if row.get('is_active') is False:
+            self._remove(startup_id)
+            return True
+
+        tokens = []
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            tokens.extend(search_tokenize(row.get(field) or '') * weight)
+
+        if startup_id in self.index:
+            self._remove(startup_id)
+        self.index.add(startup_id, tokens, payload={column: row.get(column) for column in SEARCH_RESULT_COLUMNS})
+        keys = [(field, row.get(field)) for field in SEARCH_FILTER_FIELDS]
+        for key in keys:
+            self.facets[key].add(startup_id)
+        self.facet_keys[startup_id] = keys
+        amount = row.get(SEARCH_FUNDING_COLUMN)
+        if isinstance(amount, (int, float)):
+            self.funding[startup_id] = amount
+            self._funding_sorted = None
+        for term in set(tokens):
+            if self.index.document_frequency(term) == 1:  # New vocabulary term
+                for trigram in trigrams(term):
+                    self.term_trigrams[trigram].add(term)
+        self.stats["upserts"] += 1
+        return True
+
+    def _remove(self, startup_id: str):
+        if startup_id not in self.index:
+            return
+        terms = self.index.doc_terms[startup_id]
+        self._remove_facets(startup_id)
+        self.index.remove(startup_id)
+        for term in terms:
+            if self.index.document_frequency(term) == 0:  # Left the vocabulary
+                for trigram in trigrams(term):
+                    holders = self.term_trigrams.get(trigram)
+                    if holders is not None:
+                        holders.discard(term)
+                        if not holders:
+                            del self.term_trigrams[trigram]
+        self.stats["removals"] += 1
+
+    def _remove_facets(self, startup_id: str):
+        for key in self.facet_keys.pop(startup_id, []):
+            holders = self.facets.get(key)
+            if holders is not None:
+                holders.discard(startup_id)
+                if not holders:
+                    del self.facets[key]
+        if self.funding.pop(startup_id, None) is not None:
+            self._funding_sorted = None
+
+    def _expand(self, query_tokens: List[str]) -> Dict[str, float]:
+        """Query term weights: exact terms, vocabulary terms they prefix, and close spellings"""
+        weights = {}
+        for position, token in enumerate(query_tokens):
+            if self.index.document_frequency(token):
+                weights[token] = max(weights.get(token, 0.0), 1.0)
+
+            token_trigrams = set(trigrams(token))
+            shared = Counter()
+            for trigram in token_trigrams:
+                shared.update(self.term_trigrams.get(trigram, ()))
+
+            candidates = []
+            is_last = position == len(query_tokens) - 1
+            for term, overlap in shared.items():
+                if term == token:
+                    continue
+                if is_last and term.startswith(token):
+                    # Still being typed, only the last token counts as a prefix
+                    candidates.append((self.prefix_weight * (0.5 + 0.5 * len(token) / len(term)), term))
+                    continue
+                similarity = overlap / (len(token_trigrams) + len(term) + 1 - overlap)  # Jaccard over trigram sets
+                if similarity >= self.fuzzy_threshold:
+                    candidates.append((self.fuzzy_weight * similarity, term))
+
+            for weight, term in heapq.nlargest(self.max_expansions, candidates):
+                weights[term] = max(weights.get(term, 0.0), weight)
+        return weights
@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import threading
+from typing import List, Dict, Any, Callable
+
+_STOP = object()  # Queued by close() behind every pending row
+
+
+class RowsRejected(Exception):
+    """Raised by flush_rows when the database answered and refused the rows, rather than being unreachable"""
+
+
+class WriteBehindQueue:
+    """Bounded background queue flushing rows in batches
+
+    flush_rows returns True once the rows are written, False when the database cannot be reached,
+    and raises RowsRejected when it refuses them. Unreachable rows are spilled to a local file and
+    replayed later, refused ones are isolated row by row and moved to a dead-letter file."""
+
+    def __init__(self,
+                 flush_rows: Callable[[List[Dict[str, Any]]], bool],
+                 spill_path: str,
+                 dead_letter_path: str = None,
+                 name: str = "write-behind",
+                 batch_size: int = 50,
+                 flush_interval_ms: float = 200,
+                 max_pending: int = 5000,
+                 put_timeout: float = 2.0,
+                 replay_backoff: float = 5.0,
+                 max_replay_backoff: float = 300.0):
+        self.flush_rows = flush_rows
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path or f"{spill_path}.rejected"
+        self.replay_backoff = replay_backoff
+        self.max_replay_backoff = max_replay_backoff
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_pending)  # Bounded, producers wait when it is full
+        self._thread = None
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._spill_pending = os.path.exists(spill_path)  # Left over from an earlier run
+        self._next_replay_at = 0.0
+        self._replay_delay = replay_backoff
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0,
+                      "backpressure_waits": 0, "rejected": 0, "failed_flushes": 0, "dead_lettered": 0}
+
+    def put(self, row: Dict[str, Any]) -> bool:
+        """Queue a row, waiting up to put_timeout when full; False means it went straight to the spill file"""
+        if self._closed:
+            self._spill([row], "queue closed")
+            return False
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.stats["backpressure_waits"] += 1
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+            except queue.Full:
+                self.stats["rejected"] += 1
+                self._spill([row], "queue full")
+                return False
+
+        self.stats["enqueued"] += 1
+        return True
+
+    async def aput(self, row: Dict[str, Any]) -> bool:
+        """Async version of put, only waits off the event loop when the queue is full"""
+        if not self._closed and self._thread is not None:
+            try:
+                self._queue.put_nowait(row)
+                self.stats["enqueued"] += 1
+                return True
+            except queue.Full:
+                pass
+        return await asyncio.to_thread(self.put, row)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued row has been written or spilled"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """Drain the queue and stop the worker, used on application shutdown"""
+        if self._closed:
+            return True
+        self._closed = True
+        if self._thread is None:
+            return True
+
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pending": self.pending(), "max_pending": self._queue.maxsize, **self.stats}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                break
+
+            # Collect a batch until it is full or the flush interval has passed
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(row)
+
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        written, unsent = self._deliver(batch)
+        self.stats["written"] += written
+        self.stats["batches"] += 1
+        if unsent:
+            self.stats["failed_flushes"] += 1
+            self._spill(unsent, "database unreachable")
+        else:
+            self._replay_spill()
+
+    def _try_flush(self, rows: List[Dict[str, Any]]):
+        """True when written, False when the database could not be reached, the reason when it refused the rows"""
+        try:
+            return bool(self.flush_rows(rows))
+        except RowsRejected as e:
+            return str(e)
+        except Exception as e:
+            print(f"❌ {self.name} flush failed: {str(e)}")
+            return False
+
+    def _deliver(self, rows: List[Dict[str, Any]]):
+        """Write rows, dead-lettering the ones refused; returns (written, rows left because the database was unreachable)"""
+        outcome = self._try_flush(rows)
+        if outcome is True:
+            return len(rows), []
+        if outcome is False:
+            return 0, rows
+        if len(rows) == 1:
+            self._dead_letter(rows[0], outcome)
+            return 0, []
+
+        # One bad row fails the whole insert, find it row by row
+        written = 0
+        for position, row in enumerate(rows):
+            outcome = self._try_flush([row])
+            if outcome is True:
+                written += 1
+            elif outcome is False:
+                return written, rows[position:]
+            else:
+                self._dead_letter(row, outcome)
+        return written, []
+
+    def _dead_letter(self, row: Dict[str, Any], reason: str):
+        """Keep a refused row out of the spill file, it would fail every replay"""
+        try:
+            with self._spill_lock:
+                directory = os.path.dirname(self.dead_letter_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"row": row, "reason": reason, "rejected_at": time.time()}, default=str) + "\n")
+            self.stats["dead_lettered"] += 1
+            print(f"⚠️ {self.name}: row refused by the database, moved to {self.dead_letter_path}: {reason}")
+        except Exception as e:
+            print(f"❌ {self.name}: could not dead-letter a refused row: {str(e)}")
+
+    def _spill(self, rows: List[Dict[str, Any]], reason: str):
+        """Append rows to the local spill file so they survive a database outage"""
+        try:
+            with self._spill_lock:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._spill_pending = True
+                self._next_replay_at = max(self._next_replay_at, time.monotonic() + self._replay_delay)
+            self.stats["spilled"] += len(rows)
+            print(f"⚠️ {self.name}: {reason}, spilled {len(rows)} rows to {self.spill_path}")
+        except Exception as e:
+            print(f"❌ {self.name}: could not spill {len(rows)} rows: {str(e)}")
+
+    def _replay_spill(self):
+        """Re-send spilled rows once the database accepts writes again, backing off while it does not"""
+        if not self._spill_pending or time.monotonic() < self._next_replay_at:
+            return
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                self._spill_pending = False
+                return
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        rows = []
+        for line in lines:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Torn line from a crash mid-write
+
+        remaining = []
+        replayed = 0
+        for start in range(0, len(rows), self.batch_size):
+            written, unsent = self._deliver(rows[start:start + self.batch_size])
+            replayed += written
+            if unsent:
+                remaining = unsent + rows[start + self.batch_size:]
+                break
+
+        with self._spill_lock:
+            # Rows spilled while replaying were appended after the lines read above
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                appended = f.readlines()[len(lines):]
+            if remaining or appended:
+                tmp_path = f"{self.spill_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for row in remaining:
+                        f.write(json.dumps(row, default=str) + "\n")
+                    f.writelines(appended)
+                os.replace(tmp_path, self.spill_path)
+            else:
+                os.remove(self.spill_path)
+                self._spill_pending = False
+
+            if remaining:
+                # Still unreachable, wait longer before the next attempt
+                self._next_replay_at = time.monotonic() + self._replay_delay
+                self._replay_delay = min(self.max_replay_backoff, self._replay_delay * 2)
+            else:
+                self._replay_delay = self.replay_backoff
+
+        self.stats["replayed"] += replayed
+        if replayed:
+            print(f"📤 {self.name}: replayed {replayed} spilled rows")
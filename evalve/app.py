@@ -11,9 +11,13 @@ from agno.tools.serpapi import SerpApiTools
 from agno.models.groq import Groq
 
 from system_prompt.prompt import system_prompt
-from database.DatabaseManager import DatabaseManager
+from database.DatabaseManager import DatabaseManager, get_db_manager
 from conversation_mem.convo_mem import ConversationMemory
+from conversation_mem.session_store import ConversationSessionStore
 from memory.memory import MemoryGraph
+from evalve.insight_cache import InsightCache
+from evalve.singleflight import SingleFlight
+from evalve.prompt_builder import PromptBuilder, TokenCounter, PROMPT_TOKEN_BUDGET
 
 from agno.knowledge.pdf import PDFKnowledgeBase, PDFReader
 from agno.knowledge.website import WebsiteKnowledgeBase
@@ -24,7 +28,7 @@ from agno.document.chunking.document import DocumentChunking
 from agno.tools import Toolkit
 from supabase import create_client
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 
 # from agno.models.ollama import Ollama
 
@@ -32,6 +36,7 @@ from typing import List, Dict, Any, Optional
 import os
 import json
 import re
+import inspect
 import requests
 import urllib.parse
 from datetime import datetime
@@ -50,23 +55,37 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 SERPAPI_KEY = os.environ.get("SERPAPI_KEY") 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+# Print every chatbot prompt's token breakdown, it is always counted in get_system_status
+PROMPT_DEBUG = os.environ.get("PROMPT_DEBUG", "").lower() in ("1", "true", "yes")
 
 # llm = OpenAIChat(id="gpt-4o")
 llm = Groq(id="openai/gpt-oss-20b")
 # llm = Groq(id="llama-3.1-8b-instant")
 # llm = Ollama(id="llama3.1")
 
+# Bump when the insight prompt changes so cached insights are regenerated
+INSIGHT_PROMPT_VERSION = "startup_insight_v1"
+
 class EvalveAgent:
     """Main RAG agent that combines all components"""
     
-    def __init__(self):
+    def __init__(self, db_manager: DatabaseManager = None, conversation_sessions: ConversationSessionStore = None):
         # System Prompts
         self.sys_prompt = system_prompt()
 
         # Initialize core components
-        self.db_manager = DatabaseManager(SUPABASE_URL, SUPABASE_KEY)
+        self.db_manager = db_manager or get_db_manager()
         self.memory_graph = MemoryGraph()
-        self.conversation_memory = ConversationMemory()
+        # One ConversationMemory per session_id so chats never share a context window
+        self.conversation_sessions = conversation_sessions or ConversationSessionStore(db_manager=self.db_manager)
+        self.insight_cache = InsightCache(self.db_manager)
+        # Identical insight requests arriving together share one LLM call
+        self.insight_flights = SingleFlight()
+        # Background insight jobs are capped per provider
+        self.insight_provider = type(llm).__name__.lower()
+        self.token_counter = TokenCounter()
+        self.prompt_token_budget = PROMPT_TOKEN_BUDGET
+        self.prompt_stats = {"prompts": 0, "truncated_prompts": 0, "max_tokens": 0, "last": None}
         
         # Initialize AI agent
         self.create_agents()
@@ -115,8 +134,17 @@ class EvalveAgent:
             return default
         return str(value)
 
-    def get_startup_by_name_or_id(self, identifier: str):
-        """Get startup data by either company name or startup ID"""
+    @staticmethod
+    def _startup_label(company_identifier: Union[str, Dict[str, Any]]) -> str:
+        """Name used in prompts, for an identifier or a pre-fetched profile"""
+        if isinstance(company_identifier, dict):
+            return company_identifier.get('company_name') or company_identifier.get('startup_id') or "this startup"
+        return company_identifier
+
+    def get_startup_by_name_or_id(self, identifier: Union[str, Dict[str, Any]]):
+        """Get startup data by either company name or startup ID, pre-fetched profiles are used as they are"""
+        if isinstance(identifier, dict):
+            return identifier
         try:
             print(f"[EvalveAgent] Searching for startup: {identifier}")
             
@@ -133,6 +161,25 @@ class EvalveAgent:
             print(f"[EvalveAgent] Error getting startup data: {e}")
             return None
 
+    async def aget_startup_by_name_or_id(self, identifier: Union[str, Dict[str, Any]]):
+        """Async version of get_startup_by_name_or_id"""
+        if isinstance(identifier, dict):
+            return identifier
+        try:
+            print(f"[EvalveAgent] Searching for startup: {identifier}")
+            
+            startup_data = await self.db_manager.aget_startup_by_name_or_id(identifier)
+            
+            if startup_data:
+                print(f"[EvalveAgent] Found startup: {startup_data.get('company_name')} (ID: {startup_data.get('startup_id')})")
+            else:
+                print(f"[EvalveAgent] No startup found for: {identifier}")
+            
+            return startup_data
+        except Exception as e:
+            print(f"[EvalveAgent] Error getting startup data: {e}")
+            return None
+
     def format_startup_context(self, startup_data: Dict[str, Any]) -> str:
         """Safely format startup context with None value handling"""
         if not startup_data:
@@ -203,20 +250,15 @@ class EvalveAgent:
 
     # In your evalve/app.py, update the get_startup_insight method:
 
-    def get_startup_insight(self, company_identifier: str, session_id: str = "default", use_web: bool = False):
-        """Retrieve Specific Startup Insights by company name or startup ID"""
-        try:
-            # Get startup data from database (by name or ID)
-            startup_data = self.get_startup_by_name_or_id(company_identifier)
-            startup_context = ""
-            
-            if startup_data:
-                startup_context = self.format_startup_context(startup_data)
-            else:
-                startup_context = f"No database record found for: {company_identifier}. Please search for information about this startup online."
-            
-            # Define query - SIMPLIFIED to avoid tool schema issues
-            query = f"""You are an experienced investment analyst. Analyze the startup: {company_identifier}
+    def _build_insight_query(self, company_identifier: str, startup_data: Optional[Dict[str, Any]]):
+        """Build the insight prompt, returns (query, startup_context)"""
+        if startup_data:
+            startup_context = self.format_startup_context(startup_data)
+        else:
+            startup_context = f"No database record found for: {company_identifier}. Please search for information about this startup online."
+        
+        # Define query - SIMPLIFIED to avoid tool schema issues
+        query = f"""You are an experienced investment analyst. Analyze the startup: {company_identifier}
 
     Based on the provided startup profile, generate a comprehensive investment analysis in valid JSON format with these exact fields:
 
@@ -240,40 +282,93 @@ class EvalveAgent:
 
     Return ONLY valid JSON, no additional text or formatting.
     """
+        return query, startup_context
+
+    def _parse_insight_response(self, response_content: str) -> Dict[str, Any]:
+        """Parse the analyst JSON answer, falling back to the raw text"""
+        try:
+            # Clean the response content first
+            cleaned_content = response_content.strip()
             
-            # Get conversation context
-            conversation_context = self.conversation_memory.get_context_string()
-            relevant_history = self.conversation_memory.get_relevant_history(query)
-            
-            
-            # Get response from simple agent
-            response = self.insights_generator.run(query)
-            
-            # Extract string content from response
-            response_content = str(response.content) if hasattr(response, 'content') else str(response)
+            # Remove any markdown formatting if present
+            if cleaned_content.startswith('```json'):
+                cleaned_content = cleaned_content.replace('```json', '').replace('```', '').strip()
+            elif cleaned_content.startswith('```'):
+                cleaned_content = cleaned_content.replace('```', '').strip()
             
-            # Try to parse as JSON
-            try:
-                # Clean the response content first
-                cleaned_content = response_content.strip()
-                
-                # Remove any markdown formatting if present
-                if cleaned_content.startswith('```json'):
-                    cleaned_content = cleaned_content.replace('```json', '').replace('```', '').strip()
-                elif cleaned_content.startswith('```'):
-                    cleaned_content = cleaned_content.replace('```', '').strip()
-                
-                parsed_response = json.loads(cleaned_content)
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error: {e}")
-                # Fallback to string response
-                parsed_response = {
-                    "executive_summary": response_content,
-                    "error": "Failed to parse structured response"
+            return json.loads(cleaned_content)
+        except json.JSONDecodeError as e:
+            print(f"JSON parsing error: {e}")
+            # Fallback to string response
+            return {
+                "executive_summary": response_content,
+                "error": "Failed to parse structured response"
+            }
+
+    def _is_cacheable_insight(self, parsed_response) -> bool:
+        # Only well formed insights are worth caching
+        return isinstance(parsed_response, dict) and "error" not in parsed_response
+
+    def _insight_error(self, e: Exception, company_identifier: Union[str, Dict[str, Any]], session_id: str) -> Dict[str, Any]:
+        error_msg = f"Error processing startup insight request: {str(e)}"
+        print(f"EvalveAgent Error: {error_msg}")
+        return {
+            "response": {"error": error_msg},
+            "context": "",
+            "session_id": session_id,
+            "company_identifier": self._startup_label(company_identifier),
+            "error": True
+        }
+
+    def _generate_insight(self, query: str, cache_key: str, startup_id: Optional[str]):
+        """Run the insights agent and cache a well formed answer, returns (response_content, parsed_response)"""
+        # Get response from simple agent
+        response = self.insights_generator.run(query)
+        
+        # Extract string content from response
+        response_content = str(response.content) if hasattr(response, 'content') else str(response)
+        parsed_response = self._parse_insight_response(response_content)
+        
+        if self._is_cacheable_insight(parsed_response):
+            self.insight_cache.put(cache_key, parsed_response, startup_id)
+        return response_content, parsed_response
+
+    async def _agenerate_insight(self, query: str, cache_key: str, startup_id: Optional[str]):
+        """Async version of _generate_insight"""
+        response = await self.insights_generator.arun(query)
+        
+        response_content = str(response.content) if hasattr(response, 'content') else str(response)
+        parsed_response = self._parse_insight_response(response_content)
+        
+        if self._is_cacheable_insight(parsed_response):
+            await self.insight_cache.aput(cache_key, parsed_response, startup_id)
+        return response_content, parsed_response
+
+    def get_startup_insight(self, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default", use_web: bool = False,
+                            record_exchange: bool = True):
+        """Retrieve Specific Startup Insights by company name or startup ID"""
+        try:
+            # Get startup data from database (by name or ID)
+            startup_data = self.get_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            query, startup_context = self._build_insight_query(company_identifier, startup_data)
+
+            # Serve a cached insight when the profile, prompt and model are unchanged
+            startup_id = startup_data.get('startup_id') if startup_data else None
+            cache_key = self.insight_cache.make_key(query, INSIGHT_PROMPT_VERSION, llm.id)
+            cached_insight = self.insight_cache.get(cache_key, startup_id)
+            if cached_insight is not None:
+                return {
+                    "response": cached_insight,
                 }
             
+            # Concurrent requests for the same insight wait on the one already generating it
+            response_content, parsed_response = self.insight_flights.do(
+                cache_key, lambda: self._generate_insight(query, cache_key, startup_id))
+            
             # Save conversation
-            self.conversation_memory.add_exchange(query, response_content, startup_context, session_id)
+            if record_exchange:
+                self.conversation_sessions.get(session_id).add_exchange(query, response_content, startup_context, agent_type="insights")
             
             return {
                 "response": parsed_response,
@@ -281,25 +376,77 @@ class EvalveAgent:
             }
             
         except Exception as e:
-            error_msg = f"Error processing startup insight request: {str(e)}"
-            print(f"EvalveAgent Error: {error_msg}")
+            return self._insight_error(e, company_identifier, session_id)
+
+    async def aget_startup_insight(self, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default", use_web: bool = False,
+                                   record_exchange: bool = True):
+        """Async version of get_startup_insight"""
+        try:
+            startup_data = await self.aget_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            query, startup_context = self._build_insight_query(company_identifier, startup_data)
+
+            startup_id = startup_data.get('startup_id') if startup_data else None
+            cache_key = self.insight_cache.make_key(query, INSIGHT_PROMPT_VERSION, llm.id)
+            cached_insight = await self.insight_cache.aget(cache_key, startup_id)
+            if cached_insight is not None:
+                return {
+                    "response": cached_insight,
+                }
+            
+            response_content, parsed_response = await self.insight_flights.ado(
+                cache_key, lambda: self._agenerate_insight(query, cache_key, startup_id))
+            
+            if record_exchange:
+                conversation_memory = await self.conversation_sessions.aget(session_id)
+                await conversation_memory.aadd_exchange(query, response_content, startup_context, agent_type="insights")
+            
             return {
-                "response": {"error": error_msg},
-                "context": "",
-                "session_id": session_id,
-                "company_identifier": company_identifier,
-                "error": True
+                "response": parsed_response,
             }
+            
+        except Exception as e:
+            return self._insight_error(e, company_identifier, session_id)
 
-    def get_startup_chatbot(self, query: str, company_identifier: str, session_id: str = "default", use_web: bool = True):
-        """Getting Chatbot for Specific Startup by company name or ID"""
+    async def agenerate_insight_data(self, startup_data: Dict[str, Any], reuse_current: bool = False) -> Optional[Dict[str, Any]]:
+        """Generate the insight for a profile without persisting it, returns insights_data for save_startup_insights
+
+        None when reuse_current is set and the stored insight already matches the profile."""
+        query, _ = self._build_insight_query(self._startup_label(startup_data), startup_data)
+        cache_key = self.insight_cache.make_key(query, INSIGHT_PROMPT_VERSION, llm.id)
+        if reuse_current and await self.insight_cache.aget(cache_key, startup_data.get('startup_id')) is not None:
+            return None
+        
+        response = await self.insights_generator.arun(query)
+        response_content = str(response.content) if hasattr(response, 'content') else str(response)
+        parsed_response = self._parse_insight_response(response_content)
+        if not self._is_cacheable_insight(parsed_response):
+            raise ValueError(parsed_response.get("error", "Unusable insight") if isinstance(parsed_response, dict) else "Unusable insight")
+        return self.insight_cache.prime(cache_key, parsed_response)
+
+    async def aget_precomputed_insight(self, company_identifier: Union[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Insight already generated for the current profile, None instead of generating it"""
         try:
-            # Get startup data from database (by name or ID)
-            startup_data = self.get_startup_by_name_or_id(company_identifier)
-            startup_context = ""
-            
-            if startup_data:
-                startup_context = f"""
+            startup_data = await self.aget_startup_by_name_or_id(company_identifier)
+            query, _ = self._build_insight_query(self._startup_label(company_identifier), startup_data)
+            startup_id = startup_data.get('startup_id') if startup_data else None
+            return await self.insight_cache.aget(self.insight_cache.make_key(query, INSIGHT_PROMPT_VERSION, llm.id), startup_id)
+        except Exception as e:
+            print(f"[EvalveAgent] Error reading precomputed insight: {e}")
+            return None
+
+    def insight_cache_key(self, startup_data: Dict[str, Any]) -> str:
+        """Cache key the insight for this profile is stored under, it changes with the profile, prompt or model"""
+        query, _ = self._build_insight_query(self._startup_label(startup_data), startup_data)
+        return self.insight_cache.make_key(query, INSIGHT_PROMPT_VERSION, llm.id)
+
+    def _build_chatbot_query(self, query: str, company_identifier: str, startup_data: Optional[Dict[str, Any]],
+                             conversation_memory: ConversationMemory):
+        """Build the context enriched chatbot prompt, returns (enhanced_query, startup_context)"""
+        startup_context = ""
+        
+        if startup_data:
+            startup_context = f"""
 You are answering questions about this specific startup:
 
 {self.format_startup_context(startup_data)}
@@ -309,8 +456,8 @@ Answer as if you're having a friendly conversation with an investor who wants to
 Be informative but conversational. Use the startup information to provide specific, helpful answers.
 
 """
-            else:
-                startup_context = f"""
+        else:
+            startup_context = f"""
 You are answering questions about: {company_identifier}
 
 Note: No detailed database record found for this startup. Please use web search to find relevant information and provide helpful insights based on available data.
@@ -318,14 +465,101 @@ Note: No detailed database record found for this startup. Please use web search
 IMPORTANT: Provide conversational, natural responses. Do NOT return JSON or structured data.
 Answer as if you're having a friendly conversation with an investor.
 """
-            
-            # Get conversation context
-            conversation_context = self.conversation_memory.get_context_string()
-            relevant_history = self.conversation_memory.get_relevant_history(query)
-            
-            # Enhanced query with startup context
-            query_with_context = f"{startup_context}\n\nUser Question: {query}"
-            enhanced_query = self._enhance_query_with_context(query_with_context, conversation_context, relevant_history)
+        
+        enhanced_query, breakdown = self._assemble_chatbot_prompt(query, startup_context, conversation_memory)
+        self._record_prompt(breakdown)
+        
+        return enhanced_query, startup_context
+
+    def _record_prompt(self, breakdown: Dict[str, Any]):
+        self.prompt_stats["prompts"] += 1
+        if breakdown["truncated"] or breakdown["dropped"]:
+            self.prompt_stats["truncated_prompts"] += 1
+        self.prompt_stats["max_tokens"] = max(self.prompt_stats["max_tokens"], breakdown["total_tokens"])
+        self.prompt_stats["last"] = breakdown
+        if PROMPT_DEBUG:
+            print(f"📏 Prompt tokens: {breakdown['total_tokens']}/{breakdown['budget']} {breakdown['sections']}")
+
+    def _assemble_chatbot_prompt(self, query: str, startup_context: str, conversation_memory: ConversationMemory,
+                                 max_exchanges: int = 5, max_relevant: int = 3):
+        """Pack the chatbot prompt into the token budget, returns (prompt, token breakdown)"""
+        builder = PromptBuilder(self.prompt_token_budget, self.token_counter)
+        
+        # The question always goes in, then the startup profile, then history
+        builder.add("startup_context", startup_context, priority=1)
+        builder.add("question", f"\nUser Question: {query}", priority=0, required=True)
+        
+        recent_history = conversation_memory.recent_exchanges(max_exchanges)
+        header = "\nRecent conversation context:"
+        if conversation_memory.current_startup_id:
+            header += f"\n[CONTEXT: Currently discussing startup {conversation_memory.current_startup_id}]"
+        builder.set_header("conversation", header)
+        for position, exchange in enumerate(recent_history):
+            response_preview = exchange['response'][:300] + "..." if len(exchange['response']) > 300 else exchange['response']
+            # Newer exchanges are packed first
+            age = len(recent_history) - 1 - position
+            builder.add("conversation", f"Human: {exchange['query']}\nAssistant: {response_preview}\n---",
+                        priority=2 + 2 * age, group="conversation")
+        
+        # Facts from exchanges that already left the window
+        if conversation_memory.summary:
+            builder.add("conversation_summary", f"\nEarlier in this conversation:\n{conversation_memory.summary}", priority=3)
+        
+        # Skip relevant exchanges already shown in full, and repeats of the same question
+        seen_queries = {exchange['query'].strip().lower() for exchange in recent_history}
+        builder.set_header("relevant_history", "\nRelevant previous discussions:")
+        relevant_added = 0
+        for item in conversation_memory.get_relevant_history(query, max_results=max_relevant + len(recent_history)):
+            normalized_query = item['query'].strip().lower()
+            if normalized_query in seen_queries:
+                continue
+            seen_queries.add(normalized_query)
+            builder.add("relevant_history", f"- {item['query'][:100]}...", priority=3, group="relevant_history")
+            relevant_added += 1
+            if relevant_added == max_relevant:
+                break
+        
+        return builder.build()
+
+    def _record_chat_exchange(self, query: str, response_content: str, startup_context: str,
+                              conversation_memory: ConversationMemory):
+        """Persist a finished chat exchange to conversation memory and the memory graph"""
+        # Save conversation
+        try:
+            conversation_memory.add_exchange(query, response_content, startup_context)
+        except Exception as e:
+            print(f"[EvalveAgent] Error saving conversation: {e}")
+        
+        # Update memory graph
+        try:
+            self._update_memory_graph(query, response_content)
+        except Exception as e:
+            print(f"[EvalveAgent] Error updating memory graph: {e}")
+
+    async def _arecord_chat_exchange(self, query: str, response_content: str, startup_context: str,
+                                     conversation_memory: ConversationMemory):
+        """Async version of _record_chat_exchange"""
+        try:
+            await conversation_memory.aadd_exchange(query, response_content, startup_context)
+        except Exception as e:
+            print(f"[EvalveAgent] Error saving conversation: {e}")
+        
+        try:
+            self._update_memory_graph(query, response_content)
+        except Exception as e:
+            print(f"[EvalveAgent] Error updating memory graph: {e}")
+
+    def _chatbot_error_message(self, company_identifier: Union[str, Dict[str, Any]]) -> str:
+        return f"I apologize, but I'm experiencing technical difficulties right now. However, I can tell you that you're asking about {self._startup_label(company_identifier)}. Please try asking your question again, or check the startup's detailed profile for more information."
+
+    def get_startup_chatbot(self, query: str, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default", use_web: bool = True):
+        """Getting Chatbot for Specific Startup by company name or ID"""
+        try:
+            # Get startup data from database (by name or ID)
+            startup_data = self.get_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            conversation_memory = self.conversation_sessions.get(session_id)
+            enhanced_query, startup_context = self._build_chatbot_query(query, company_identifier, startup_data, conversation_memory)
             
             # Get response from team
             response = self.startup_chatbot.run(enhanced_query)
@@ -341,17 +575,55 @@ Answer as if you're having a friendly conversation with an investor.
                     if hasattr(tool_call, 'result'):
                         context_used += str(tool_call.result) + "\n"
             
-            # Save conversation
-            try:
-                self.conversation_memory.add_exchange(query, response_content, startup_context, session_id)
-            except Exception as e:
-                print(f"[EvalveAgent] Error saving conversation: {e}")
+            self._record_chat_exchange(query, response_content, startup_context, conversation_memory)
+            
+            return response_content
+            
+        except Exception as e:
+            error_msg = f"Error processing chatbot query: {str(e)}"
+
+            print(f"[EvalveAgent] Chatbot error: {error_msg}")
+            return self._chatbot_error_message(company_identifier)
+
+    def stream_startup_chatbot(self, query: str, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default"):
+        """Stream the chatbot answer token by token, persisting the exchange once it completes"""
+        chunks = []
+        try:
+            startup_data = self.get_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            conversation_memory = self.conversation_sessions.get(session_id)
+            enhanced_query, startup_context = self._build_chatbot_query(query, company_identifier, startup_data, conversation_memory)
+
+            for event in self.startup_chatbot.run(enhanced_query, stream=True):
+                # Only content events carry text, tool call events are skipped
+                content = getattr(event, 'content', None)
+                if isinstance(content, str) and content:
+                    chunks.append(content)
+                    yield content
+
+        except Exception as e:
+            print(f"[EvalveAgent] Chatbot stream error: {e}")
+            if not chunks:
+                yield self._chatbot_error_message(company_identifier)
+            return
+
+        response_content = "".join(chunks)
+        if response_content:
+            self._record_chat_exchange(query, response_content, startup_context, conversation_memory)
+
+    async def aget_startup_chatbot(self, query: str, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default", use_web: bool = True):
+        """Async version of get_startup_chatbot"""
+        try:
+            startup_data = await self.aget_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            conversation_memory = await self.conversation_sessions.aget(session_id)
+            enhanced_query, startup_context = self._build_chatbot_query(query, company_identifier, startup_data, conversation_memory)
+            
+            response = await self.startup_chatbot.arun(enhanced_query)
+
+            response_content = str(response.content) if hasattr(response, 'content') else str(response)
             
-            # Update memory graph
-            try:
-                self._update_memory_graph(query, response_content)
-            except Exception as e:
-                print(f"[EvalveAgent] Error updating memory graph: {e}")
+            await self._arecord_chat_exchange(query, response_content, startup_context, conversation_memory)
             
             return response_content
             
@@ -359,23 +631,38 @@ Answer as if you're having a friendly conversation with an investor.
             error_msg = f"Error processing chatbot query: {str(e)}"
 
             print(f"[EvalveAgent] Chatbot error: {error_msg}")
-            return f"I apologize, but I'm experiencing technical difficulties right now. However, I can tell you that you're asking about {company_identifier}. Please try asking your question again, or check the startup's detailed profile for more information."
+            return self._chatbot_error_message(company_identifier)
+
+    async def astream_startup_chatbot(self, query: str, company_identifier: Union[str, Dict[str, Any]], session_id: str = "default"):
+        """Async version of stream_startup_chatbot"""
+        chunks = []
+        try:
+            startup_data = await self.aget_startup_by_name_or_id(company_identifier)
+            company_identifier = self._startup_label(company_identifier)
+            conversation_memory = await self.conversation_sessions.aget(session_id)
+            enhanced_query, startup_context = self._build_chatbot_query(query, company_identifier, startup_data, conversation_memory)
+
+            events = self.startup_chatbot.arun(enhanced_query, stream=True)
+            # Depending on the agno version arun(stream=True) is a coroutine or the iterator itself
+            if inspect.isawaitable(events):
+                events = await events
+
+            async for event in events:
+                content = getattr(event, 'content', None)
+                if isinstance(content, str) and content:
+                    chunks.append(content)
+                    yield content
+
+        except Exception as e:
+            print(f"[EvalveAgent] Chatbot stream error: {e}")
+            if not chunks:
+                yield self._chatbot_error_message(company_identifier)
+            return
+
+        response_content = "".join(chunks)
+        if response_content:
+            await self._arecord_chat_exchange(query, response_content, startup_context, conversation_memory)
                     
-    def _enhance_query_with_context(self, query: str, conversation_context: str, relevant_history: List[Dict]) -> str:
-        """Enhance query with conversation context"""
-        enhanced_parts = [query]
-        
-        if conversation_context:
-            enhanced_parts.append(f"\nRecent conversation context:\n{conversation_context}")
-        
-        if relevant_history:
-            history_context = "\nRelevant previous discussions:\n"
-            for item in relevant_history:
-                history_context += f"- {item['query'][:100]}...\n"
-            enhanced_parts.append(history_context)
-        
-        return "\n".join(enhanced_parts)
-    
     def _update_memory_graph(self, query: str, response: str):
         """Update memory graph with new information"""
         try:
@@ -405,5 +692,11 @@ Answer as if you're having a friendly conversation with an investor.
             "database_connected": self.db_manager.is_connected(),
             "entities_in_graph": len(self.memory_graph.entities),
             "relationships_in_graph": len(self.memory_graph.relationships),
-            "conversation_history_length": len(self.conversation_memory.history)
+            "conversation_sessions": self.conversation_sessions.get_stats(),
+            "conversation_writer": self.db_manager.get_conversation_writer_stats(),
+            "insight_cache": dict(self.insight_cache.stats),
+            "insight_singleflight": self.insight_flights.get_stats(),
+            "profile_cache": self.db_manager.profile_cache.get_stats(),
+            "prompt_token_budget": self.prompt_token_budget,
+            "prompt_tokens": dict(self.prompt_stats)
         }
\ No newline at end of file
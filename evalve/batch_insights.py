@@ -0,0 +1,287 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import List, Dict, Any, Optional, Tuple
+
+from database.DatabaseManager import DatabaseManager, get_db_manager
+from database.client_registry import client_registry
+
+# Where an interrupted batch run records how far it got
+INSIGHT_BATCH_CHECKPOINT = os.environ.get("INSIGHT_BATCH_CHECKPOINT", os.path.join("data", "insight_batch_checkpoint.json"))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest rank percentile of values, 0.0 when there are none"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class RateLimiter:
+    """Token bucket allowing rate_per_minute calls with bursts of up to burst calls"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.interval)
+
+
+class InsightBatchRunner:
+    """Regenerates insights for every matching startup with bounded concurrency, resuming from a checkpoint"""
+
+    def __init__(self, agent, db_manager: DatabaseManager, concurrency: int = 4, rate_per_minute: float = 60,
+                 page_size: int = 100, write_batch_size: int = 25, max_attempts: int = 3,
+                 checkpoint_path: str = INSIGHT_BATCH_CHECKPOINT, filters: Dict[str, Any] = None,
+                 limit: int = None, reuse_current: bool = False):
+        self.agent = agent
+        self.db_manager = db_manager
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.write_batch_size = write_batch_size
+        self.max_attempts = max_attempts
+        self.checkpoint_path = checkpoint_path
+        self.filters = filters or {}
+        self.limit = limit
+        self.reuse_current = reuse_current
+
+        self.rate_limiter = RateLimiter(rate_per_minute, burst=concurrency)
+        self._slots = None
+        self._write_lock = None
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []  # Generated, not yet written
+        self._page_cursor = None  # Cursor the current page was fetched with
+        self._page_done = set()  # startup_ids of the current page already written
+        self.failed = set()  # startup_ids to retry on the next resume, kept in the checkpoint
+        self._paged_all = False  # Every page processed, only failures are left to retry
+        self.latencies: List[float] = []
+        self.stats = {"processed": 0, "written": 0, "unchanged": 0, "failed": 0, "retries": 0}
+
+    async def run(self, resume: bool = True) -> Dict[str, Any]:
+        """Retry earlier failures, then process every remaining page; returns the run report"""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._write_lock = asyncio.Lock()
+        checkpoint = self._load_checkpoint() if resume else {}
+        cursor, done = checkpoint.get("cursor"), set(checkpoint.get("done", []))
+        self._paged_all = checkpoint.get("paged_all", False)
+        self.failed = set(checkpoint.get("failed", []))
+        self._page_cursor, self._page_done = cursor, set(done)
+        if checkpoint:
+            print(f"↩️ Resuming insight batch from checkpoint ({len(done)} done on the current page, "
+                  f"{len(self.failed)} failed startups to retry)")
+
+        started = time.monotonic()
+        retried = await self._retry_failed()
+        done = set(self._page_done)
+
+        stopped = False
+        while not self._paged_all and not stopped:
+            page, next_cursor = await self.db_manager.aget_startups_page(self.filters, self.page_size, cursor, columns='*')
+            self._page_cursor, self._page_done = cursor, set(done)
+
+            # Startups retried above are not generated twice in one run
+            skip = done | retried
+            remaining = [startup for startup in page if startup['startup_id'] not in skip]
+            todo = remaining if self.limit is None else remaining[:max(0, self.limit - self.stats["processed"])]
+            await asyncio.gather(*(self._process(startup) for startup in todo))
+            await self._flush()
+            self._report_progress(started)
+
+            if len(todo) < len(remaining):
+                stopped = True  # Stopped by --limit, the checkpoint keeps the rest of this page
+                continue
+            cursor, done = next_cursor, set()
+            self._paged_all = cursor is None
+            self._page_cursor, self._page_done = cursor, set()
+            self._save_checkpoint()
+
+        if self._paged_all and not self.failed:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)  # Everything done, the next run starts over
+        else:
+            self._save_checkpoint()
+            if self.failed:
+                print(f"⚠️ {len(self.failed)} startups failed, a resumed run retries them")
+        return self.report(started)
+
+    def report(self, started: float) -> Dict[str, Any]:
+        elapsed = time.monotonic() - started
+        return {
+            **self.stats,
+            "failed_pending_retry": len(self.failed),
+            "elapsed_seconds": round(elapsed, 1),
+            "startups_per_minute": round(self.stats["processed"] / elapsed * 60, 1) if elapsed else 0.0,
+            "latency_p50_seconds": round(percentile(self.latencies, 0.50), 2),
+            "latency_p95_seconds": round(percentile(self.latencies, 0.95), 2)
+        }
+
+    async def _retry_failed(self) -> set:
+        """Process the startups an earlier run failed on, returns their ids"""
+        startup_ids = sorted(self.failed)
+        if self.limit is not None:
+            startup_ids = startup_ids[:self.limit]
+        if not startup_ids:
+            return set()
+
+        profiles = await asyncio.gather(*(self.db_manager.aget_startup_profile(startup_id) for startup_id in startup_ids))
+        startups = []
+        for startup_id, profile in zip(startup_ids, profiles):
+            if profile:
+                startups.append(profile)
+            else:
+                self.failed.discard(startup_id)  # Deleted or deactivated since
+        await asyncio.gather(*(self._process(startup) for startup in startups))
+        await self._flush()
+        return set(startup_ids)
+
+    async def _process(self, startup: Dict[str, Any]):
+        startup_id = startup['startup_id']
+        async with self._slots:
+            insights_data = None
+            for attempt in range(1, self.max_attempts + 1):
+                await self.rate_limiter.acquire()
+                call_started = time.monotonic()
+                try:
+                    insights_data = await self.agent.agenerate_insight_data(startup, reuse_current=self.reuse_current)
+                    self.latencies.append(time.monotonic() - call_started)
+                    break
+                except Exception as e:
+                    self.latencies.append(time.monotonic() - call_started)
+                    if attempt == self.max_attempts:
+                        self.stats["failed"] += 1
+                        self.stats["processed"] += 1
+                        self.failed.add(startup_id)
+                        print(f"❌ Insight for {startup_id} failed after {attempt} attempts: {str(e)}")
+                        return
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(2 ** attempt)
+
+        self.stats["processed"] += 1
+        if insights_data is None:
+            self.stats["unchanged"] += 1
+            self._succeeded(startup_id)
+            return
+
+        self._pending.append((startup_id, insights_data))
+        if len(self._pending) >= self.write_batch_size:
+            await self._flush()
+
+    def _succeeded(self, startup_id: str):
+        self._page_done.add(startup_id)
+        self.failed.discard(startup_id)
+
+    async def _flush(self):
+        """Write pending insights in one batch and checkpoint them"""
+        async with self._write_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            result = await self.db_manager.asave_startup_insights_batch(batch)
+            if result is None:
+                # Nothing was written, the whole batch is retried on resume
+                self.stats["failed"] += len(batch)
+                self.failed.update(startup_id for startup_id, _ in batch)
+                print(f"❌ Could not write {len(batch)} insights")
+            else:
+                rejected = {reject["index"] for reject in result["rejected"]}
+                self.stats["written"] += result["inserted"]
+                self.stats["failed"] += len(rejected)
+                for index, (startup_id, _) in enumerate(batch):
+                    if index in rejected:
+                        self.failed.add(startup_id)
+                    else:
+                        self._succeeded(startup_id)
+            self._save_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable checkpoint {self.checkpoint_path}: {str(e)}")
+            return {}
+
+        if checkpoint.get("filters", {}) != self.filters:
+            # Its cursor and done set describe a different listing
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was written for filters {checkpoint.get('filters')}, "
+                             f"not {self.filters}; rerun with the same filters, --no-resume or another --checkpoint")
+        return checkpoint
+
+    def _save_checkpoint(self):
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"cursor": self._page_cursor, "done": sorted(self._page_done), "paged_all": self._paged_all,
+                       "failed": sorted(self.failed), "filters": self.filters}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _report_progress(self, started: float):
+        report = self.report(started)
+        print(f"📈 {report['processed']} startups, {report['startups_per_minute']}/min, "
+              f"p50 {report['latency_p50_seconds']}s, p95 {report['latency_p95_seconds']}s, "
+              f"{report['written']} written, {report['failed']} failed")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate startup insights in bulk")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM calls in flight at once")
+    parser.add_argument("--rate", type=float, default=60, help="LLM calls per minute, 0 for unlimited")
+    parser.add_argument("--page-size", type=int, default=100, help="Startups fetched per page")
+    parser.add_argument("--write-batch", type=int, default=25, help="Insights written per insert")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many startups")
+    parser.add_argument("--industry", default=None, help="Only startups in this industry_sector")
+    parser.add_argument("--stage", default=None, help="Only startups at this stage")
+    parser.add_argument("--checkpoint", default=INSIGHT_BATCH_CHECKPOINT, help="Checkpoint file")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--skip-current", action="store_true", help="Keep insights already matching the profile")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    # Imported here so --help works without the agent dependencies
+    from evalve.app import EvalveAgent
+
+    db_manager = get_db_manager()
+    agent = EvalveAgent(db_manager=db_manager)
+    filters = {key: value for key, value in (("industry_sector", args.industry), ("stage", args.stage)) if value}
+
+    runner = InsightBatchRunner(agent, db_manager, concurrency=args.concurrency, rate_per_minute=args.rate,
+                                page_size=args.page_size, write_batch_size=args.write_batch,
+                                checkpoint_path=args.checkpoint, filters=filters, limit=args.limit,
+                                reuse_current=args.skip_current)
+    try:
+        report = await runner.run(resume=not args.no_resume)
+        print(f"✅ Insight batch finished: {json.dumps(report)}")
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        raise SystemExit(2)
+    finally:
+        await client_registry.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Fields of a parsed insight that map onto columns of the startup_insights table
+INSIGHT_FIELDS = [
+    'executive_summary',
+    'key_strengths',
+    'major_risks',
+    'market_analysis',
+    'financial_outlook',
+    'investment_recommendation',
+]
+# jsonb column holding the whole parsed insight, including fields without their own column such as assumptions
+INSIGHT_PAYLOAD_FIELD = 'full_insight'
+
+
+class InsightCache:
+    """Two tier (in-process LRU + startup_insights table) cache for generated startup insights"""
+
+    def __init__(self, db_manager=None, max_entries: int = 512, generator_name: str = "AI_Agent_v1"):
+        self.db_manager = db_manager
+        self.max_entries = max_entries
+        self.generator_name = generator_name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(prompt: str, prompt_version: str, model_id: str) -> str:
+        """Content address for an insight: changes whenever the profile, prompt or model changes"""
+        digest = hashlib.sha256()
+        for part in (prompt_version, model_id, prompt):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _generated_by(self, key: str) -> str:
+        """Tag stored in startup_insights.generated_by so a row can be matched to its key"""
+        return f"{self.generator_name}:{key}"
+
+    def get(self, key: str, startup_id: str = None) -> Optional[Dict[str, Any]]:
+        """Look up an insight, checking memory first and then the database"""
+        insight = self._recall(key)
+        if insight is not None:
+            return insight
+
+        insight = self._load_from_db(key, startup_id)
+        if insight is not None:
+            self.stats["db_hits"] += 1
+            self._remember(key, insight)
+            return insight
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, insight: Dict[str, Any], startup_id: str = None):
+        """Store an insight in memory and persist it when the startup is known"""
+        self._remember(key, insight)
+
+        if startup_id and self.db_manager and self.db_manager.is_connected():
+            self.db_manager.save_startup_insights(startup_id, self._insights_data(key, insight))
+
+    async def aget(self, key: str, startup_id: str = None) -> Optional[Dict[str, Any]]:
+        """Async version of get"""
+        insight = self._recall(key)
+        if insight is not None:
+            return insight
+
+        row = None
+        if startup_id and self.db_manager and self.db_manager.is_connected():
+            row = await self.db_manager.aget_startup_insights(startup_id)
+
+        insight = self._insight_from_row(key, row)
+        if insight is not None:
+            self.stats["db_hits"] += 1
+            self._remember(key, insight)
+            return insight
+
+        self.stats["misses"] += 1
+        return None
+
+    async def aput(self, key: str, insight: Dict[str, Any], startup_id: str = None):
+        """Async version of put"""
+        self._remember(key, insight)
+
+        if startup_id and self.db_manager and self.db_manager.is_connected():
+            await self.db_manager.asave_startup_insights(startup_id, self._insights_data(key, insight))
+
+    def prime(self, key: str, insight: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep an insight in memory only, returns the insights_data the caller persists itself"""
+        self._remember(key, insight)
+        return self._insights_data(key, insight)
+
+    def invalidate(self, key: str = None):
+        """Drop one cached key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _recall(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            insight = self._entries.get(key)
+            if insight is not None:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+            return insight
+
+    def _remember(self, key: str, insight: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = insight
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _insights_data(self, key: str, insight: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape an insight for DatabaseManager.save_startup_insights"""
+        insights_data = {field: insight.get(field) for field in INSIGHT_FIELDS}
+        recommendation = insight.get('investment_recommendation')
+        if isinstance(recommendation, dict):
+            insights_data['recommendation_score'] = recommendation.get('score')
+        insights_data['generated_by'] = self._generated_by(key)
+        insights_data[INSIGHT_PAYLOAD_FIELD] = insight
+        return insights_data
+
+    def _insight_from_row(self, key: str, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return the stored insight only if it was generated for this exact key"""
+        if not row or row.get('generated_by') != self._generated_by(key):
+            return None
+
+        payload = row.get(INSIGHT_PAYLOAD_FIELD)
+        if isinstance(payload, dict):
+            return dict(payload)
+        # Rows written before the payload column only have the mapped fields
+        return {field: row.get(field) for field in INSIGHT_FIELDS}
+
+    def _load_from_db(self, key: str, startup_id: str = None) -> Optional[Dict[str, Any]]:
+        if not startup_id or not self.db_manager or not self.db_manager.is_connected():
+            return None
+
+        return self._insight_from_row(key, self.db_manager.get_startup_insights(startup_id))
@@ -0,0 +1,226 @@
+import os
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any
+
+# Background insight generation
+INSIGHT_WORKERS = int(os.environ.get("INSIGHT_WORKERS", 2))
+INSIGHT_JOB_MAX_ATTEMPTS = int(os.environ.get("INSIGHT_JOB_MAX_ATTEMPTS", 4))
+INSIGHT_JOB_BACKOFF_SECONDS = float(os.environ.get("INSIGHT_JOB_BACKOFF_SECONDS", 5))
+INSIGHT_JOB_BACKOFF_MAX_SECONDS = float(os.environ.get("INSIGHT_JOB_BACKOFF_MAX_SECONDS", 300))
+# After a job exhausts its attempts, page views do not queue the same insight again for this long
+INSIGHT_JOB_FAILURE_COOLDOWN_SECONDS = float(os.environ.get("INSIGHT_JOB_FAILURE_COOLDOWN_SECONDS", 3600))
+# Concurrent generations per LLM provider, e.g. "groq=2,openaichat=4"; unlisted providers get the default
+INSIGHT_PROVIDER_CONCURRENCY = os.environ.get("INSIGHT_PROVIDER_CONCURRENCY", "")
+INSIGHT_PROVIDER_DEFAULT_CONCURRENCY = int(os.environ.get("INSIGHT_PROVIDER_DEFAULT_CONCURRENCY", 2))
+
+PRECOMPUTE_SESSION_ID = "insight-precompute"
+
+
+def parse_provider_limits(spec: str) -> Dict[str, int]:
+    """{"groq": 2, ...} from "groq=2,..." ignoring malformed entries"""
+    limits = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip().lower()] = max(1, int(value))
+    return limits
+
+
+@dataclass
+class InsightJob:
+    startup_id: str
+    reason: str = "signup"  # What made the insight stale: signup, profile_edit, read_miss
+    attempts: int = 0
+    cache_key: str = None  # Insight being generated, known once the profile is fetched
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class InMemoryJobBackend:
+    """Job storage inside the event loop, jobs do not survive a restart
+
+    Other backends provide the same push(job, delay) / async pop() / size() methods."""
+
+    def __init__(self):
+        self._queue = None
+        self._loop = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def push(self, job: InsightJob, delay: float = 0.0):
+        """Thread safe, the job becomes poppable after delay seconds"""
+        if delay > 0:
+            self._loop.call_soon_threadsafe(self._loop.call_later, delay, self._queue.put_nowait, job)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+
+    async def pop(self) -> InsightJob:
+        return await self._queue.get()
+
+    def size(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+class InsightJobQueue:
+    """Precomputes startup insights off the request path: deduplicated jobs, retries with backoff, per provider caps"""
+
+    def __init__(self, agent, db_manager, backend=None, workers: int = INSIGHT_WORKERS,
+                 max_attempts: int = INSIGHT_JOB_MAX_ATTEMPTS, backoff: float = INSIGHT_JOB_BACKOFF_SECONDS,
+                 max_backoff: float = INSIGHT_JOB_BACKOFF_MAX_SECONDS,
+                 provider_limits: Dict[str, int] = None,
+                 failure_cooldown: float = INSIGHT_JOB_FAILURE_COOLDOWN_SECONDS):
+        self.agent = agent
+        self.db_manager = db_manager
+        self.backend = backend or InMemoryJobBackend()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_cooldown = failure_cooldown
+        self.provider_limits = provider_limits if provider_limits is not None else parse_provider_limits(INSIGHT_PROVIDER_CONCURRENCY)
+
+        self._tasks = []
+        self._semaphores = {}  # provider -> asyncio.Semaphore
+        self._queued = set()  # startup_ids waiting to run, including retries
+        self._running = set()
+        self._rerun = set()  # Changed again while generating, queued once the current run ends
+        self._failures = {}  # startup_id -> (cache_key, time) of its last job that used up every attempt
+        self._lock = threading.Lock()
+        self.stats = {"enqueued": 0, "deduplicated": 0, "completed": 0, "retried": 0, "failed": 0, "skipped": 0,
+                      "cooling_down": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start the worker pool on the running event loop"""
+        if self._tasks or self.workers <= 0:
+            return
+        if hasattr(self.backend, "bind"):
+            self.backend.bind(asyncio.get_running_loop())
+        self._tasks = [asyncio.create_task(self._worker(), name=f"insight-worker-{i}") for i in range(self.workers)]
+        print(f"🧠 Insight workers started: {self.workers}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, startup_id: str, reason: str = "signup", cache_key: str = None) -> bool:
+        """Queue a startup for insight generation, False if it is already waiting; safe from any thread
+
+        read_miss jobs for an insight that recently failed every attempt are dropped until the
+        cooldown ends, signups and edits change the profile and are always queued."""
+        if not self._tasks or not startup_id:
+            return False
+        if reason == "read_miss" and self.failed_recently(startup_id, cache_key):
+            self.stats["cooling_down"] += 1
+            return False
+        with self._lock:
+            if startup_id in self._queued:
+                self.stats["deduplicated"] += 1
+                return False
+            if startup_id in self._running:
+                self._rerun.add(startup_id)
+                self.stats["deduplicated"] += 1
+                return False
+            self._queued.add(startup_id)
+            self.stats["enqueued"] += 1
+        self.backend.push(InsightJob(startup_id=startup_id, reason=reason))
+        return True
+
+    def is_pending(self, startup_id: str) -> bool:
+        return startup_id in self._queued or startup_id in self._running
+
+    def failed_recently(self, startup_id: str, cache_key: str = None) -> bool:
+        """True while the insight's last job, for this cache_key when given, is within its failure cooldown"""
+        failure = self._failures.get(startup_id)
+        if failure is None:
+            return False
+        failed_key, failed_at = failure
+        if time.monotonic() - failed_at >= self.failure_cooldown:
+            self._failures.pop(startup_id, None)
+            return False
+        return cache_key is None or failed_key is None or cache_key == failed_key
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "backlog": self.backend.size(),
+            "queued": len(self._queued),
+            "running": len(self._running),
+            "failed_recently": len(self._failures),
+            "provider_limits": {provider: self.provider_limits.get(provider, INSIGHT_PROVIDER_DEFAULT_CONCURRENCY)
+                                for provider in self._semaphores},
+            **self.stats
+        }
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            limit = self.provider_limits.get(provider, INSIGHT_PROVIDER_DEFAULT_CONCURRENCY)
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def _worker(self):
+        while True:
+            job = await self.backend.pop()
+            with self._lock:
+                self._queued.discard(job.startup_id)
+                self._running.add(job.startup_id)
+            try:
+                async with self._semaphore(getattr(self.agent, "insight_provider", "default")):
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._retry(job, e)
+            finally:
+                with self._lock:
+                    self._running.discard(job.startup_id)
+                    rerun = job.startup_id in self._rerun
+                    self._rerun.discard(job.startup_id)
+                if rerun:
+                    self.enqueue(job.startup_id, reason="profile_edit")
+
+    async def _run(self, job: InsightJob):
+        job.attempts += 1
+        # Fresh profile, an edit may be what queued this job
+        self.db_manager.invalidate_startup_profile(job.startup_id)
+        profile = await self.db_manager.aget_startup_profile(job.startup_id)
+        if not profile:
+            self.stats["skipped"] += 1
+            return
+
+        if hasattr(self.agent, "insight_cache_key"):
+            job.cache_key = self.agent.insight_cache_key(profile)
+        result = await self.agent.aget_startup_insight(profile, session_id=PRECOMPUTE_SESSION_ID, record_exchange=False)
+        insight = result.get("response") if isinstance(result, dict) else None
+        if not isinstance(insight, dict) or "error" in insight:
+            raise RuntimeError(insight.get("error") if isinstance(insight, dict) else "No insight generated")
+
+        self.stats["completed"] += 1
+        self._failures.pop(job.startup_id, None)
+        print(f"✅ Insight precomputed for {job.startup_id} ({job.reason}, attempt {job.attempts})")
+
+    def _retry(self, job: InsightJob, error: Exception):
+        if job.attempts >= self.max_attempts:
+            self.stats["failed"] += 1
+            self._failures[job.startup_id] = (job.cache_key, time.monotonic())
+            print(f"❌ Insight job for {job.startup_id} failed after {job.attempts} attempts: {str(error)}")
+            return
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+        with self._lock:
+            if job.startup_id in self._queued:
+                return  # A newer job already covers it
+            self._queued.add(job.startup_id)
+        self.stats["retried"] += 1
+        print(f"⚠️ Insight job for {job.startup_id} failed ({str(error)}), retrying in {delay:.1f}s")
+        self.backend.push(job, delay)
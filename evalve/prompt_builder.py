@@ -0,0 +1,159 @@
+import os
+import re
+import math
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional, the regex estimate is used instead
+    tiktoken = None
+
+# Upper bound on the input tokens of one chatbot prompt
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", 3000))
+PROMPT_TOKENIZER_ENCODING = os.environ.get("PROMPT_TOKENIZER_ENCODING", "o200k_base")
+
+# Words and single punctuation marks, each word costing about one token per 4 characters
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_CHARS_PER_TOKEN = 4
+_TRUNCATION_MARKER = "..."
+
+
+class TokenCounter:
+    """Counts tokens locally: tiktoken when installed, otherwise a close regex estimate"""
+
+    def __init__(self, encoding_name: str = PROMPT_TOKENIZER_ENCODING):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                print(f"⚠️ Tokenizer {encoding_name} unavailable, estimating tokens: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(self._piece_tokens(match.group()) for match in _PIECE_PATTERN.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text within max_tokens, marked as truncated"""
+        if self.count(text) <= max_tokens:
+            return text
+        budget = max_tokens - self.count(_TRUNCATION_MARKER)
+        if budget <= 0:
+            return ""
+
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:budget]) + _TRUNCATION_MARKER
+
+        used = 0
+        end = 0
+        for match in _PIECE_PATTERN.finditer(text):
+            used += self._piece_tokens(match.group())
+            if used > budget:
+                break
+            end = match.end()
+        return text[:end] + _TRUNCATION_MARKER
+
+    @staticmethod
+    def _piece_tokens(piece: str) -> int:
+        return max(1, math.ceil(len(piece) / _CHARS_PER_TOKEN))
+
+
+@dataclass
+class PromptSection:
+    name: str  # Kind of content, sections sharing a name are reported together
+    text: str
+    priority: int  # Lower is packed first
+    required: bool = False  # Always kept, truncated only if it alone exceeds the budget
+    group: Optional[str] = None  # Sections rendered under a shared header
+    tokens: int = 0
+    included: bool = False
+    truncated: bool = False
+
+
+class PromptBuilder:
+    """Packs prompt sections greedily by priority into a token budget, rendered in insertion order"""
+
+    # Sections are only truncated to fit when at least this much budget is left
+    MIN_TRUNCATED_TOKENS = 32
+
+    def __init__(self, token_budget: int = PROMPT_TOKEN_BUDGET, counter: TokenCounter = None):
+        self.token_budget = token_budget
+        self.counter = counter or TokenCounter()
+        self.sections: List[PromptSection] = []
+        self.headers: Dict[str, str] = {}
+
+    def add(self, name: str, text: str, priority: int, required: bool = False, group: str = None):
+        if text:
+            self.sections.append(PromptSection(name=name, text=text, priority=priority, required=required, group=group))
+        return self
+
+    def set_header(self, group: str, header: str):
+        """Header emitted once, before the first packed section of the group"""
+        self.headers[group] = header
+        return self
+
+    def build(self) -> Tuple[str, Dict[str, Any]]:
+        """Render the prompt and its token breakdown"""
+        remaining = self.token_budget
+        headers_packed = set()
+
+        # Required sections first, then the rest by priority (insertion order breaks ties)
+        order = sorted(range(len(self.sections)),
+                       key=lambda i: (not self.sections[i].required, self.sections[i].priority, i))
+        for i in order:
+            section = self.sections[i]
+            header_tokens = 0
+            if section.group in self.headers and section.group not in headers_packed:
+                header_tokens = self.counter.count(self.headers[section.group]) + 1
+
+            section.tokens = self.counter.count(section.text) + 1  # +1 for the joining newline
+            needed = section.tokens + header_tokens
+            if needed > remaining:
+                available = remaining - header_tokens - 1
+                if not section.required and available < self.MIN_TRUNCATED_TOKENS:
+                    continue
+                section.text = self.counter.truncate(section.text, max(available, 0))
+                if not section.text:
+                    continue
+                section.tokens = self.counter.count(section.text) + 1
+                section.truncated = True
+
+            section.included = True
+            remaining -= section.tokens + header_tokens
+            if header_tokens:
+                headers_packed.add(section.group)
+
+        parts = []
+        rendered_headers = set()
+        for section in self.sections:
+            if not section.included:
+                continue
+            if section.group in headers_packed and section.group not in rendered_headers:
+                parts.append(self.headers[section.group])
+                rendered_headers.add(section.group)
+            parts.append(section.text)
+        prompt = "\n".join(parts)
+
+        return prompt, self._breakdown(prompt, rendered_headers)
+
+    def _breakdown(self, prompt: str, rendered_headers) -> Dict[str, Any]:
+        sections = {}
+        for section in self.sections:
+            if section.included:
+                sections[section.name] = sections.get(section.name, 0) + section.tokens
+        for group in rendered_headers:
+            sections[f"{group}_header"] = self.counter.count(self.headers[group]) + 1
+
+        return {
+            "budget": self.token_budget,
+            "total_tokens": self.counter.count(prompt),
+            "sections": sections,
+            "dropped": [section.name for section in self.sections if not section.included],
+            "truncated": [section.name for section in self.sections if section.truncated],
+            "tokenizer": "tiktoken" if self.counter.encoding is not None else "estimate"
+        }
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Awaitable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key onto one execution, every caller gets its result"""
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the thread running it
+        self._async_calls = {}  # (event loop, key) -> Task running it
+        self._waiters = {}  # key -> callers waiting on the current flight
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "max_waiters": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the run already in flight"""
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats["executions"] += 1
+            else:
+                self._join(key)
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._waiters.pop(key, None)
+        return future.result()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of do, a waiter that is cancelled leaves the shared run going"""
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self.stats["calls"] += 1
+            task = self._async_calls.get(flight_key)
+            if task is None:
+                task = self._async_calls[flight_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._land(flight_key))
+                self.stats["executions"] += 1
+            else:
+                self._join(flight_key)
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._async_calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "in_flight": self.in_flight(),
+            "waiting": sum(self._waiters.values()),
+            "dedupe_ratio": round(self.stats["coalesced"] / calls, 4) if calls else 0.0
+        }
+
+    def _join(self, key):
+        waiters = self._waiters[key] = self._waiters.get(key, 0) + 1
+        self.stats["coalesced"] += 1
+        self.stats["max_waiters"] = max(self.stats["max_waiters"], waiters)
+
+    def _land(self, flight_key):
+        with self._lock:
+            self._async_calls.pop(flight_key, None)
+            self._waiters.pop(flight_key, None)
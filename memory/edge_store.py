@@ -0,0 +1,267 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Set
+import time
+
+import numpy as np
+
+
+# Edge columns with their array typecode and matching numpy dtype
+EDGE_COLUMNS = (
+    ("sources", 'i', np.int32),
+    ("targets", 'i', np.int32),
+    ("types", 'H', np.uint16),
+    ("weights", 'd', np.float64),
+    ("created_ts", 'd', np.float64),
+)
+CSR_COLUMNS = ("_out_offsets", "_out_order", "_in_offsets", "_in_order")
+
+
+class EdgeStore:
+    """Compact edge storage: interned ids in growable typed arrays with CSR adjacency"""
+
+    # Rebuild the CSR offsets once this many edges are waiting outside of it
+    MIN_PENDING_BEFORE_COMPACT = 4096
+
+    def __init__(self):
+        # Interned entity ids and relation types
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.relation_types: List[str] = []
+        self.relation_type_index: Dict[str, int] = {}
+
+        # One slot per edge
+        self.sources = array('i')
+        self.targets = array('i')
+        self.types = array('H')
+        self.weights = array('d')
+        self.created_ts = array('d')
+        self.edge_properties: Dict[int, Dict] = {}  # Sparse, most edges have none
+        # Float-only properties (e.g. similarity scores) as columns per key set:
+        # keys -> (ascending edge indices, values flattened row by row)
+        self._property_groups: Dict[tuple, tuple] = {}
+
+        # CSR adjacency over the first _csr_edges edges
+        self._csr_edges = 0
+        self._out_offsets = np.zeros(1, dtype=np.int64)
+        self._out_order = np.zeros(0, dtype=np.int32)
+        self._in_offsets = np.zeros(1, dtype=np.int64)
+        self._in_order = np.zeros(0, dtype=np.int32)
+
+        # Adjacency of edges added since the last CSR rebuild
+        self._pending_out: Dict[int, List[int]] = {}
+        self._pending_in: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __iter__(self):
+        for edge in range(len(self.sources)):
+            yield self.edge(edge)
+
+    def __getitem__(self, edge: int) -> Dict[str, Any]:
+        if edge < 0:
+            edge += len(self.sources)
+        if not 0 <= edge < len(self.sources):
+            raise IndexError("edge index out of range")
+        return self.edge(edge)
+
+    # =================== INTERNING ===================
+
+    def intern_node(self, entity_id: str) -> int:
+        node = self.node_index.get(entity_id)
+        if node is None:
+            node = self.node_index[entity_id] = len(self.node_ids)
+            self.node_ids.append(entity_id)
+        return node
+
+    def intern_relation_type(self, relation_type: str) -> int:
+        code = self.relation_type_index.get(relation_type)
+        if code is None:
+            code = len(self.relation_types)
+            if code > 0xFFFF:
+                raise ValueError("Too many distinct relation types for the edge store")
+            self.relation_type_index[relation_type] = code
+            self.relation_types.append(relation_type)
+        return code
+
+    def relation_type_codes(self, relation_types: Iterable[str]) -> Set[int]:
+        """Codes of the given relation types, unknown types are skipped"""
+        return {self.relation_type_index[t] for t in relation_types if t in self.relation_type_index}
+
+    # =================== MUTATION ===================
+
+    def add(self, source: str, target: str, relation_type: str, weight: float = 1.0,
+            properties: Dict = None, created_ts: float = None) -> int:
+        """Append an edge and return its index"""
+        self._ensure_writable()
+        edge = len(self.sources)
+        source_node = self.intern_node(source)
+        target_node = self.intern_node(target)
+
+        self.sources.append(source_node)
+        self.targets.append(target_node)
+        self.types.append(self.intern_relation_type(relation_type))
+        self.weights.append(weight)
+        self.created_ts.append(time.time() if created_ts is None else created_ts)
+        if properties:
+            self._add_properties(edge, properties)
+
+        self._pending_out.setdefault(source_node, []).append(edge)
+        self._pending_in.setdefault(target_node, []).append(edge)
+
+        pending = edge + 1 - self._csr_edges
+        if pending >= max(self.MIN_PENDING_BEFORE_COMPACT, self._csr_edges // 4):
+            self.compact()
+        return edge
+
+    def _add_properties(self, edge: int, properties: Dict):
+        values = list(properties.values())
+        if not all(isinstance(value, float) for value in values):
+            self.edge_properties[edge] = properties
+            return
+
+        keys = tuple(properties)
+        group = self._property_groups.get(keys)
+        if group is None or not isinstance(group[0], array):
+            edges, flat_values = array('q'), array('d')
+            if group is not None:
+                # Snapshot columns become growable on the first new edge
+                edges.frombytes(np.ascontiguousarray(group[0], dtype=np.int64).tobytes())
+                flat_values.frombytes(np.ascontiguousarray(group[1], dtype=np.float64).tobytes())
+            group = self._property_groups[keys] = (edges, flat_values)
+        group[0].append(edge)
+        group[1].extend(values)
+
+    def compact(self):
+        """Fold pending edges into the CSR offsets (stable, so insertion order is kept)"""
+        edge_count = len(self.sources)
+        node_count = len(self.node_ids)
+        sources = np.asarray(self.sources, dtype=np.int32)[:edge_count]
+        targets = np.asarray(self.targets, dtype=np.int32)[:edge_count]
+
+        self._out_offsets, self._out_order = self._build_csr(sources, node_count)
+        self._in_offsets, self._in_order = self._build_csr(targets, node_count)
+        self._csr_edges = edge_count
+        self._pending_out = {}
+        self._pending_in = {}
+
+    @staticmethod
+    def _build_csr(keys: np.ndarray, node_count: int):
+        order = np.argsort(keys, kind="stable").astype(np.int32)
+        offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=node_count), out=offsets[1:])
+        return offsets, order
+
+    # =================== SNAPSHOTS ===================
+
+    def export_columns(self) -> Dict[str, np.ndarray]:
+        """Edge and CSR columns as numpy arrays, compacting first so the CSR covers every edge"""
+        if self._csr_edges != len(self.sources) or self._pending_out:
+            self.compact()
+        columns = {name: np.asarray(getattr(self, name), dtype=dtype) for name, _, dtype in EDGE_COLUMNS}
+        columns.update({name.lstrip("_"): getattr(self, name) for name in CSR_COLUMNS})
+        return columns
+
+    def export_properties(self):
+        """Float property columns as (keys, edges, values) plus the remaining property dicts"""
+        columns = [
+            (keys, np.asarray(edges, dtype=np.int64), np.asarray(values, dtype=np.float64).reshape(len(edges), len(keys)))
+            for keys, (edges, values) in self._property_groups.items()
+        ]
+        return columns, self.edge_properties
+
+    def restore_columns(self, node_ids: List[str], relation_types: List[str],
+                        edge_properties: Dict[int, Dict], columns: Dict[str, np.ndarray],
+                        property_columns: List[tuple] = ()):
+        """Adopt snapshot columns as-is (memory-mapped arrays stay lazy until the first write)"""
+        self.node_ids = node_ids
+        self.node_index = {entity_id: node for node, entity_id in enumerate(node_ids)}
+        self.relation_types = relation_types
+        self.relation_type_index = {relation_type: code for code, relation_type in enumerate(relation_types)}
+        self.edge_properties = edge_properties
+        self._property_groups = {tuple(keys): (edges, values.reshape(-1)) for keys, edges, values in property_columns}
+
+        for name, _, _ in EDGE_COLUMNS:
+            setattr(self, name, columns[name])
+        for name in CSR_COLUMNS:
+            setattr(self, name, columns[name.lstrip("_")])
+        self._csr_edges = len(self.sources)
+        self._pending_out = {}
+        self._pending_in = {}
+
+    def _ensure_writable(self):
+        """Copy snapshot columns into growable arrays before the first append"""
+        if isinstance(self.sources, array):
+            return
+        for name, typecode, dtype in EDGE_COLUMNS:
+            column = array(typecode)
+            column.frombytes(np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes())
+            setattr(self, name, column)
+
+    # =================== TRAVERSAL ===================
+
+    def _adjacent(self, node: int, offsets: np.ndarray, order: np.ndarray, pending: Dict[int, List[int]]) -> List[int]:
+        edges = []
+        if node + 1 < len(offsets):
+            edges = order[offsets[node]:offsets[node + 1]].tolist()
+        extra = pending.get(node)
+        if extra:
+            edges.extend(extra)
+        return edges
+
+    def out_edges(self, entity_id: str) -> List[int]:
+        """Indices of edges leaving the entity, in insertion order"""
+        node = self.node_index.get(entity_id)
+        if node is None:
+            return []
+        return self._adjacent(node, self._out_offsets, self._out_order, self._pending_out)
+
+    def in_edges(self, entity_id: str) -> List[int]:
+        """Indices of edges entering the entity, in insertion order"""
+        node = self.node_index.get(entity_id)
+        if node is None:
+            return []
+        return self._adjacent(node, self._in_offsets, self._in_order, self._pending_in)
+
+    # =================== EDGE ACCESS ===================
+
+    def source_of(self, edge: int) -> str:
+        return self.node_ids[self.sources[edge]]
+
+    def target_of(self, edge: int) -> str:
+        return self.node_ids[self.targets[edge]]
+
+    def type_of(self, edge: int) -> str:
+        return self.relation_types[self.types[edge]]
+
+    def properties_of(self, edge: int) -> Dict:
+        properties = self.edge_properties.get(edge)
+        if properties is not None:
+            return properties
+        for keys, (edges, values) in self._property_groups.items():
+            position = bisect_left(edges, edge)
+            if position < len(edges) and edges[position] == edge:
+                start = position * len(keys)
+                return dict(zip(keys, [float(value) for value in values[start:start + len(keys)]]))
+        return {}
+
+    def edge(self, edge: int) -> Dict[str, Any]:
+        """Materialize an edge in the MemoryGraph relationship dict format"""
+        return {
+            "source": self.source_of(edge),
+            "target": self.target_of(edge),
+            "type": self.type_of(edge),
+            "properties": self.properties_of(edge),
+            "weight": self.weights[edge],
+            "created_at": datetime.fromtimestamp(self.created_ts[edge]).isoformat()
+        }
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the edge arrays and adjacency"""
+        arrays = (self.sources, self.targets, self.types, self.weights, self.created_ts)
+        total = sum(np.asarray(a).nbytes for a in arrays)
+        total += sum(a.nbytes for a in (self._out_offsets, self._out_order, self._in_offsets, self._in_order))
+        total += sum(np.asarray(edges).nbytes + np.asarray(values).nbytes for edges, values in self._property_groups.values())
+        return total
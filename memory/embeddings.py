@@ -0,0 +1,88 @@
+import os
+import re
+import zlib
+import threading
+from typing import List, Dict, Any
+
+import numpy as np
+
+# "hashing" (built in) or "sentence-transformers:<model name>"
+STARTUP_EMBEDDER = os.environ.get("STARTUP_EMBEDDER", "hashing")
+
+# Profile text that is embedded, in this order
+EMBEDDED_FIELDS = ("problem_statement", "solution_description", "target_market")
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+_embedders = {}  # spec -> loaded embedder, a model is loaded once per process
+_embedders_lock = threading.Lock()
+
+
+def startup_text(profile: Dict[str, Any]) -> str:
+    return "\n".join(str(profile.get(field) or "") for field in EMBEDDED_FIELDS).strip()
+
+
+class HashingEmbedder:
+    """Local embedding without a model: hashed word and bigram features, sublinear tf, unit length"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_PATTERN.findall(text.lower())
+            features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(feature.encode()) for feature in features), dtype=np.uint32, count=len(features))
+            # The top bit picks the sign so colliding features tend to cancel out
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            counts = np.zeros(self.dim, dtype=np.float32)
+            np.add.at(counts, hashes % self.dim, signs)
+            vectors[row] = np.sign(counts) * np.log1p(np.abs(counts))
+        return normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model, loaded once per process"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer  # Optional dependency
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+        return normalize(vectors.astype(np.float32))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit length so inner product is cosine similarity, zero rows stay zero"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def get_embedder(spec: str = STARTUP_EMBEDDER):
+    """Process-wide embedder named by spec, loaded on the first call"""
+    with _embedders_lock:
+        embedder = _embedders.get(spec)
+        if embedder is None:
+            embedder = _embedders[spec] = _load_embedder(spec)
+        return embedder
+
+
+def _load_embedder(spec: str):
+    """Embedder named by spec, falling back to hashing when the model cannot be loaded"""
+    if spec.startswith("sentence-transformers"):
+        _, _, model_name = spec.partition(":")
+        try:
+            return SentenceTransformerEmbedder(model_name or "all-MiniLM-L6-v2")
+        except Exception as e:
+            print(f"⚠️ Embedding model {spec} unavailable, using hashed features: {e}")
+    return HashingEmbedder()
@@ -3,20 +3,230 @@ from datetime import datetime
 import json
 from collections import defaultdict, deque
 import math
+import numpy as np
+
+from memory.edge_store import EdgeStore
+from memory.snapshot import write_snapshot, read_snapshot
+
+# Startup properties that contribute at least 0.1 to _calculate_startup_similarity
+SIMILARITY_BLOCKING_FIELDS = ("industry_sector", "stage", "funding_stage", "location_city")
+SIMILARITY_THRESHOLD = 0.3
+
+
+class StartupBlockingIndex:
+    """Buckets startups by categorical properties so only pairs sharing a bucket get scored"""
+
+    def __init__(self, fields=SIMILARITY_BLOCKING_FIELDS):
+        self.fields = fields
+        self.buckets = defaultdict(set)  # (field, value) -> startup ids
+        self.startup_keys = {}  # startup id -> bucket keys it lives in
+
+    def _bucket_key(self, field: str, value):
+        # Missing values compare equal in the scorer, so they share a bucket too
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        return (field, value)
+
+    def add(self, startup_id: str, properties: Dict):
+        """Index a startup, replacing any previous placement"""
+        self.remove(startup_id)
+        keys = [self._bucket_key(field, properties.get(field)) for field in self.fields]
+        for key in keys:
+            self.buckets[key].add(startup_id)
+        self.startup_keys[startup_id] = keys
+
+    def remove(self, startup_id: str):
+        for key in self.startup_keys.pop(startup_id, []):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(startup_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def candidates(self, startup_id: str) -> Set[str]:
+        """Startups sharing at least one bucket with the given startup"""
+        candidates = set()
+        for key in self.startup_keys.get(startup_id, []):
+            candidates |= self.buckets[key]
+        candidates.discard(startup_id)
+        return candidates
+
+
+class StartupSimilarityMatrix:
+    """Columnar startup properties scoring _calculate_startup_similarity against all startups at once"""
+
+    # Same factors and weights as MemoryGraph._calculate_startup_similarity
+    CATEGORICAL_WEIGHTS = (
+        ("industry_sector", 0.4),
+        ("stage", 0.2),
+        ("funding_stage", 0.2),
+        ("location_city", 0.1),
+    )
+    REVENUE_WEIGHT = 0.1
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.size = 0
+        self.row_of = {}  # startup id -> row
+        self.startup_ids = []  # row -> startup id
+        self.vocabularies = {field: {} for field, _ in self.CATEGORICAL_WEIGHTS}
+        self.codes = {field: np.zeros(initial_capacity, dtype=np.int32) for field, _ in self.CATEGORICAL_WEIGHTS}
+        self.revenue = np.zeros(initial_capacity, dtype=np.float64)
+        self.active = np.zeros(initial_capacity, dtype=bool)
+
+        # Score of every combination of matching categorical factors, summed in the
+        # scorer's order so results are bit-identical to the scalar version
+        self._mask_scores = np.array([
+            sum([weight for bit, (_, weight) in enumerate(self.CATEGORICAL_WEIGHTS) if mask >> bit & 1])
+            for mask in range(1 << len(self.CATEGORICAL_WEIGHTS))
+        ], dtype=np.float64)
+
+    def _encode(self, field: str, value) -> int:
+        # None is a category of its own, matching the scorer's None == None
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        vocabulary = self.vocabularies[field]
+        code = vocabulary.get(value)
+        if code is None:
+            code = vocabulary[value] = len(vocabulary)
+        return code
+
+    def _grow(self):
+        capacity = max(1, len(self.active) * 2)
+        for field in self.codes:
+            self.codes[field] = np.resize(self.codes[field], capacity)
+        self.revenue = np.resize(self.revenue, capacity)
+        active = np.zeros(capacity, dtype=bool)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
+
+    def upsert(self, startup_id: str, properties: Dict):
+        """Insert or refresh the columns of one startup"""
+        row = self.row_of.get(startup_id)
+        if row is None:
+            if self.size == len(self.active):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.row_of[startup_id] = row
+            self.startup_ids.append(startup_id)
+
+        for field, _ in self.CATEGORICAL_WEIGHTS:
+            self.codes[field][row] = self._encode(field, properties.get(field))
+
+        try:
+            revenue = float(properties.get("monthly_revenue", 0) or 0)
+        except (TypeError, ValueError):
+            revenue = 0.0
+        self.revenue[row] = max(revenue, 0.0)
+        self.active[row] = True
+
+    def remove(self, startup_id: str):
+        row = self.row_of.get(startup_id)
+        if row is not None:
+            self.active[row] = False
+
+    def export_columns(self) -> Dict[str, np.ndarray]:
+        """Used rows of every column, keyed by snapshot file name"""
+        columns = {f"codes_{field}": codes[:self.size] for field, codes in self.codes.items()}
+        columns["revenue"] = self.revenue[:self.size]
+        columns["active"] = self.active[:self.size]
+        return columns
+
+    def restore(self, startup_ids: List[str], vocabularies: Dict[str, List], columns: Dict[str, np.ndarray]):
+        """Adopt snapshot columns, vocabularies are listed in code order"""
+        self.startup_ids = list(startup_ids)
+        self.row_of = {startup_id: row for row, startup_id in enumerate(self.startup_ids)}
+        self.size = len(self.startup_ids)
+        self.vocabularies = {
+            field: {value: code for code, value in enumerate(vocabularies.get(field, []))}
+            for field, _ in self.CATEGORICAL_WEIGHTS
+        }
+        self.codes = {field: columns[f"codes_{field}"] for field, _ in self.CATEGORICAL_WEIGHTS}
+        self.revenue = columns["revenue"]
+        self.active = columns["active"]
+
+    def scores(self, startup_id: str) -> Optional[np.ndarray]:
+        """Similarity of one startup to every row, -inf for itself and removed rows"""
+        row = self.row_of.get(startup_id)
+        if row is None or not self.active[row]:
+            return None
+
+        n = self.size
+        # Bit i of match_mask is set when categorical factor i matches
+        match_mask = np.zeros(n, dtype=np.uint8)
+        matches = np.empty(n, dtype=bool)
+        shifted = np.empty(n, dtype=np.uint8)
+        for bit, (field, _) in enumerate(self.CATEGORICAL_WEIGHTS):
+            column = self.codes[field][:n]
+            np.equal(column, column[row], out=matches)
+            np.left_shift(matches.view(np.uint8), bit, out=shifted)
+            match_mask |= shifted
+        scores = self._mask_scores[match_mask]
+
+        revenue = self.revenue[row]
+        if revenue > 0:
+            # Stored revenues are clipped at 0, so min/max is 0 for startups without revenue
+            others = self.revenue[:n]
+            ratio = np.minimum(others, revenue)
+            ratio /= np.maximum(others, revenue)
+            ratio *= self.REVENUE_WEIGHT
+            scores += ratio
+
+        scores[~self.active[:n]] = -np.inf
+        scores[row] = -np.inf
+        return scores
+
+    def top_k(self, startup_id: str, k: int = None, min_score: float = 0.0) -> List[tuple]:
+        """Most similar startups as (startup_id, score), best first; all matches when k is None"""
+        scores = self.scores(startup_id)
+        if scores is None:
+            return []
+
+        if k is not None and k <= 0:
+            return []
+
+        if k is not None and k < len(scores):
+            # Partial selection keeps this linear instead of sorting every startup
+            candidates = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+            candidates = candidates[scores[candidates] >= min_score]
+        else:
+            candidates = np.flatnonzero(scores >= min_score)
+
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.startup_ids[row], float(scores[row])) for row in ordered]
+
 
 class MemoryGraph:
     """Enhanced knowledge graph for startup investment platform"""
     
     def __init__(self):
         self._state = "initialized" 
+        self.vector_index = None  # Profile text embeddings, attached by the database manager
+        self.delta_log = None  # GraphDeltaLog once the graph is backed by a snapshot
+        self._clear_graph()
+
+    def _clear_graph(self):
+        """Empty the structures a snapshot restores, attached collaborators such as vector_index stay"""
+        if self.delta_log is not None:
+            self.delta_log.close()
+            self.delta_log = None
         self.entities = {}
-        self.relationships = []
         self.entity_index = defaultdict(set)  # Index entities by type
-        self.relationship_index = defaultdict(list)  # Index relationships by source
-        self.reverse_relationship_index = defaultdict(list)  # Index by target
+        self.edges = EdgeStore()  # Relationships with forward and reverse adjacency
+        self.relationships = self.edges  # Sequence view of relationship dicts
+        self.similarity_index = StartupBlockingIndex()  # Candidate pairs for similar_to
+        self.similarity_matrix = StartupSimilarityMatrix()  # Vectorized profile similarity
+        self.connection_signatures = defaultdict(set)  # entity -> {(neighbor type, relationship)}
+        self.signature_index = defaultdict(set)  # (neighbor type, relationship) -> startups
+        self.snapshot_created_at = None  # Unix time of the snapshot the graph was loaded from or last saved to
         
     def add_entity(self, entity_id: str, entity_type: str, properties: Dict):
         """Add an entity to the knowledge graph with indexing"""
+        previous = self.entities.get(entity_id)
         self.entities[entity_id] = {
             "type": entity_type,
             "properties": properties,
@@ -26,30 +236,117 @@ class MemoryGraph:
         
         # Index by type for fast lookup
         self.entity_index[entity_type].add(entity_id)
+
+        if entity_type == "startup":
+            self.similarity_index.add(entity_id, properties)
+            self.similarity_matrix.upsert(entity_id, properties)
+
+        # Edges only count towards a signature once both ends exist
+        if previous is None:
+            self._add_entity_to_signatures(entity_id)
+        elif previous["type"] != entity_type:
+            self._rebuild_signatures(entity_id)
+
+        if self.delta_log is not None:
+            self.delta_log.append({
+                "op": "add_entity",
+                "entity_id": entity_id,
+                "entity_type": entity_type,
+                "properties": properties,
+                "at": self.entities[entity_id]["created_at"]
+            })
     
     def update_entity(self, entity_id: str, properties: Dict):
         """Update existing entity properties"""
         if entity_id in self.entities:
             self.entities[entity_id]["properties"].update(properties)
             self.entities[entity_id]["updated_at"] = datetime.now().isoformat()
+
+            if self.entities[entity_id]["type"] == "startup":
+                self.similarity_index.add(entity_id, self.entities[entity_id]["properties"])
+                self.similarity_matrix.upsert(entity_id, self.entities[entity_id]["properties"])
+
+            if self.delta_log is not None:
+                self.delta_log.append({
+                    "op": "update_entity",
+                    "entity_id": entity_id,
+                    "properties": properties,
+                    "at": self.entities[entity_id]["updated_at"]
+                })
     
     def add_relationship(self, source: str, target: str, relation_type: str, 
                         properties: Dict = None, weight: float = 1.0):
         """Add a weighted relationship between entities with indexing"""
-        relationship = {
-            "source": source,
-            "target": target,
-            "type": relation_type,
-            "properties": properties or {},
-            "weight": weight,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        self.relationships.append(relationship)
-        
-        # Index for fast lookup
-        self.relationship_index[source].append(relationship)
-        self.reverse_relationship_index[target].append(relationship)
+        self.edges.add(source, target, relation_type, weight, properties)
+
+        if target in self.entities:
+            self._add_signature_element(source, (self.entities[target]["type"], relation_type))
+        if source in self.entities:
+            self._add_signature_element(target, (self.entities[source]["type"], relation_type))
+
+        if self.delta_log is not None:
+            self.delta_log.append({
+                "op": "add_relationship",
+                "source": source,
+                "target": target,
+                "relation_type": relation_type,
+                "properties": properties,
+                "weight": weight,
+                "at": self.edges.created_ts[len(self.edges) - 1]
+            })
+
+    def has_relationship(self, source: str, target: str, relation_type: str) -> bool:
+        return any(self.edges.target_of(edge) == target and self.edges.type_of(edge) == relation_type
+                   for edge in self.edges.out_edges(source))
+
+    def _link(self, source: str, target: str, relation_type: str):
+        # Startups applied again after an edit keep a single edge per relationship
+        if not self.has_relationship(source, target, relation_type):
+            self.add_relationship(source, target, relation_type)
+
+    def source_watermark(self) -> Optional[str]:
+        """Newest updated_at (or created_at) among the startup rows the graph was built from"""
+        stamps = [str(stamp) for stamp in (
+            (self.entities[startup_id]["properties"].get("updated_at") or self.entities[startup_id]["properties"].get("created_at"))
+            for startup_id in self.entity_index.get("startup", ())) if stamp]
+        return max(stamps) if stamps else None
+
+    # =================== CONNECTION SIGNATURES ===================
+
+    def _add_signature_element(self, entity_id: str, element: tuple):
+        """Record a (neighbor type, relationship) pair in an entity's signature"""
+        signature = self.connection_signatures[entity_id]
+        if element in signature:
+            return
+        signature.add(element)
+        if entity_id in self.entity_index.get("startup", ()):
+            self.signature_index[element].add(entity_id)
+
+    def _add_entity_to_signatures(self, entity_id: str):
+        """A new entity completes the edges that were waiting for it"""
+        entity_type = self.entities[entity_id]["type"]
+        for edge in self.edges.out_edges(entity_id):
+            self._add_signature_element(self.edges.target_of(edge), (entity_type, self.edges.type_of(edge)))
+        for edge in self.edges.in_edges(entity_id):
+            self._add_signature_element(self.edges.source_of(edge), (entity_type, self.edges.type_of(edge)))
+
+        if entity_id in self.entity_index.get("startup", ()):
+            for element in self.connection_signatures.get(entity_id, ()):
+                self.signature_index[element].add(entity_id)
+
+    def _rebuild_signatures(self, entity_id: str):
+        """Recompute the signatures touched by an entity changing type"""
+        affected = {entity_id}
+        affected.update(self.edges.target_of(edge) for edge in self.edges.out_edges(entity_id))
+        affected.update(self.edges.source_of(edge) for edge in self.edges.in_edges(entity_id))
+
+        for affected_id in affected:
+            for element in self.connection_signatures.pop(affected_id, set()):
+                members = self.signature_index.get(element)
+                if members is not None:
+                    members.discard(affected_id)
+            for rel in self._get_direct_relations(affected_id):
+                self._add_signature_element(affected_id, (rel["entity"]["type"], rel["relationship"]))
     
     def get_entities_by_type(self, entity_type: str) -> Dict[str, Dict]:
         """Get all entities of a specific type"""
@@ -67,33 +364,41 @@ class MemoryGraph:
     def _get_direct_relations(self, entity_id: str, relation_types: List[str] = None) -> List[Dict]:
         """Get directly connected entities"""
         related = []
+        edges = self.edges
+        
+        # Relation types are compared as interned codes
+        type_codes = edges.relation_type_codes(relation_types) if relation_types else None
+        if type_codes is not None and not type_codes:
+            return related
         
         # Outgoing relationships
-        for rel in self.relationship_index.get(entity_id, []):
-            if relation_types and rel["type"] not in relation_types:
+        for edge in edges.out_edges(entity_id):
+            if type_codes is not None and edges.types[edge] not in type_codes:
                 continue
-            if rel["target"] in self.entities:
+            target = edges.node_ids[edges.targets[edge]]
+            if target in self.entities:
                 related.append({
-                    "entity": self.entities[rel["target"]],
-                    "entity_id": rel["target"],
-                    "relationship": rel["type"],
+                    "entity": self.entities[target],
+                    "entity_id": target,
+                    "relationship": edges.relation_types[edges.types[edge]],
                     "direction": "outgoing",
-                    "weight": rel["weight"],
-                    "properties": rel["properties"]
+                    "weight": edges.weights[edge],
+                    "properties": edges.properties_of(edge)
                 })
         
         # Incoming relationships
-        for rel in self.reverse_relationship_index.get(entity_id, []):
-            if relation_types and rel["type"] not in relation_types:
+        for edge in edges.in_edges(entity_id):
+            if type_codes is not None and edges.types[edge] not in type_codes:
                 continue
-            if rel["source"] in self.entities:
+            source = edges.node_ids[edges.sources[edge]]
+            if source in self.entities:
                 related.append({
-                    "entity": self.entities[rel["source"]],
-                    "entity_id": rel["source"],
-                    "relationship": rel["type"],
+                    "entity": self.entities[source],
+                    "entity_id": source,
+                    "relationship": edges.relation_types[edges.types[edge]],
                     "direction": "incoming",
-                    "weight": rel["weight"],
-                    "properties": rel["properties"]
+                    "weight": edges.weights[edge],
+                    "properties": edges.properties_of(edge)
                 })
         
         return related
@@ -141,10 +446,11 @@ class MemoryGraph:
                 
             visited.add(current)
             
-            for rel in self.relationship_index.get(current, []):
-                if rel["target"] not in visited:
-                    path.append(rel["target"])
-                    dfs(rel["target"], path, depth + 1)
+            for edge in self.edges.out_edges(current):
+                next_id = self.edges.target_of(edge)
+                if next_id not in visited:
+                    path.append(next_id)
+                    dfs(next_id, path, depth + 1)
                     path.pop()
             
             visited.remove(current)
@@ -197,28 +503,36 @@ class MemoryGraph:
         
         return context
     
-    def find_similar_startups(self, startup_id: str, similarity_threshold: float = 0.3) -> List[Dict]:
-        """Find startups similar to the given startup based on graph connections"""
+    def find_similar_startups(self, startup_id: str, similarity_threshold: float = 0.3,
+                              top_k: int = None, method: str = "connections") -> List[Dict]:
+        """Find startups similar to the given startup based on graph connections, profile attributes or profile text"""
         if startup_id not in self.entities:
             return []
-        
-        startup = self.entities[startup_id]
-        startup_connections = set()
-        
-        # Get all connected entities
-        for rel in self.get_related_entities(startup_id):
-            startup_connections.add((rel["entity"]["type"], rel["relationship"]))
+
+        if method == "profile":
+            return self._find_similar_startups_by_profile(startup_id, similarity_threshold, top_k)
+        if method == "semantic" and self.vector_index is not None:
+            return self._find_similar_startups_by_embedding(startup_id, similarity_threshold, top_k)
+        
+        startup_connections = self.connection_signatures.get(startup_id, set())
+        
+        if similarity_threshold > 0:
+            # Startups sharing no signature element have similarity 0, so only
+            # those found through the inverted index can reach the threshold
+            candidates = set()
+            for element in startup_connections:
+                candidates |= self.signature_index.get(element, set())
+        else:
+            candidates = self.entity_index.get("startup", set())
         
         similar_startups = []
         
         # Compare with other startups
-        for other_id in self.entity_index.get("startup", set()):
+        for other_id in candidates:
             if other_id == startup_id:
                 continue
             
-            other_connections = set()
-            for rel in self.get_related_entities(other_id):
-                other_connections.add((rel["entity"]["type"], rel["relationship"]))
+            other_connections = self.connection_signatures.get(other_id, set())
             
             # Calculate Jaccard similarity
             intersection = len(startup_connections & other_connections)
@@ -234,8 +548,35 @@ class MemoryGraph:
                         "common_connections": intersection
                     })
         
-        return sorted(similar_startups, key=lambda x: x["similarity_score"], reverse=True)
+        similar_startups = sorted(similar_startups, key=lambda x: x["similarity_score"], reverse=True)
+        return similar_startups[:top_k] if top_k is not None else similar_startups
+
+    def _find_similar_startups_by_profile(self, startup_id: str, similarity_threshold: float,
+                                          top_k: int = None) -> List[Dict]:
+        """Score the startup against every other one in a single vectorized pass"""
+        return [
+            {
+                "startup_id": other_id,
+                "startup": self.entities[other_id],
+                "similarity_score": score
+            }
+            for other_id, score in self.similarity_matrix.top_k(startup_id, top_k, similarity_threshold)
+            if other_id in self.entities
+        ]
     
+    def _find_similar_startups_by_embedding(self, startup_id: str, similarity_threshold: float,
+                                            top_k: int = None) -> List[Dict]:
+        """Nearest startups by cosine similarity of their embedded problem, solution and market text"""
+        return [
+            {
+                "startup_id": other_id,
+                "startup": self.entities[other_id],
+                "similarity_score": score
+            }
+            for other_id, score in self.vector_index.similar(startup_id, top_k or 10, similarity_threshold)
+            if other_id in self.entities
+        ]
+
     def get_investor_portfolio_insights(self, investor_id: str) -> Dict[str, Any]:
         """Get insights about an investor's portfolio based on graph connections"""
         if investor_id not in self.entities:
@@ -247,9 +588,10 @@ class MemoryGraph:
         founders = set()
         
         # Get invested startups
-        for rel in self.relationship_index.get(investor_id, []):
-            if rel["type"] == "invested_in" and rel["target"] in self.entities:
-                startup = self.entities[rel["target"]]
+        for edge in self.edges.out_edges(investor_id):
+            target = self.edges.target_of(edge)
+            if self.edges.type_of(edge) == "invested_in" and target in self.entities:
+                startup = self.entities[target]
                 portfolio_startups.append(startup)
                 
                 # Analyze industry distribution
@@ -261,7 +603,7 @@ class MemoryGraph:
                 stages[stage] += 1
                 
                 # Get founders of portfolio companies
-                startup_founders = self.get_related_entities(rel["target"], ["founded_by"])
+                startup_founders = self.get_related_entities(target, ["founded_by"])
                 for founder_rel in startup_founders:
                     founders.add(founder_rel["entity_id"])
         
@@ -273,100 +615,114 @@ class MemoryGraph:
             "portfolio_startups": portfolio_startups
         }
     
-    def build_startup_graph_from_db(self, db_manager):
+    def build_startup_graph_from_db(self, db_manager, limit: int = 1000):
         """Build the memory graph from database data"""
         print("🔄 Building memory graph from database...")
         
-        # Get all startups
-        startups = db_manager.get_all_startups(limit=1000)
+        # Stream startups page by page with their founders already attached
+        startups = db_manager.iter_startups_with_founders(limit=limit)
         
         for startup in startups:
-            startup_id = startup["startup_id"]
-            
-            # Add startup entity
+            self.add_startup(startup)
+        
+        # Build similarity relationships
+        self._build_similarity_relationships()
+        
+        print(f"✅ Memory graph built: {len(self.entities)} entities, {len(self.relationships)} relationships")
+    
+    def add_startup(self, startup: Dict[str, Any]):
+        """Add or refresh a startup row (founders embedded) with its founder, industry, stage and location links"""
+        startup_id = startup["startup_id"]
+        founders = startup.pop("founders", None) or []
+        
+        # Add startup entity
+        self.add_entity(
+            entity_id=startup_id,
+            entity_type="startup",
+            properties=startup
+        )
+        
+        # Add founders
+        for founder in founders:
+            founder_id = f"founder_{founder.get('name', '').replace(' ', '_').lower()}"
             self.add_entity(
-                entity_id=startup_id,
-                entity_type="startup",
-                properties=startup
+                entity_id=founder_id,
+                entity_type="founder",
+                properties=founder
             )
+            self._link(startup_id, founder_id, "founded_by")
             
-            # Get detailed startup info
-            detailed_startup = db_manager.get_startup_profile(startup_id)
-            if not detailed_startup:
-                continue
-            
-            # Add founders
-            for founder in detailed_startup.get("founders", []):
-                founder_id = f"founder_{founder.get('name', '').replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=founder_id,
-                    entity_type="founder",
-                    properties=founder
-                )
-                self.add_relationship(startup_id, founder_id, "founded_by")
-                
-                # Add founder experience connections
-                if founder.get("professional_experience"):
-                    exp_id = f"experience_{founder.get('professional_experience', '').replace(' ', '_').lower()}"
-                    self.add_entity(
-                        entity_id=exp_id,
-                        entity_type="experience",
-                        properties={"description": founder.get("professional_experience")}
-                    )
-                    self.add_relationship(founder_id, exp_id, "has_experience")
-            
-            # Add industry connections
-            industry = startup.get("industry_sector")
-            if industry:
-                industry_id = f"industry_{industry.replace(' ', '_').lower()}"
+            # Add founder experience connections
+            if founder.get("professional_experience"):
+                exp_id = f"experience_{founder.get('professional_experience', '').replace(' ', '_').lower()}"
                 self.add_entity(
-                    entity_id=industry_id,
-                    entity_type="industry",
-                    properties={"name": industry}
+                    entity_id=exp_id,
+                    entity_type="experience",
+                    properties={"description": founder.get("professional_experience")}
                 )
-                self.add_relationship(startup_id, industry_id, "operates_in")
-            
-            # Add stage connections
-            stage = startup.get("stage")
-            if stage:
-                stage_id = f"stage_{stage.replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=stage_id,
-                    entity_type="stage",
-                    properties={"name": stage}
-                )
-                self.add_relationship(startup_id, stage_id, "in_stage")
-            
-            # Add location connections
-            city = startup.get("location_city")
-            if city:
-                location_id = f"location_{city.replace(' ', '_').lower()}"
-                self.add_entity(
-                    entity_id=location_id,
-                    entity_type="location",
-                    properties={"city": city, "state": startup.get("location_state")}
-                )
-                self.add_relationship(startup_id, location_id, "located_in")
+                self._link(founder_id, exp_id, "has_experience")
         
-        # Build similarity relationships
-        self._build_similarity_relationships()
+        # Add industry connections
+        industry = startup.get("industry_sector")
+        if industry:
+            industry_id = f"industry_{industry.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=industry_id,
+                entity_type="industry",
+                properties={"name": industry}
+            )
+            self._link(startup_id, industry_id, "operates_in")
         
-        print(f"✅ Memory graph built: {len(self.entities)} entities, {len(self.relationships)} relationships")
-    
+        # Add stage connections
+        stage = startup.get("stage")
+        if stage:
+            stage_id = f"stage_{stage.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=stage_id,
+                entity_type="stage",
+                properties={"name": stage}
+            )
+            self._link(startup_id, stage_id, "in_stage")
+        
+        # Add location connections
+        city = startup.get("location_city")
+        if city:
+            location_id = f"location_{city.replace(' ', '_').lower()}"
+            self.add_entity(
+                entity_id=location_id,
+                entity_type="location",
+                properties={"city": city, "state": startup.get("location_state")}
+            )
+            self._link(startup_id, location_id, "located_in")
+
     def _build_similarity_relationships(self):
         """Build similarity relationships between startups"""
         startups = list(self.entity_index.get("startup", set()))
+        position = {startup_id: i for i, startup_id in enumerate(startups)}
         
         for i, startup1 in enumerate(startups):
-            for startup2 in startups[i+1:]:
-                similarity_score = self._calculate_startup_similarity(startup1, startup2)
-                
-                if similarity_score > 0.3:  # Threshold for similarity
-                    self.add_relationship(
-                        startup1, startup2, "similar_to", 
-                        properties={"similarity_score": similarity_score},
-                        weight=similarity_score
-                    )
+            # Pairs sharing no bucket score at most 0.1 (revenue only), below the threshold
+            for startup2 in self.similarity_index.candidates(startup1):
+                if position.get(startup2, -1) <= i:
+                    continue  # Each pair is scored once, from its first startup
+                self._add_similarity_if_above_threshold(startup1, startup2)
+
+    def add_startup_similarities(self, startup_id: str):
+        """Link a newly added startup to similar ones without rebuilding the whole graph"""
+        for other_id in self.similarity_index.candidates(startup_id):
+            if other_id in self.entities and not (self.has_relationship(startup_id, other_id, "similar_to")
+                                                  or self.has_relationship(other_id, startup_id, "similar_to")):
+                self._add_similarity_if_above_threshold(startup_id, other_id)
+
+    def _add_similarity_if_above_threshold(self, startup1: str, startup2: str):
+        similarity_score = self._calculate_startup_similarity(startup1, startup2)
+        
+        if similarity_score > SIMILARITY_THRESHOLD:
+            self.add_relationship(
+                startup1, startup2, "similar_to", 
+                properties={"similarity_score": similarity_score},
+                weight=similarity_score
+            )
     
     def _calculate_startup_similarity(self, startup1_id: str, startup2_id: str) -> float:
         """Calculate similarity between two startups"""
@@ -419,7 +775,7 @@ class MemoryGraph:
         
         elif any(word in query_lower for word in ["similar", "like", "comparable"]):
             context["focus"] = "similar_startups"
-            context["similar_startups"] = self.find_similar_startups(startup_id)
+            context["similar_startups"] = self.find_similar_startups(startup_id, top_k=10, method="profile")
         
         elif any(word in query_lower for word in ["founder", "team", "who"]):
             context["focus"] = "team"
@@ -432,11 +788,38 @@ class MemoryGraph:
         
         return context
     
+    def save_snapshot(self, directory: str) -> Optional[str]:
+        """Write a binary snapshot (mmap-able edge arrays plus entity table) for fast warm starts"""
+        try:
+            path = write_snapshot(self, directory)
+            print(f"💾 Memory graph snapshot saved: {len(self.entities)} entities, {len(self.edges)} relationships")
+            return path
+        except Exception as e:
+            print(f"❌ Error saving memory graph snapshot: {str(e)}")
+            return None
+
+    def load_snapshot(self, directory: str) -> bool:
+        """Warm start from the latest snapshot and its delta log, False when none is usable"""
+        try:
+            path = read_snapshot(self, directory)
+        except Exception as e:
+            print(f"❌ Error loading memory graph snapshot: {str(e)}")
+            self._clear_graph()  # Drop any partially restored state
+            return False
+
+        if path is None:
+            return False
+
+        self._state = "loaded"
+        print(f"✅ Memory graph loaded from snapshot: {len(self.entities)} entities, "
+              f"{len(self.edges)} relationships, {self.delta_log.records} delta records")
+        return True
+
     def export_graph(self) -> Dict[str, Any]:
         """Export graph for visualization or persistence"""
         return {
             "entities": self.entities,
-            "relationships": self.relationships,
+            "relationships": list(self.relationships),
             "stats": {
                 "total_entities": len(self.entities),
                 "total_relationships": len(self.relationships),
@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import shutil
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl  # POSIX only, elsewhere workers sharing a snapshot directory are not coordinated
+except ImportError:
+    fcntl = None
+
+# Bump when the on-disk layout changes, older snapshots are then ignored and rebuilt
+SNAPSHOT_FORMAT_VERSION = 1
+
+CURRENT_FILE = "CURRENT"  # Name of the live snapshot directory
+TABLE_FILE = "graph.json"  # Entity table, interned ids and derived indexes
+DELTA_LOG_FILE = "delta.log"  # Mutations made after the snapshot was written
+LOCK_FILE = ".lock"  # Held shared by appends and reads, exclusive by compaction
+
+
+@contextmanager
+def _locked(base_dir: str, exclusive: bool, lock_file=None):
+    """Hold the snapshot directory lock, on lock_file when the caller keeps one open"""
+    if fcntl is None:
+        yield
+        return
+    f = lock_file or open(os.path.join(base_dir, LOCK_FILE), "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    finally:
+        if lock_file is None:
+            f.close()
+
+
+def _pointer_id(base_dir: str) -> Optional[int]:
+    """Identity of the CURRENT pointer, it changes whenever a compaction replaces it"""
+    try:
+        return os.stat(os.path.join(base_dir, CURRENT_FILE)).st_ino
+    except OSError:
+        return None
+
+
+class GraphDeltaLog:
+    """Append-only JSON lines log of MemoryGraph mutations made since the last snapshot
+
+    Several workers may append to one log. When another worker compacts, the next append
+    follows CURRENT to the new snapshot's log, the old directory is gone by then."""
+
+    def __init__(self, path: str, records: int = 0):
+        self.path = path
+        self.records = records
+        self.base_dir = os.path.dirname(os.path.dirname(path))
+        self._pointer = _pointer_id(self.base_dir)
+        self._lock_file = open(os.path.join(self.base_dir, LOCK_FILE), "a")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record: Dict[str, Any]):
+        with _locked(self.base_dir, exclusive=False, lock_file=self._lock_file):
+            if _pointer_id(self.base_dir) != self._pointer:
+                self._follow()
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+        self.records += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._lock_file.closed:
+            self._lock_file.close()
+
+    def _follow(self):
+        # The compacting worker re-read this log before snapshotting, nothing written to it is lost
+        path = _current_snapshot(self.base_dir)
+        if path is None:
+            return
+        self._file.close()
+        self.path = os.path.join(path, DELTA_LOG_FILE)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pointer = _pointer_id(self.base_dir)
+        self.records = 0
+
+    @staticmethod
+    def read(path: str) -> Iterator[Dict[str, Any]]:
+        """Yield logged mutations in order, skipping a torn final line"""
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on every platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _save_array(directory: str, name: str, column: np.ndarray):
+    with open(os.path.join(directory, f"{name}.npy"), "wb") as f:
+        np.save(f, np.ascontiguousarray(column))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _load_array(directory: str, name: str, mmap_mode: str) -> np.ndarray:
+    path = os.path.join(directory, f"{name}.npy")
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except ValueError:
+        return np.load(path)  # Empty arrays cannot be mapped
+
+
+def _current_snapshot(base_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(base_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(base_dir, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def _build_table(graph, property_keys: List[tuple], remainder: Dict[int, Dict]) -> Dict[str, Any]:
+    entity_types = sorted(graph.entity_index)
+    type_codes = {entity_type: code for code, entity_type in enumerate(entity_types)}
+    edges = graph.edges
+    matrix = graph.similarity_matrix
+
+    return {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": time.time(),
+        "entity_types": entity_types,
+        # [id, type code, properties, created_at, updated_at]
+        "entities": [
+            [entity_id, type_codes[entity["type"]], entity["properties"], entity["created_at"], entity["updated_at"]]
+            for entity_id, entity in graph.entities.items()
+        ],
+        "node_ids": edges.node_ids,
+        "relation_types": edges.relation_types,
+        "edge_properties": [[edge, properties] for edge, properties in remainder.items()],
+        "property_columns": [list(keys) for keys in property_keys],
+        "connection_signatures": [
+            [entity_id, sorted(signature)] for entity_id, signature in graph.connection_signatures.items() if signature
+        ],
+        "similarity": {
+            "startup_ids": matrix.startup_ids,
+            "vocabularies": {field: list(vocabulary) for field, vocabulary in matrix.vocabularies.items()},
+        },
+    }
+
+
+def write_snapshot(graph, base_dir: str) -> str:
+    """Atomically write a snapshot of the graph and switch it to a fresh delta log
+
+    Other workers sharing base_dir may be appending to the current log, so a graph that is
+    already snapshot backed is first re-read from disk, which includes their mutations."""
+    os.makedirs(base_dir, exist_ok=True)
+    with _locked(base_dir, exclusive=True):
+        if graph.delta_log is not None and _current_snapshot(base_dir) is not None:
+            _read_snapshot(graph, base_dir)
+        return _write_snapshot(graph, base_dir)
+
+
+def _write_snapshot(graph, base_dir: str) -> str:
+    name = f"snapshot-{time.time_ns()}"
+    final_path = os.path.join(base_dir, name)
+    tmp_path = os.path.join(base_dir, f".{name}.tmp")
+    os.makedirs(tmp_path)
+
+    try:
+        for column_name, column in graph.edges.export_columns().items():
+            _save_array(tmp_path, f"edges_{column_name}", column)
+        for column_name, column in graph.similarity_matrix.export_columns().items():
+            _save_array(tmp_path, f"similarity_{column_name}", column)
+        # Float-valued edge properties (e.g. similarity scores) are stored as columns, not JSON
+        property_columns, remainder = graph.edges.export_properties()
+        for i, (_, edges, values) in enumerate(property_columns):
+            _save_array(tmp_path, f"properties_{i}_edges", edges)
+            _save_array(tmp_path, f"properties_{i}_values", values)
+
+        with open(os.path.join(tmp_path, TABLE_FILE), "w", encoding="utf-8") as f:
+            table = _build_table(graph, [keys for keys, _, _ in property_columns], remainder)
+            json.dump(table, f, default=str, separators=(",", ":"))
+            created_at = table["created_at"]
+            f.flush()
+            os.fsync(f.fileno())
+        open(os.path.join(tmp_path, DELTA_LOG_FILE), "a").close()
+        _fsync_dir(tmp_path)
+
+        # Directory rename and pointer replace are both atomic, readers never see a partial snapshot
+        os.rename(tmp_path, final_path)
+        pointer_tmp = os.path.join(base_dir, f".{CURRENT_FILE}.tmp")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(base_dir, CURRENT_FILE))
+        _fsync_dir(base_dir)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    # Mutations from now on are covered by the new snapshot's log
+    if graph.delta_log is not None:
+        graph.delta_log.close()
+    graph.delta_log = GraphDeltaLog(os.path.join(final_path, DELTA_LOG_FILE))
+    graph.snapshot_created_at = created_at
+
+    for entry in os.listdir(base_dir):
+        if entry.startswith("snapshot-") and entry != name:
+            shutil.rmtree(os.path.join(base_dir, entry), ignore_errors=True)
+
+    return final_path
+
+
+def read_snapshot(graph, base_dir: str) -> Optional[str]:
+    """Load the current snapshot into the graph and replay its delta log, None when there is none"""
+    if not os.path.isdir(base_dir):
+        return None
+    # Shared, so a compaction cannot delete the snapshot while it is being read
+    with _locked(base_dir, exclusive=False):
+        return _read_snapshot(graph, base_dir)
+
+
+def _read_snapshot(graph, base_dir: str) -> Optional[str]:
+    path = _current_snapshot(base_dir)
+    if path is None:
+        return None
+
+    with open(os.path.join(path, TABLE_FILE), "r", encoding="utf-8") as f:
+        table = json.load(f)
+    if table.get("version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    # Edge columns stay on disk and are paged in on first touch
+    edge_columns = {name: _load_array(path, f"edges_{name}", "r")
+                    for name in ("sources", "targets", "types", "weights", "created_ts",
+                                 "out_offsets", "out_order", "in_offsets", "in_order")}
+    # Copy-on-write so upserts of existing rows never reach the file
+    matrix = graph.similarity_matrix
+    similarity_columns = {name: _load_array(path, f"similarity_{name}", "c")
+                          for name in [f"codes_{field}" for field, _ in matrix.CATEGORICAL_WEIGHTS] + ["revenue", "active"]}
+
+    entity_types = table["entity_types"]
+    graph.entities = {}
+    graph.entity_index = defaultdict(set)
+    for entity_id, type_code, properties, created_at, updated_at in table["entities"]:
+        entity_type = entity_types[type_code]
+        graph.entities[entity_id] = {
+            "type": entity_type,
+            "properties": properties,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+        graph.entity_index[entity_type].add(entity_id)
+
+    graph.edges.restore_columns(
+        table["node_ids"],
+        table["relation_types"],
+        {edge: properties for edge, properties in table["edge_properties"]},
+        edge_columns,
+        [(keys, _load_array(path, f"properties_{i}_edges", "r"), _load_array(path, f"properties_{i}_values", "r"))
+         for i, keys in enumerate(table["property_columns"])]
+    )
+    matrix.restore(table["similarity"]["startup_ids"], table["similarity"]["vocabularies"], similarity_columns)
+
+    graph.similarity_index = type(graph.similarity_index)(graph.similarity_index.fields)
+    startups = graph.entity_index.get("startup", set())
+    for startup_id in startups:
+        graph.similarity_index.add(startup_id, graph.entities[startup_id]["properties"])
+
+    graph.connection_signatures = defaultdict(set)
+    graph.signature_index = defaultdict(set)
+    for entity_id, signature in table["connection_signatures"]:
+        elements = {tuple(element) for element in signature}
+        graph.connection_signatures[entity_id] = elements
+        if entity_id in startups:
+            for element in elements:
+                graph.signature_index[element].add(entity_id)
+
+    # Replay mutations made after the snapshot without logging them a second time
+    if graph.delta_log is not None:
+        graph.delta_log.close()
+        graph.delta_log = None
+    log_path = os.path.join(path, DELTA_LOG_FILE)
+    replayed = 0
+    for record in GraphDeltaLog.read(log_path):
+        apply_delta(graph, record)
+        replayed += 1
+    graph.delta_log = GraphDeltaLog(log_path, records=replayed)
+    graph.snapshot_created_at = table.get("created_at")
+
+    return path
+
+
+def apply_delta(graph, record: Dict[str, Any]):
+    """Re-apply one logged mutation, keeping its original timestamps"""
+    op = record.get("op")
+    at = record.get("at")
+    if op == "add_entity":
+        graph.add_entity(record["entity_id"], record["entity_type"], record["properties"])
+        if at:
+            graph.entities[record["entity_id"]]["created_at"] = at
+            graph.entities[record["entity_id"]]["updated_at"] = at
+    elif op == "update_entity":
+        graph.update_entity(record["entity_id"], record["properties"])
+        if at and record["entity_id"] in graph.entities:
+            graph.entities[record["entity_id"]]["updated_at"] = at
+    elif op == "add_relationship":
+        graph.add_relationship(record["source"], record["target"], record["relation_type"],
+                               record.get("properties"), record.get("weight", 1.0))
+        if at:
+            graph.edges.created_ts[len(graph.edges) - 1] = at
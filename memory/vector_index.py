@@ -0,0 +1,371 @@
+import os
+import json
+import math
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # POSIX only, elsewhere nothing stops two processes writing one index directory
+except ImportError:
+    fcntl = None
+
+# Below this many vectors exact search is fast enough, above it the IVF lists are used
+VECTOR_IVF_MIN_ROWS = int(os.environ.get("VECTOR_IVF_MIN_ROWS", 20000))
+VECTOR_IVF_NPROBE = int(os.environ.get("VECTOR_IVF_NPROBE", 8))
+
+_VECTORS_FILE = "vectors.f32"
+_META_FILE = "index.json"
+_LOCK_FILE = ".lock"  # Held exclusively by the one process writing the directory
+
+
+def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k best scores, best first, skipping -inf"""
+    if k < len(scores):
+        candidates = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.isfinite(scores[candidates])]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class VectorIndex:
+    """Unit float32 vectors in a memory-mapped matrix, searched exactly or through IVF lists by inner product"""
+
+    def __init__(self, dim: int, directory: str = None, embedder_name: str = "",
+                 ivf_min_rows: int = VECTOR_IVF_MIN_ROWS, nprobe: int = VECTOR_IVF_NPROBE,
+                 initial_capacity: int = 1024):
+        self.dim = dim
+        self.directory = directory
+        self.embedder_name = embedder_name
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+
+        self.size = 0
+        self.ids: List[str] = []  # row -> startup id
+        self.row_of: Dict[str, int] = {}
+        self.stamps: Dict[str, str] = {}  # startup id -> updated_at of the embedded profile
+        self.active = np.zeros(initial_capacity, dtype=bool)
+        self.assignments = np.full(initial_capacity, -1, dtype=np.int32)  # row -> IVF list
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        self.matrix = None
+        self._initial_capacity = initial_capacity
+        self._lock = threading.RLock()  # Refreshes write from a worker thread while requests search
+        self._owner_file = None
+
+        if directory and not self._claim():
+            # Rows are kept per process, another process would overwrite them through the shared mapping
+            print(f"⚠️ Vector index at {directory} is owned by another process, keeping vectors in memory")
+            self.directory = None
+        if not (self.directory and self._load()):
+            self.matrix = self._allocate(initial_capacity)
+
+    def __len__(self) -> int:
+        return int(self.active[:self.size].sum())
+
+    def __contains__(self, startup_id: str) -> bool:
+        row = self.row_of.get(startup_id)
+        return row is not None and bool(self.active[row])
+
+    def stamp_of(self, startup_id: str) -> Optional[str]:
+        return self.stamps.get(startup_id) if startup_id in self else None
+
+    def upsert(self, startup_id: str, vector: np.ndarray, stamp: str = None):
+        with self._lock:
+            row = self.row_of.get(startup_id)
+            if row is None:
+                if self.size == len(self.active):
+                    self._grow()
+                row = self.size
+                self.size += 1
+                self.row_of[startup_id] = row
+                self.ids.append(startup_id)
+
+            self.matrix[row] = vector
+            self.active[row] = True
+            self.stamps[startup_id] = stamp
+            if self.centroids is not None:
+                self.assignments[row] = int(np.argmax(self.centroids @ vector))
+
+    def needs_training(self) -> bool:
+        """True once the catalog is big enough for IVF lists, and again each time it doubles"""
+        return self.size >= max(self.ivf_min_rows, 2 * self.trained_rows)
+
+    def remove(self, startup_id: str):
+        with self._lock:
+            row = self.row_of.get(startup_id)
+            if row is not None:
+                self.active[row] = False
+                self.stamps.pop(startup_id, None)
+
+    def vector_of(self, startup_id: str) -> Optional[np.ndarray]:
+        return np.array(self.matrix[self.row_of[startup_id]]) if startup_id in self else None
+
+    def search(self, query: np.ndarray, k: int = 10, allow: Optional[Iterable[str]] = None,
+               exact: bool = False) -> List[Tuple[str, float]]:
+        """Best k (startup_id, cosine) pairs; allow restricts the candidates before anything is scored"""
+        with self._lock:
+            if k <= 0 or self.size == 0:
+                return []
+            n = self.size
+
+            if allow is not None:
+                # Pushed down filter: only the allowed rows are ever scored
+                rows = np.fromiter((self.row_of[startup_id] for startup_id in allow if startup_id in self.row_of), dtype=np.int64)
+                rows = rows[self.active[rows]]
+            elif not exact and self.centroids is not None and n >= self.ivf_min_rows:
+                probe = _top_rows(self.centroids @ query, self.nprobe)
+                rows = np.flatnonzero(np.isin(self.assignments[:n], probe) & self.active[:n])
+            else:
+                scores = self.matrix[:n] @ query
+                scores[~self.active[:n]] = -np.inf
+                return [(self.ids[row], float(scores[row])) for row in _top_rows(scores, k)]
+
+            if len(rows) == 0:
+                return []
+            scores = self.matrix[rows] @ query
+            return [(self.ids[rows[position]], float(scores[position])) for position in _top_rows(scores, k)]
+
+    def similar(self, startup_id: str, k: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        vector = self.vector_of(startup_id)
+        if vector is None:
+            return []
+        return [(other_id, score) for other_id, score in self.search(vector, k + 1)
+                if other_id != startup_id and score >= min_score][:k]
+
+    def train(self, iterations: int = 10, sample_size: int = 20000, seed: int = 0):
+        """Cluster the vectors into about sqrt(n) IVF lists with spherical k-means
+
+        Slow on large catalogs, called from background refreshes only. The clustering runs on a
+        copied sample without the lock, searches are only held up while rows are assigned."""
+        with self._lock:
+            rows = np.flatnonzero(self.active[:self.size])
+            if len(rows) < self.ivf_min_rows:
+                self.centroids, self.trained_rows = None, self.size  # Mostly removed rows, stay exact
+                return
+            rng = np.random.default_rng(seed)
+            sample = np.array(self.matrix[np.sort(rng.choice(rows, size=min(sample_size, len(rows)), replace=False))])
+
+        nlist = max(1, int(math.sqrt(len(rows))))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[nearest == cluster]
+                if len(members):
+                    centroids[cluster] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        centroids = centroids.astype(np.float32)
+
+        with self._lock:
+            # Rows added while clustering are assigned here too
+            for start in range(0, self.size, 8192):
+                block = self.matrix[start:min(start + 8192, self.size)]
+                self.assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+            self.centroids = centroids
+            self.trained_rows = self.size
+
+    def save(self):
+        """Flush the vectors and write the row metadata next to them"""
+        with self._lock:
+            if not self.directory:
+                return
+            if isinstance(self.matrix, np.memmap):
+                self.matrix.flush()
+            self._save_array("active.npy", self.active[:self.size])
+            self._save_array("assignments.npy", self.assignments[:self.size])
+            if self.centroids is not None:
+                self._save_array("centroids.npy", self.centroids)
+
+            meta = {"dim": self.dim, "embedder": self.embedder_name, "size": self.size, "capacity": len(self.active),
+                    "ids": self.ids, "stamps": self.stamps, "trained_rows": self.trained_rows,
+                    "has_centroids": self.centroids is not None}
+            tmp_path = os.path.join(self.directory, f"{_META_FILE}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(self.directory, _META_FILE))
+
+    def close(self):
+        """Save and give up the directory, another process may then own it"""
+        self.save()
+        if self._owner_file is not None:
+            self._owner_file.close()  # Closing releases the lock
+            self._owner_file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "local", "vectors": len(self), "dim": self.dim, "embedder": self.embedder_name,
+                "ivf_lists": 0 if self.centroids is None else len(self.centroids),
+                "mmap": isinstance(self.matrix, np.memmap)}
+
+    def _claim(self) -> bool:
+        """Take the directory's writer lock for the life of the process, False when another process holds it"""
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            return True
+        f = open(os.path.join(self.directory, _LOCK_FILE), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._owner_file = f
+        return True
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """A matrix of capacity rows holding the current ones
+
+        On disk the rows are copied into a new file renamed over the old one. The live file is
+        never truncated, a mapping still open on it would fault on the cut pages."""
+        if not self.directory:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self.size:
+                matrix[:self.size] = self.matrix[:self.size]
+            return matrix
+        path = os.path.join(self.directory, _VECTORS_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.truncate(capacity * self.dim * 4)  # Sparse until rows are written
+        matrix = np.memmap(tmp_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        if self.size:
+            for start in range(0, self.size, 8192):
+                matrix[start:min(start + 8192, self.size)] = self.matrix[start:min(start + 8192, self.size)]
+            matrix.flush()
+        os.replace(tmp_path, path)  # The memmap keeps working on the renamed file
+        return matrix
+
+    def _map(self, capacity: int) -> np.ndarray:
+        path = os.path.join(self.directory, _VECTORS_FILE)
+        if os.path.getsize(path) < capacity * self.dim * 4:
+            raise ValueError(f"{_VECTORS_FILE} holds fewer than {capacity} rows")
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _save_array(self, name: str, array: np.ndarray):
+        # Written beside the live file and renamed over it, a crash never leaves half an array
+        path = os.path.join(self.directory, name)
+        with open(f"{path}.tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(f"{path}.tmp", path)
+
+    def _grow(self):
+        capacity = max(1, len(self.active) * 2)
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+        self.matrix = self._allocate(capacity)
+        active = np.zeros(capacity, dtype=bool)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[:self.size] = self.assignments[:self.size]
+        self.assignments = assignments
+
+    def _load(self) -> bool:
+        meta_path = os.path.join(self.directory, _META_FILE)
+        if not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim or meta["embedder"] != self.embedder_name:
+                print(f"⚠️ Vector index at {self.directory} was built with {meta['embedder']}, re-embedding")
+                return False
+
+            capacity = meta["capacity"]
+            self.size = meta["size"]
+            self.ids = meta["ids"]
+            self.row_of = {startup_id: row for row, startup_id in enumerate(self.ids)}
+            self.stamps = meta["stamps"]
+            self.matrix = self._map(capacity)
+            self.active = np.zeros(capacity, dtype=bool)
+            self.active[:self.size] = np.load(os.path.join(self.directory, "active.npy"))
+            self.assignments = np.full(capacity, -1, dtype=np.int32)
+            self.assignments[:self.size] = np.load(os.path.join(self.directory, "assignments.npy"))
+            if meta["has_centroids"]:
+                self.centroids = np.load(os.path.join(self.directory, "centroids.npy"))
+                self.trained_rows = meta["trained_rows"]
+            print(f"📂 Vector index loaded: {len(self)} vectors")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load vector index from {self.directory}: {e}")
+            # Started over in a new file by the caller, the old one is replaced rather than cut
+            self.size, self.ids, self.row_of, self.stamps = 0, [], {}, {}
+            self.matrix, self.centroids, self.trained_rows = None, None, 0
+            self.active = np.zeros(self._initial_capacity, dtype=bool)
+            self.assignments = np.full(self._initial_capacity, -1, dtype=np.int32)
+            return False
+
+
+class PgVectorIndex:
+    """Same interface as VectorIndex, vectors kept in a Postgres pgvector table with an HNSW index"""
+
+    def __init__(self, dim: int, db_url: str, table: str = "startup_embeddings", embedder_name: str = ""):
+        import psycopg  # Optional dependency, only needed for this backend
+        from pgvector.psycopg import register_vector
+
+        self.dim = dim
+        self.table = table
+        self.embedder_name = embedder_name
+        self.connection = psycopg.connect(db_url, autocommit=True)
+        self.connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        register_vector(self.connection)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (startup_id text PRIMARY KEY, embedding vector({dim}), stamp text)")
+        self.connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_embedding_hnsw ON {table} USING hnsw (embedding vector_ip_ops)")
+
+    def __len__(self) -> int:
+        return self.connection.execute(f"SELECT count(*) FROM {self.table}").fetchone()[0]
+
+    def __contains__(self, startup_id: str) -> bool:
+        return self.stamp_of(startup_id) is not None
+
+    def stamp_of(self, startup_id: str) -> Optional[str]:
+        row = self.connection.execute(f"SELECT stamp FROM {self.table} WHERE startup_id = %s", (startup_id,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, startup_id: str, vector: np.ndarray, stamp: str = None):
+        self.connection.execute(
+            f"INSERT INTO {self.table} (startup_id, embedding, stamp) VALUES (%s, %s, %s) "
+            f"ON CONFLICT (startup_id) DO UPDATE SET embedding = EXCLUDED.embedding, stamp = EXCLUDED.stamp",
+            (startup_id, vector, stamp))
+
+    def remove(self, startup_id: str):
+        self.connection.execute(f"DELETE FROM {self.table} WHERE startup_id = %s", (startup_id,))
+
+    def vector_of(self, startup_id: str) -> Optional[np.ndarray]:
+        row = self.connection.execute(f"SELECT embedding FROM {self.table} WHERE startup_id = %s", (startup_id,)).fetchone()
+        return np.asarray(row[0], dtype=np.float32) if row else None
+
+    def search(self, query: np.ndarray, k: int = 10, allow: Optional[Iterable[str]] = None,
+               exact: bool = False) -> List[Tuple[str, float]]:
+        # <#> is the negated inner product, served by the HNSW index
+        where, params = "", [query]
+        if allow is not None:
+            where, params = "WHERE startup_id = ANY(%s)", [query, list(allow)]
+        rows = self.connection.execute(
+            f"SELECT startup_id, -(embedding <#> %s) AS score FROM {self.table} {where} "
+            f"ORDER BY embedding <#> %s LIMIT %s", (*params, query, k)).fetchall()
+        return [(startup_id, float(score)) for startup_id, score in rows]
+
+    def similar(self, startup_id: str, k: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        vector = self.vector_of(startup_id)
+        if vector is None:
+            return []
+        return [(other_id, score) for other_id, score in self.search(vector, k + 1)
+                if other_id != startup_id and score >= min_score][:k]
+
+    def needs_training(self) -> bool:
+        return False  # HNSW needs no training
+
+    def train(self):
+        pass
+
+    def save(self):
+        pass  # Every write is already durable
+
+    def close(self):
+        self.connection.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "pgvector", "table": self.table, "dim": self.dim, "embedder": self.embedder_name}